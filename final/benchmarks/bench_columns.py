@@ -0,0 +1,47 @@
+"""
+Benchmark list_tasks and get_statistics with the NumPy column store.
+
+Usage:
+    uv run python benchmarks/bench_columns.py [--tasks 300000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+
+from taskmaster.manager import TaskManager
+from bench_list_tasks import make_tasks, timeit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=300_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        standard = TaskManager(os.path.join(tmp, "tasks.json"))
+        columnar = TaskManager(os.path.join(tmp, "tasks.json"), columnar=True)
+        tasks = make_tasks(args.tasks)
+        standard.tasks = tasks
+        columnar.tasks = tasks
+
+        cases = [
+            ("stats", lambda m: m.get_statistics()),
+            ("status", lambda m: m.list_tasks(status_filter="pending")),
+            ("status+tag", lambda m: m.list_tasks(status_filter="completed", tag_filter="tag7")),
+            ("by priority", lambda m: m.list_tasks(tag_filter="tag7", sort_by="priority")),
+        ]
+
+        print(f"Queries over {args.tasks:,} tasks (best of 5, ms)")
+        print(f"{'query':<12} {'indexes':>10} {'columns':>10} {'speedup':>8}")
+        for name, query in cases:
+            standard_ms = timeit(lambda: query(standard), repeat=5)
+            columnar_ms = timeit(lambda: query(columnar), repeat=5)
+            print(f"{name:<12} {standard_ms:>10.2f} {columnar_ms:>10.2f} "
+                  f"{standard_ms / columnar_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
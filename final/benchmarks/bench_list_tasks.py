@@ -0,0 +1,86 @@
+"""
+Benchmark filtered list_tasks with and without the secondary indexes.
+
+Usage:
+    uv run python benchmarks/bench_list_tasks.py [--tasks 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from taskmaster.manager import TaskManager
+from taskmaster.models import Task, VALID_STATUSES, VALID_PRIORITIES
+
+TAGS = [f"tag{i}" for i in range(50)]
+
+
+def make_tasks(count: int):
+    """Build a reproducible set of tasks."""
+    rng = random.Random(299)
+    return [
+        Task(
+            id=i,
+            title=f"Task {i}",
+            status=rng.choice(VALID_STATUSES),
+            priority=rng.choice(VALID_PRIORITIES),
+            tags=rng.sample(TAGS, 2),
+            created_at="2025-01-01T00:00:00",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def scan_list(tasks, status_filter=None, tag_filter=None):
+    """The previous implementation: filter by scanning every task."""
+    filtered = tasks
+    if status_filter:
+        filtered = [t for t in filtered if t.status == status_filter]
+    if tag_filter:
+        filtered = [t for t in filtered if tag_filter in t.tags]
+    return sorted(filtered, key=lambda x: x.id)
+
+
+def timeit(func, repeat: int = 20) -> float:
+    """Return the best time in milliseconds over several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = TaskManager(os.path.join(tmp, "tasks.json"))
+        tasks = make_tasks(args.tasks)
+        manager.tasks = tasks
+
+        cases = [
+            ("status", {"status_filter": "pending"}),
+            ("tag", {"tag_filter": "tag7"}),
+            ("status+tag", {"status_filter": "completed", "tag_filter": "tag7"}),
+        ]
+
+        print(f"list_tasks over {args.tasks:,} tasks (best of 20, ms)")
+        print(f"{'filter':<12} {'matches':>8} {'scan':>10} {'indexed':>10} {'speedup':>8}")
+        for name, kwargs in cases:
+            matches = len(manager.list_tasks(**kwargs))
+            assert matches == len(scan_list(tasks, **kwargs))
+            scan_ms = timeit(lambda: scan_list(tasks, **kwargs))
+            indexed_ms = timeit(lambda: manager.list_tasks(**kwargs))
+            print(f"{name:<12} {matches:>8} {scan_ms:>10.2f} {indexed_ms:>10.2f} "
+                  f"{scan_ms / indexed_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
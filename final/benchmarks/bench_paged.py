@@ -0,0 +1,63 @@
+"""
+Benchmark memory held by a session with jsonl storage against paged storage.
+
+Usage:
+    uv run python benchmarks/bench_paged.py [--tasks 200000] [--cache-size 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from taskmaster.manager import TaskManager
+from bench_list_tasks import make_tasks
+
+
+def measure(path: str, storage: str, cache_size: int, lookups: int) -> tuple:
+    """Open a session, look up random tasks and count the tasks it lists."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    options = {"cache_size": cache_size} if storage == "paged" else {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = TaskManager(path, storage=storage, **options)
+    rng = random.Random(299)
+    count = sum(1 for _ in manager.list_tasks())
+    for _ in range(lookups):
+        manager.get_task(rng.randint(1, count))
+    listed = sum(1 for _ in manager.list_tasks(status_filter="pending"))
+    elapsed = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    manager.close()
+    return held, peak, elapsed, listed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--cache-size", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.json")
+        manager = TaskManager(path, storage="jsonl")
+        manager.storage.save(make_tasks(args.tasks))
+        manager.close()
+
+        print(f"{args.tasks:,} tasks, {args.lookups:,} lookups, one filtered listing")
+        print(f"{'storage':<8} {'held MB':>10} {'peak MB':>10} {'seconds':>9}")
+        for storage in ("jsonl", "paged"):
+            held, peak, elapsed, _ = measure(path, storage, args.cache_size, args.lookups)
+            print(f"{storage:<8} {held / 1e6:>10.1f} {peak / 1e6:>10.1f} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
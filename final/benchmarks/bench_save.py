@@ -0,0 +1,44 @@
+"""
+Benchmark the cost of persisting one status change with each storage backend.
+
+Usage:
+    uv run python benchmarks/bench_save.py [--tasks 20000] [--updates 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from taskmaster.manager import TaskManager
+from taskmaster.storage import STORAGE_BACKENDS
+from bench_list_tasks import make_tasks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--updates", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"Status updates on {args.tasks:,} tasks (ms per update)")
+    for storage in STORAGE_BACKENDS:
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = TaskManager(os.path.join(tmp, "tasks.json"), storage=storage)
+            manager.tasks = make_tasks(args.tasks)
+            manager._save_tasks()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for i in range(args.updates):
+                    manager.update_status(1 + i * 7 % args.tasks, "in_progress" if i % 2 else "pending")
+                elapsed = time.perf_counter() - start
+            manager.close()
+        print(f"{storage:<10} {elapsed / args.updates * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark a read-only session on the binary snapshot against loading tasks.json.
+
+Usage:
+    uv run python benchmarks/bench_snapshot.py [--tasks 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from taskmaster.manager import TaskManager
+from bench_list_tasks import make_tasks
+
+
+def open_and_report(path: str, read_only: bool) -> float:
+    """Time opening a manager and computing statistics and one filtered list."""
+    start = time.perf_counter()
+    manager = TaskManager(path, read_only=read_only)
+    manager.get_statistics()
+    manager.list_tasks(status_filter="completed", priority_filter="high")
+    elapsed = time.perf_counter() - start
+    manager.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.json")
+        manager = TaskManager(path)
+        manager.tasks = make_tasks(args.tasks)
+        manager._save_tasks()
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager.write_snapshot()
+
+        print(f"Open + stats + filtered list on {args.tasks:,} tasks (ms)")
+        print(f"{'tasks.json':<12} {open_and_report(path, False) * 1000:>10.1f}")
+        print(f"{'snapshot':<12} {open_and_report(path, True) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Measure the memory footprint per task of Task versus CompactTask.
+
+Usage:
+    uv run python benchmarks/bench_task_memory.py [--tasks 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+
+from taskmaster.models import Task, CompactTask, VALID_STATUSES, VALID_PRIORITIES
+
+TAGS = ["work", "home", "urgent", "school", "errand"]
+
+
+def task_fields(i: int) -> dict:
+    """Fields for one realistic task (short text, timestamps, a couple of tags)."""
+    return {
+        "id": i,
+        "title": f"Task {i}",
+        "description": "",
+        "priority": VALID_PRIORITIES[i % 3],
+        "status": VALID_STATUSES[i % 4],
+        "created_at": f"2025-11-{1 + i % 28:02d}T10:30:00.{i % 1000000:06d}",
+        "completed_at": f"2025-11-{1 + i % 28:02d}T18:00:00" if i % 4 == 2 else None,
+        "due_date": f"2025-12-{1 + i % 28:02d}" if i % 2 else None,
+        "tags": [TAGS[i % 5], TAGS[(i + 1) % 5]],
+    }
+
+
+def measure(task_class, count: int) -> float:
+    """Build count tasks and return the bytes allocated per task."""
+    # Field dicts are built lazily so only the task objects stay alive
+    gc.collect()
+    tracemalloc.start()
+    tasks = [task_class(**task_fields(i)) for i in range(1, count + 1)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(tasks) == count
+    del tasks
+    gc.collect()
+    return size / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"Memory per task over {args.tasks:,} tasks (tracemalloc)")
+    results = {cls.__name__: measure(cls, args.tasks) for cls in (Task, CompactTask)}
+    for name, per_task in results.items():
+        total_mb = per_task * args.tasks / (1024 * 1024)
+        print(f"{name:<12} {per_task:>8.0f} bytes/task {total_mb:>10.1f} MB total")
+    print(f"Savings: {1 - results['CompactTask'] / results['Task']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
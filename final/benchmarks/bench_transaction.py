@@ -0,0 +1,52 @@
+"""
+Benchmark inserting many tasks one save at a time versus in one transaction.
+
+Usage:
+    uv run python benchmarks/bench_transaction.py [--tasks 10000] [--storage json journal sqlite]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from taskmaster.manager import TaskManager
+from taskmaster.storage import STORAGE_BACKENDS
+
+
+def insert(data_file: str, storage: str, count: int, batched: bool) -> float:
+    """Insert count tasks into a fresh store and return the seconds taken."""
+    manager = TaskManager(data_file, storage=storage)
+    block = manager.transaction() if batched else contextlib.nullcontext()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        with block:
+            for i in range(count):
+                manager.add_task(f"Task {i}", tags=["bench"])
+        elapsed = time.perf_counter() - start
+    manager.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--storage", nargs="+", choices=list(STORAGE_BACKENDS),
+                        default=list(STORAGE_BACKENDS))
+    args = parser.parse_args()
+
+    print(f"Inserting {args.tasks:,} tasks (seconds)")
+    print(f"{'storage':<10} {'per call':>10} {'batched':>10} {'speedup':>8}")
+    for storage in args.storage:
+        with tempfile.TemporaryDirectory() as tmp:
+            single = insert(os.path.join(tmp, "single.json"), storage, args.tasks, False)
+            batched = insert(os.path.join(tmp, "batched.json"), storage, args.tasks, True)
+        print(f"{storage:<10} {single:>10.2f} {batched:>10.2f} {single / batched:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,30 +13,52 @@ CSC299 Final Project
 
 __version__ = "1.0.0"
 
-# Import main classes for external use
-from .models import Task, VALID_STATUSES, VALID_PRIORITIES
-from .manager import TaskManager
-from .ai import AITaskSummarizer
-from .chat import TaskMasterChat
-from .display import (
-    print_task_list,
-    print_task_details,
-    print_statistics,
-    success,
-    error,
-    warning,
-    info,
-)
-
-# Entry point
-from .chat import main
+# Public names and the submodule each lives in. They are imported on first
+# access (PEP 562) so "import taskmaster" stays cheap and the CLI only loads
+# what a session uses.
+_EXPORTS = {
+    'Task': 'models',
+    'VALID_STATUSES': 'models',
+    'VALID_PRIORITIES': 'models',
+    'TaskManager': 'manager',
+    'AITaskSummarizer': 'ai',
+    'AsyncAITaskSummarizer': 'ai',
+    'TaskMasterChat': 'chat',
+    'AsyncTaskMasterChat': 'async_chat',
+    'main': 'chat',
+    'print_task_list': 'display',
+    'print_task_details': 'display',
+    'print_statistics': 'display',
+    'success': 'display',
+    'error': 'display',
+    'warning': 'display',
+    'info': 'display',
+}
+
+
+def __getattr__(name):
+    """Import a public name from its submodule on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the lazy exports alongside the module's own names."""
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     '__version__',
     'Task',
     'TaskManager',
     'AITaskSummarizer',
+    'AsyncAITaskSummarizer',
     'TaskMasterChat',
+    'AsyncTaskMasterChat',
     'main',
     'VALID_STATUSES',
     'VALID_PRIORITIES',
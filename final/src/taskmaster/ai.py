@@ -6,23 +6,71 @@ Provides optional AI-powered task summarization using OpenAI.
 from __future__ import annotations
 
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .ratelimit import RateLimiter
+from .summary_cache import SummaryCache, cache_key
+
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.2
+MAX_OUTPUT_TOKENS = 60
+SYSTEM_PROMPT = (
+    "You read a task description and answer with a concise, "
+    "action-oriented phrase containing between three and eight words."
+)
+
+# Batch defaults, matching gpt-4o-mini's first usage tier
+DEFAULT_CONCURRENCY = 8
+REQUESTS_PER_MINUTE = 500
+TOKENS_PER_MINUTE = 200_000
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of one request (about four characters per token)."""
+    return (len(SYSTEM_PROMPT) + len(text)) // 4 + MAX_OUTPUT_TOKENS
+
+
+@dataclass
+class SummaryResult:
+    """Outcome of one text in a batch: a summary or the reason there is none."""
+    
+    summary: Optional[str] = None
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        """Whether a summary was produced."""
+        return self.summary is not None
 
 
 class AITaskSummarizer:
     """Optional AI-powered task summarization using OpenAI."""
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize the AI summarizer."""
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        self.client = None
+    def __init__(self, api_key: Optional[str] = None, cache_file: Optional[str] = None):
+        """Initialize the AI summarizer.
         
-        if self.api_key:
-            try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=self.api_key)
-            except ImportError:
-                pass  # Silently fail if OpenAI not installed
+        Responses are cached in memory and, when cache_file is given, in
+        that SQLite file so repeated descriptions cost no API call.
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self._client = None
+        self._client_checked = False
+        self.cache = SummaryCache(cache_file)
+    
+    @property
+    def client(self):
+        """OpenAI client, built on first use so sessions without AI never import openai."""
+        if not self._client_checked:
+            self._client_checked = True
+            if self.api_key:
+                try:
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=self.api_key)
+                except ImportError:
+                    pass  # Silently fail if OpenAI not installed
+        return self._client
     
     def is_available(self) -> bool:
         """Check if AI summarization is available."""
@@ -33,23 +81,147 @@ class AITaskSummarizer:
         if not self.is_available():
             return None
         
+        key = cache_key(MODEL, SYSTEM_PROMPT, TEMPERATURE, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.responses.create(
-                model="gpt-4o-mini",
+            return self._request(key, text)
+        except Exception:
+            return None  # Fail gracefully
+    
+    def _request(self, key: str, text: str) -> str:
+        """Ask the API for a summary and cache it (raises on failure)."""
+        response = self.client.responses.create(
+            model=MODEL,
+            input=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": text},
+            ],
+            max_output_tokens=MAX_OUTPUT_TOKENS,
+            temperature=TEMPERATURE,
+        )
+        summary = response.output_text.strip()
+        if not summary:
+            raise ValueError("empty response")
+        self.cache.put(key, summary)
+        return summary
+    
+    def summarize_many(
+        self,
+        texts: Sequence[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = TOKENS_PER_MINUTE,
+        limiter: Optional[RateLimiter] = None
+    ) -> List[SummaryResult]:
+        """Summarize many texts at once, returning one result per text in input order.
+        
+        Cached texts are answered directly and duplicates are requested
+        once. The rest run on up to concurrency threads, each request
+        first waiting on a token-bucket limiter for the requests/min and
+        tokens/min limits. A failed request only fails its own texts.
+        """
+        if not self.is_available():
+            return [SummaryResult(error="AI features not available") for _ in texts]
+        
+        done: Dict[str, SummaryResult] = {}
+        todo: Dict[str, str] = {}
+        keys = []
+        for text in texts:
+            key = cache_key(MODEL, SYSTEM_PROMPT, TEMPERATURE, text)
+            keys.append(key)
+            if key in done or key in todo:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                done[key] = SummaryResult(summary=cached)
+            else:
+                todo[key] = text
+        
+        if todo:
+            limiter = limiter or RateLimiter(requests_per_minute, tokens_per_minute)
+            
+            def run(key: str) -> SummaryResult:
+                limiter.acquire(estimate_tokens(todo[key]))
+                try:
+                    return SummaryResult(summary=self._request(key, todo[key]))
+                except Exception as exc:
+                    return SummaryResult(error=str(exc) or type(exc).__name__)
+            
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(todo)))) as pool:
+                done.update(zip(todo, pool.map(run, todo)))
+        return [done[key] for key in keys]
+    
+    def close(self) -> None:
+        """Close the response cache."""
+        self.cache.close()
+
+
+
+class AsyncAITaskSummarizer:
+    """asyncio variant of AITaskSummarizer built on AsyncOpenAI.
+    
+    One AsyncOpenAI client (and so one pooled HTTP connection set) is
+    created on first use and shared by every request until aclose().
+    Responses go through the same cache as AITaskSummarizer.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, cache_file: Optional[str] = None):
+        """Initialize the summarizer; no client is built until it is needed."""
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self._client = None
+        self._client_checked = False
+        self.cache = SummaryCache(cache_file)
+    
+    @property
+    def client(self):
+        """Shared AsyncOpenAI client, built on first use."""
+        if not self._client_checked:
+            self._client_checked = True
+            if self.api_key:
+                try:
+                    from openai import AsyncOpenAI
+                    self._client = AsyncOpenAI(api_key=self.api_key)
+                except ImportError:
+                    pass  # Silently fail if OpenAI not installed
+        return self._client
+    
+    def is_available(self) -> bool:
+        """Check if AI summarization is available."""
+        return self.client is not None
+    
+    async def summarize(self, text: str) -> Optional[str]:
+        """Summarize text without blocking the event loop (None on failure)."""
+        if not self.is_available():
+            return None
+        
+        key = cache_key(MODEL, SYSTEM_PROMPT, TEMPERATURE, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self.client.responses.create(
+                model=MODEL,
                 input=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You read a task description and answer with a concise, "
-                            "action-oriented phrase containing between three and eight words."
-                        ),
-                    },
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": text},
                 ],
-                max_output_tokens=60,
-                temperature=0.2,
+                max_output_tokens=MAX_OUTPUT_TOKENS,
+                temperature=TEMPERATURE,
             )
-            return response.output_text.strip()
+            summary = response.output_text.strip()
         except Exception:
             return None  # Fail gracefully
-
+        if summary:
+            self.cache.put(key, summary)
+        return summary or None
+    
+    async def aclose(self) -> None:
+        """Close the shared client's connections and the response cache."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        self.cache.close()
@@ -0,0 +1,93 @@
+"""
+Compressed archive tier for TaskMaster.
+Keeps finished tasks out of the hot store in an append-only gzip or lzma
+file that is only read when a search or statistics call asks for it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import lzma
+import os
+from typing import Iterable, Iterator, List, Optional
+
+from .loader import quarantine
+from .models import Task
+
+COMPRESSORS = {".gz": gzip, ".xz": lzma}
+
+
+class TaskArchive:
+    """Append-only archive of tasks stored as compressed JSON Lines.
+
+    Each append() writes one new gzip member (or xz stream) at the end of
+    the file, so existing data is never rewritten; both formats read
+    concatenated members back as one stream. The compression is chosen by
+    the file extension (.gz or .xz).
+    """
+
+    def __init__(self, path: str, task_class=Task, quarantine_file: Optional[str] = None):
+        """Create an archive at path (the file is created on first append).
+
+        Unreadable lines are skipped when iterating and, if quarantine_file
+        is given, copied there with the reason.
+        """
+        extension = os.path.splitext(path)[1]
+        if extension not in COMPRESSORS:
+            raise ValueError(
+                f"Unknown archive format: {extension or path}. Must be one of: {', '.join(COMPRESSORS)}"
+            )
+        self.path = path
+        self.task_class = task_class
+        self.quarantine_file = quarantine_file
+        self.skipped = 0  # bad lines seen by the last iteration
+        self._quarantined = set()  # bad lines already copied out this session
+        self._module = COMPRESSORS[extension]
+
+    def exists(self) -> bool:
+        """Check if anything has been archived yet."""
+        return os.path.exists(self.path)
+
+    def append(self, tasks: Iterable[Task], sync: bool = True) -> int:
+        """Append tasks to the archive, returning how many were written."""
+        lines = [json.dumps(task.to_dict(), separators=(',', ':')) + "\n" for task in tasks]
+        if not lines:
+            return 0
+        with open(self.path, 'ab') as raw:
+            with self._module.open(raw, 'wt', encoding='utf-8') as f:
+                f.writelines(lines)
+            if sync:
+                raw.flush()
+                os.fsync(raw.fileno())
+        return len(lines)
+
+    def __iter__(self) -> Iterator[Task]:
+        """Stream the archived tasks without loading the whole file."""
+        self.skipped = 0
+        if not self.exists():
+            return
+        bad = []
+        try:
+            with self._module.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        task = self.task_class(**json.loads(line))
+                    except (ValueError, TypeError, KeyError, AttributeError) as e:
+                        # A line torn by a crash during append, or edited by hand
+                        bad.append((line.rstrip("\n"), str(e) or type(e).__name__))
+                        continue
+                    yield task
+        except (EOFError, OSError, lzma.LZMAError, UnicodeDecodeError):
+            return  # A member cut short by a crash during append
+        finally:
+            self.skipped = len(bad)
+            new = [entry for entry in bad if entry[0] not in self._quarantined]
+            if self.quarantine_file and quarantine(self.quarantine_file, self.path, new):
+                self._quarantined.update(line for line, _ in new)
+
+    def load(self) -> List[Task]:
+        """Read every archived task (prefer iterating for large archives)."""
+        return list(self)
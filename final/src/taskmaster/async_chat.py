@@ -0,0 +1,177 @@
+"""
+asyncio chat loop for TaskMaster.
+AI suggestions run in the background on the event loop, so the prompt stays
+usable while they resolve; each one is announced when it is ready.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import signal
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from .ai import AsyncAITaskSummarizer
+from .chat import TaskMasterChat
+from .display import print_prompt, success, error, warning, info, ai_message
+
+
+class AsyncTaskMasterChat(TaskMasterChat):
+    """TaskMasterChat whose `ai` command does not block the prompt.
+
+    Commands still run one at a time on the event loop thread; only
+    reading the next line happens on a helper thread, which leaves the
+    loop free to finish AI requests and announce their suggestions.
+    `accept <n>` turns suggestion n into a task.
+    """
+
+    def __init__(self, data_file: str = "tasks.json", **options):
+        """Initialize the chat interface (options are passed to TaskManager)."""
+        super().__init__(data_file, **options)
+        self.data_file = data_file
+        self._summarizer: Optional[AsyncAITaskSummarizer] = None
+        self.suggestions: Dict[int, Tuple[str, str]] = {}  # number -> (title, description)
+        self._next_suggestion = 1
+        self._pending: Set[asyncio.Task] = set()
+        self._line: Optional[asyncio.Future] = None  # the line being read, if any
+
+    @property
+    def summarizer(self) -> AsyncAITaskSummarizer:
+        """Async AI summarizer, created by the first `ai` command."""
+        if self._summarizer is None:
+            self._summarizer = AsyncAITaskSummarizer(cache_file=f"{self.data_file}.summaries.db")
+        return self._summarizer
+
+    def start(self):
+        """Start the interactive chat session on an event loop."""
+        asyncio.run(self.run())
+
+    async def run(self):
+        """Read and run commands until exit, announcing AI suggestions as they arrive."""
+        self.greet()
+        try:
+            previous_handler = signal.signal(signal.SIGTERM, self._handle_sigterm)
+        except ValueError:  # not the main thread
+            previous_handler = None
+        try:
+            while self.running:
+                try:
+                    command = (await self._read_command()).strip()
+                    if command:
+                        self.run_command(command)
+                except KeyboardInterrupt:
+                    print(f"\n{info('Use exit or quit to leave TaskMaster')}")
+                except EOFError:
+                    break
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+            for task in self._pending:
+                task.cancel()
+            await asyncio.gather(*self._pending, return_exceptions=True)
+            if self._summarizer is not None:
+                await self._summarizer.aclose()
+            self.manager.close()
+        print(f"\n{success('Goodbye! Stay organized! 👋')}\n")
+
+    async def _read_command(self) -> str:
+        """Read one line on a daemon thread so the event loop keeps running.
+
+        Ctrl-C while waiting raises KeyboardInterrupt here, as in the
+        synchronous chat. The reader thread cannot be stopped, so it stays
+        blocked in input() and the next call waits on it again.
+        """
+        loop = asyncio.get_running_loop()
+        if self._line is None:
+            line = self._line = loop.create_future()
+
+            def read():
+                try:
+                    result = input(print_prompt())
+                except BaseException as exc:  # EOFError, or the interpreter shutting down
+                    loop.call_soon_threadsafe(_resolve, line, None, exc)
+                else:
+                    loop.call_soon_threadsafe(_resolve, line, result, None)
+
+            threading.Thread(target=read, daemon=True).start()
+        else:
+            print(print_prompt(), end="", flush=True)  # the interrupted reader's prompt
+
+        interrupted = loop.create_future()
+        try:
+            loop.add_signal_handler(signal.SIGINT, _resolve, interrupted, None, None)
+        except (NotImplementedError, RuntimeError, ValueError):  # Windows, or not the main thread
+            interrupted = None
+        try:
+            await asyncio.wait([f for f in (self._line, interrupted) if f is not None],
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if interrupted is not None:
+                # Back to KeyboardInterrupt, so Ctrl-C can still stop a running command
+                loop.remove_signal_handler(signal.SIGINT)
+        if not self._line.done():
+            raise KeyboardInterrupt
+        line, self._line = self._line, None
+        return line.result()
+
+    def process_command(self, command: str):
+        """Process a user command, handling `accept` here."""
+        parts = command.split()
+        if parts and parts[0].lower() == 'accept':
+            self.cmd_accept(parts[1:])
+        else:
+            super().process_command(command)
+
+    def cmd_ai_suggest(self, args: List[str]):
+        """Ask for an AI title suggestion in the background."""
+        if args[:1] == ["--stats"]:
+            super().cmd_ai_suggest(args)
+            return
+        if not self.summarizer.is_available():
+            print(warning("AI features not available. Set OPENAI_API_KEY environment variable."))
+            return
+        if not args:
+            print(error("Usage: ai <description>"))
+            return
+
+        description = " ".join(args)
+        number = self._next_suggestion
+        self._next_suggestion += 1
+        task = asyncio.get_running_loop().create_task(self._suggest(number, description))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        print(info(f"Asking AI for suggestion {number} in the background..."))
+
+    async def _suggest(self, number: int, description: str):
+        """Wait for one suggestion and announce it."""
+        title = await self.summarizer.summarize(description)
+        if title:
+            self.suggestions[number] = (title, description)
+            print(f"\n{ai_message(f'Suggestion {number} ready: {title}')}")
+            print(info(f"Type 'accept {number}' to create it"))
+        else:
+            print(f"\n{error(f'AI suggestion {number} failed')}")
+        print(print_prompt(), end="", flush=True)
+
+    def cmd_accept(self, args: List[str]):
+        """Create a task from a finished AI suggestion."""
+        try:
+            number = int(args[0])
+        except (IndexError, ValueError):
+            print(error("Usage: accept <suggestion number>"))
+            return
+        if number not in self.suggestions:
+            print(error(f"No suggestion {number} is ready"))
+            return
+        title, description = self.suggestions.pop(number)
+        self.manager.add_task(title, description)
+
+
+def _resolve(future: asyncio.Future, result, exc) -> None:
+    """Settle a future from the loop thread unless it was cancelled meanwhile."""
+    if future.done():
+        return
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
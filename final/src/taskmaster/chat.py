@@ -4,52 +4,101 @@ Provides a REPL (Read-Eval-Print Loop) for continuous task management.
 """
 
 from typing import List, Optional
+import argparse
+import signal
 import sys
 
 from .manager import TaskManager
+from .storage import STORAGE_BACKENDS, DURABILITY_POLICIES
 from .display import (
     print_welcome, print_prompt, print_task_list, 
-    print_task_details, print_statistics,
+    print_task_details, print_statistics, print_cache_statistics,
     success, error, warning, info, colorize, Colors, print_header
 )
 
 
+# Commands that may stop for a y/n answer or other input
+PROMPTING_COMMANDS = {
+    'add', 'new', 'create', 'delete', 'del', 'remove', 'rm',
+    'clear', 'clear-completed', 'retitle', 'ai',
+}
+
+
 class TaskMasterChat:
     """Interactive chat interface for TaskMaster."""
     
-    def __init__(self, data_file: str = "tasks.json"):
-        """Initialize the chat interface."""
-        self.manager = TaskManager(data_file)
+    def __init__(self, data_file: str = "tasks.json", **options):
+        """Initialize the chat interface (options are passed to TaskManager)."""
+        self.manager = TaskManager(data_file, **options)
         self.running = True
     
-    def start(self):
-        """Start the interactive chat session."""
+    def greet(self):
+        """Print the welcome banner, load report and quick stats."""
         print_welcome()
         
+        report = self.manager.load_report
+        if report and report["quarantined"]:
+            print(warning(f"Skipped {report['quarantined']} unreadable record(s) "
+                          f"(copied to {report['quarantine_file']})"))
+        if report and report["records"]:
+            print(info(f"Loaded {report['records']} task(s) in {report['seconds'] * 1000:.0f} ms "
+                       f"({report['records_per_second']:,.0f} records/s)"))
+        
         # Show quick stats on startup
-        if self.manager.tasks:
-            stats = self.manager.get_statistics()
+        stats = self.manager.get_statistics()
+        if stats['total']:
             print(info(f"You have {stats['total']} task(s) in your system."))
             if stats.get('overdue', 0) > 0:
                 print(warning(f"{stats['overdue']} task(s) are overdue!"))
             print()
+    
+    def start(self):
+        """Start the interactive chat session."""
+        self.greet()
         
-        while self.running:
-            try:
-                command = input(print_prompt()).strip()
-                
-                if not command:
-                    continue
-                
-                self.process_command(command)
-                
-            except KeyboardInterrupt:
-                print(f"\n{info('Use exit or quit to leave TaskMaster')}")
-            except EOFError:
-                break
-        
+        # SIGTERM unwinds like exit, so pending writes are flushed below
+        try:
+            previous_handler = signal.signal(signal.SIGTERM, self._handle_sigterm)
+        except ValueError:  # not the main thread
+            previous_handler = None
+        try:
+            while self.running:
+                try:
+                    command = input(print_prompt()).strip()
+                    
+                    if not command:
+                        continue
+                    
+                    self.run_command(command)
+                    
+                except KeyboardInterrupt:
+                    print(f"\n{info('Use exit or quit to leave TaskMaster')}")
+                except EOFError:
+                    break
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+            self.manager.close()
         print(f"\n{success('Goodbye! Stay organized! 👋')}\n")
     
+    def run_command(self, command: str):
+        """Run one command line against an up-to-date store."""
+        # Pick up changes other sessions made since the last command
+        self.manager.refresh()
+        if command.split()[0].lower() in PROMPTING_COMMANDS:
+            # Don't hold a transaction (a SQLite savepoint) open while waiting
+            # on the user; each of these saves its change in a single write
+            self.process_command(command)
+            return
+        # Each command is saved once, or not at all if interrupted
+        with self.manager.transaction():
+            self.process_command(command)
+    
+    @staticmethod
+    def _handle_sigterm(signum, frame):
+        """Turn SIGTERM into SystemExit so the session shuts down cleanly."""
+        raise SystemExit(128 + signum)
+    
     def process_command(self, command: str):
         """Process a user command."""
         parts = command.split()
@@ -79,13 +128,21 @@ class TaskMasterChat:
         elif cmd in ['search', 'find']:
             self.cmd_search(args)
         elif cmd in ['stats', 'statistics']:
-            self.cmd_stats()
+            self.cmd_stats(args)
         elif cmd in ['export']:
             self.cmd_export(args)
         elif cmd in ['clear', 'clear-completed']:
             self.cmd_clear_completed()
+        elif cmd in ['compact']:
+            self.cmd_compact()
+        elif cmd in ['archive']:
+            self.cmd_archive(args)
+        elif cmd in ['snapshot']:
+            self.cmd_snapshot()
         elif cmd in ['ai']:
             self.cmd_ai_suggest(args)
+        elif cmd in ['retitle']:
+            self.cmd_retitle(args)
         else:
             print(error(f"Unknown command: {cmd}"))
             print(info("Type 'help' for available commands"))
@@ -125,9 +182,10 @@ class TaskMasterChat:
     
     def cmd_list(self, args: List[str]):
         """List tasks."""
-        status_filter = args[0] if args and args[0] not in ["--sort-by", "--tag"] else None
+        status_filter = args[0] if args and args[0] not in ["--sort-by", "--tag", "--priority"] else None
         sort_by = "id"
         tag_filter = None
+        priority_filter = None
         
         i = 0
         while i < len(args):
@@ -137,10 +195,13 @@ class TaskMasterChat:
             elif args[i] == "--tag" and i + 1 < len(args):
                 tag_filter = args[i + 1]
                 i += 2
+            elif args[i] == "--priority" and i + 1 < len(args):
+                priority_filter = args[i + 1]
+                i += 2
             else:
                 i += 1
         
-        tasks = self.manager.list_tasks(status_filter, sort_by, tag_filter)
+        tasks = self.manager.list_tasks(status_filter, sort_by, tag_filter, priority_filter)
         print_task_list(tasks)
     
     def cmd_view(self, args: List[str]):
@@ -232,18 +293,25 @@ class TaskMasterChat:
     
     def cmd_search(self, args: List[str]):
         """Search for tasks."""
+        mode = "substring"
+        include_archive = "--archive" in args
+        args = [arg for arg in args if arg != "--archive"]
+        if args and args[0] in ["--all", "--any"]:
+            mode = args[0][2:]
+            args = args[1:]
+        
         if not args:
-            print(error("Usage: search <query>"))
+            print(error("Usage: search [--all|--any] [--archive] <query>"))
             return
         
         query = " ".join(args)
-        tasks = self.manager.search_tasks(query)
+        tasks = self.manager.search_tasks(query, mode, include_archive=include_archive)
         print(f"\n{info(f'Search results for: {query}')}")
         print_task_list(tasks)
     
-    def cmd_stats(self):
+    def cmd_stats(self, args: List[str]):
         """Show statistics."""
-        stats = self.manager.get_statistics()
+        stats = self.manager.get_statistics(include_archive="--archive" in args)
         print_statistics(stats)
     
     def cmd_export(self, args: List[str]):
@@ -259,8 +327,52 @@ class TaskMasterChat:
         else:
             print(info("Operation cancelled"))
     
+    def cmd_compact(self):
+        """Compact the storage journal into a fresh snapshot."""
+        self.manager.compact()
+    
+    def cmd_snapshot(self):
+        """Write the binary snapshot for read-only sessions."""
+        self.manager.write_snapshot()
+    
+    def cmd_archive(self, args: List[str]):
+        """Move old completed and cancelled tasks to the archive."""
+        try:
+            days = int(args[0]) if args else 30
+        except ValueError:
+            print(error("Usage: archive [days]"))
+            return
+        self.manager.archive_tasks(days)
+    
+    def cmd_retitle(self, args: List[str]):
+        """Retitle matching tasks from their descriptions with AI."""
+        status_filter = args[0] if args and not args[0].startswith("--") else None
+        tag_filter = None
+        priority_filter = None
+        
+        i = 0
+        while i < len(args):
+            if args[i] == "--tag" and i + 1 < len(args):
+                tag_filter = args[i + 1]
+                i += 2
+            elif args[i] == "--priority" and i + 1 < len(args):
+                priority_filter = args[i + 1]
+                i += 2
+            else:
+                i += 1
+        
+        confirm = input(colorize("Replace the titles of all matching tasks? (y/n): ", Colors.YELLOW)).lower()
+        if confirm == 'y':
+            self.manager.retitle_tasks(status_filter, tag_filter, priority_filter)
+        else:
+            print(info("Operation cancelled"))
+    
     def cmd_ai_suggest(self, args: List[str]):
         """Use AI to suggest a task title from description."""
+        if args[:1] == ["--stats"]:
+            print_cache_statistics(self.manager.ai_summarizer.cache.statistics(), "AI Cache", "responses")
+            return
+        
         if not self.manager.ai_summarizer.is_available():
             print(warning("AI features not available. Set OPENAI_API_KEY environment variable."))
             return
@@ -301,14 +413,22 @@ class TaskMasterChat:
             ]),
             ("Search & Analysis", [
                 ("search, find <query>", "Search tasks by keyword"),
-                ("stats, statistics", "Show task statistics"),
+                ("search --all|--any <words>", "Ranked word search (all / any words)"),
+                ("search --archive <query>", "Also search archived tasks"),
+                ("stats, statistics [--archive]", "Show task statistics (optionally with archive)"),
             ]),
             ("AI Features", [
                 ("ai [description]", "Get AI suggestion for task title"),
+                ("ai --stats", "Show AI response cache hits and misses"),
+                ("accept <n>", "Create a task from background suggestion n (--async)"),
+                ("retitle [status] [--tag T] [--priority P]", "AI-retitle matching tasks from their descriptions"),
             ]),
             ("Data Management", [
                 ("export [filename]", "Export tasks to CSV"),
                 ("clear, clear-completed", "Remove all completed tasks"),
+                ("compact", "Fold the journal into tasks.json (journal storage)"),
+                ("archive [days]", "Archive tasks finished over N days ago (default 30)"),
+                ("snapshot", "Write the snapshot used by --read-only sessions"),
             ]),
             ("System", [
                 ("help, h, ?", "Show this help message"),
@@ -336,9 +456,56 @@ class TaskMasterChat:
         print()
 
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options for the chat interface."""
+    parser = argparse.ArgumentParser(prog="taskmaster", description="TaskMaster interactive chat")
+    parser.add_argument("--data-file", default="tasks.json", help="Task data file (default: tasks.json)")
+    parser.add_argument("--storage", default="json", choices=list(STORAGE_BACKENDS),
+                        help="Storage backend (default: json)")
+    parser.add_argument("--import-json", metavar="FILE",
+                        help="Import tasks from a JSON file into SQLite storage")
+    parser.add_argument("--cache-size", type=int, metavar="TASKS",
+                        help="Most tasks kept in memory with --storage paged (default: 10000)")
+    parser.add_argument("--read-only", action="store_true",
+                        help="Answer queries from a memory-mapped snapshot; refuse changes")
+    parser.add_argument("--persist-index", action="store_true",
+                        help="Keep the full-text search index on disk between sessions")
+    parser.add_argument("--compact-tasks", action="store_true",
+                        help="Store tasks in a memory-compact form (for large task lists)")
+    parser.add_argument("--write-behind", type=float, nargs="?", const=0.2, metavar="SECONDS",
+                        help="Save in the background SECONDS after the last change (default: 0.2)")
+    parser.add_argument("--write-behind-max", type=float, default=2.0, metavar="SECONDS",
+                        help="Longest a change may wait before it is saved (default: 2.0)")
+    parser.add_argument("--durability", default="batch", choices=DURABILITY_POLICIES,
+                        help="When writes are synced to disk (default: batch)")
+    parser.add_argument("--group-commit-ms", type=int, default=100, metavar="MS",
+                        help="Group-commit window for --durability batch (default: 100)")
+    parser.add_argument("--async", dest="async_chat", action="store_true",
+                        help="Run AI suggestions in the background while you keep working")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Entry point for the chat interface."""
-    chat = TaskMasterChat()
+    args = parse_args(argv)
+    chat_class = TaskMasterChat
+    if args.async_chat:
+        from .async_chat import AsyncTaskMasterChat
+        chat_class = AsyncTaskMasterChat
+    chat = chat_class(
+        args.data_file,
+        storage=args.storage,
+        persist_search_index=args.persist_index,
+        compact_tasks=args.compact_tasks,
+        write_behind=args.write_behind,
+        write_behind_max=args.write_behind_max,
+        durability=args.durability,
+        group_commit_ms=args.group_commit_ms,
+        read_only=args.read_only,
+        cache_size=args.cache_size,
+    )
+    if args.import_json:
+        chat.manager.import_json(args.import_json)
     chat.start()
 
 
@@ -0,0 +1,205 @@
+"""
+Columnar task index for TaskMaster.
+Keeps status, priority, dates and tags in NumPy arrays so filters, sorts and
+statistics over very large task lists run as vectorized mask operations.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from .models import Task, VALID_STATUSES, VALID_PRIORITIES, PRIORITY_ORDER
+
+np = None  # NumPy, imported on first use so plain sessions never pay for it
+
+NO_DATE = 2 ** 31 - 1  # largest int32; sorts after every real date ordinal
+TAG_WORD_BITS = 64
+
+
+def numpy_available() -> bool:
+    """Import NumPy if installed (TaskManager falls back to its object indexes)."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+class ColumnStore:
+    """One row per task with coded, fixed-width columns.
+
+    Columns: id, status code, priority code, due ordinal and created
+    timestamp, plus a tag bitmap (bit j of a row is set if the task has
+    the j-th tag seen). Rows are updated in place by task ID; deleted rows
+    are only marked dead and dropped once they make up half the table.
+    Arrays grow by doubling, so adding a task is amortized O(1).
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()):
+        """Build the columns for tasks (requires NumPy)."""
+        if not numpy_available():
+            raise ImportError("ColumnStore requires NumPy")
+        self.statuses: List[str] = list(VALID_STATUSES)
+        self.priorities: List[str] = list(VALID_PRIORITIES)
+        self.tags: List[str] = []
+        self._codes = {"status": {v: i for i, v in enumerate(self.statuses)},
+                       "priority": {v: i for i, v in enumerate(self.priorities)}}
+        self._tag_bits: Dict[str, int] = {}
+        self._rows: Dict[int, int] = {}
+        self.size = 0
+        self.dead = 0
+        self._allocate(1024, 1)
+        for task in tasks:
+            self.add(task)
+
+    def _allocate(self, capacity: int, words: int) -> None:
+        """(Re)allocate the arrays, keeping the rows in use."""
+        old = getattr(self, "ids", None)
+        columns = {
+            "ids": np.zeros(capacity, np.int64),
+            "status": np.zeros(capacity, np.uint8),
+            "priority": np.zeros(capacity, np.uint8),
+            "due": np.full(capacity, NO_DATE, np.int32),
+            "created": np.full(capacity, np.nan, np.float64),
+            "live": np.zeros(capacity, np.bool_),
+            "tag_bits": np.zeros((capacity, words), np.uint64),
+        }
+        if old is not None:
+            for name, column in columns.items():
+                current = getattr(self, name)
+                if column.ndim == 2:
+                    column[:self.size, :current.shape[1]] = current[:self.size]
+                else:
+                    column[:self.size] = current[:self.size]
+        for name, column in columns.items():
+            setattr(self, name, column)
+
+    def _code(self, kind: str, value: str) -> int:
+        """Get the code of a status or priority, adding unknown values."""
+        codes = self._codes[kind]
+        if value not in codes:
+            values = self.statuses if kind == "status" else self.priorities
+            if len(values) == 255:
+                raise ValueError(f"Too many distinct {kind} values for a ColumnStore")
+            codes[value] = len(values)
+            values.append(value)
+        return codes[value]
+
+    def _tag_bit(self, tag: str) -> int:
+        """Get the bit number of a tag, widening the bitmap for new tags."""
+        if tag not in self._tag_bits:
+            bit = len(self.tags)
+            if bit >= self.tag_bits.shape[1] * TAG_WORD_BITS:
+                self._allocate(len(self.ids), self.tag_bits.shape[1] * 2)
+            self._tag_bits[tag] = bit
+            self.tags.append(tag)
+        return self._tag_bits[tag]
+
+    def add(self, task: Task) -> None:
+        """Write a task's row, reusing its old row if it had one."""
+        row = self._rows.get(task.id)
+        if row is None:
+            if self.size == len(self.ids):
+                self._allocate(2 * len(self.ids), self.tag_bits.shape[1])
+            row = self._rows[task.id] = self.size
+            self.size += 1
+        elif not self.live[row]:
+            self.dead -= 1
+        self.ids[row] = task.id
+        self.status[row] = self._code("status", task.status)
+        self.priority[row] = self._code("priority", task.priority)
+        self.due[row] = NO_DATE if task.due_ordinal is None else task.due_ordinal
+        self.created[row] = np.nan if task.created_timestamp is None else task.created_timestamp
+        bits = [self._tag_bit(tag) for tag in task.tags]
+        self.tag_bits[row] = 0
+        for bit in bits:
+            self.tag_bits[row, bit // TAG_WORD_BITS] |= np.uint64(1 << (bit % TAG_WORD_BITS))
+        self.live[row] = True
+
+    def remove(self, task: Task) -> None:
+        """Mark a task's row dead, compacting once half the rows are dead."""
+        row = self._rows.get(task.id)
+        if row is None or not self.live[row]:
+            return
+        self.live[row] = False
+        self.dead += 1
+        if self.dead > 1024 and self.dead * 2 > self.size:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop dead rows."""
+        keep = np.flatnonzero(self.live[:self.size])
+        for name in ("ids", "status", "priority", "due", "created", "live", "tag_bits"):
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+        self.live[len(keep):self.size] = False
+        self.size, self.dead = len(keep), 0
+        self._rows = {int(task_id): row for row, task_id in enumerate(self.ids[:self.size])}
+
+    def _tag_mask(self, tag: str):
+        """Mask of the rows carrying a tag."""
+        bit = self._tag_bits.get(tag)
+        if bit is None:
+            return np.zeros(self.size, np.bool_)
+        word = self.tag_bits[:self.size, bit // TAG_WORD_BITS]
+        return (word & np.uint64(1 << (bit % TAG_WORD_BITS))) != 0
+
+    def select(
+        self,
+        status_filter: Optional[str] = None,
+        sort_by: str = "id",
+        tag_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None
+    ) -> List[int]:
+        """Get the IDs of matching tasks in list_tasks order.
+
+        Due dates sort by day and created times by timestamp, with missing
+        or invalid values last; ties stay in ID order.
+        """
+        mask = self.live[:self.size].copy()
+        if status_filter:
+            code = self._codes["status"].get(status_filter.lower())
+            mask &= self.status[:self.size] == code if code is not None else False
+        if priority_filter:
+            code = self._codes["priority"].get(priority_filter.lower())
+            mask &= self.priority[:self.size] == code if code is not None else False
+        if tag_filter:
+            mask &= self._tag_mask(tag_filter)
+
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(self.ids[rows], kind="stable")]
+        if sort_by == "priority":
+            order = np.array([PRIORITY_ORDER.get(p, 3) for p in self.priorities], np.uint8)
+            rows = rows[np.argsort(order[self.priority[rows]], kind="stable")]
+        elif sort_by == "due_date":
+            rows = rows[np.argsort(self.due[rows], kind="stable")]
+        elif sort_by == "created":
+            rows = rows[np.argsort(self.created[rows], kind="stable")]
+        return self.ids[rows].tolist()
+
+    def statistics(self, today: int) -> Dict:
+        """Count tasks by status and priority, overdue tasks and tags in use."""
+        live = self.live[:self.size]
+        total = int(np.count_nonzero(live))
+        if total == 0:
+            return {"total": 0}
+
+        status = self.status[:self.size][live]
+        priority = self.priority[:self.size][live]
+        by_status = np.bincount(status, minlength=len(self.statuses))
+        by_priority = np.bincount(priority, minlength=len(self.priorities))
+        overdue = (self.due[:self.size][live] < today) & (status != self._codes["status"]["completed"])
+        used = np.bitwise_or.reduce(self.tag_bits[:self.size][live], axis=0)
+        return {
+            "total": total,
+            "by_status": {value: int(n) for value, n in zip(self.statuses, by_status) if n},
+            "by_priority": {value: int(n) for value, n in zip(self.priorities, by_priority) if n},
+            "overdue": int(np.count_nonzero(overdue)),
+            "tags": {
+                tag for tag, bit in self._tag_bits.items()
+                if int(used[bit // TAG_WORD_BITS]) >> (bit % TAG_WORD_BITS) & 1
+            },
+        }
@@ -3,7 +3,7 @@ Display and formatting utilities for TaskMaster.
 Provides colored output and pretty-printing functions.
 """
 
-from typing import List, Dict
+from typing import Dict, Iterable, Optional
 from .models import Task
 
 # ANSI color codes
@@ -93,18 +93,17 @@ def print_separator(width: int = 80):
     print(colorize("-" * width, Colors.GRAY))
 
 
-def print_task_list(tasks: List[Task]) -> None:
-    """Pretty-print a list of tasks with colors."""
-    if not tasks:
-        print(warning("No tasks found."))
-        return
-    
-    # Header
-    header = f"{'ID':<5} {'Title':<30} {'Priority':<10} {'Status':<15} {'Due Date':<12} {'Tags':<15}"
-    print(f"\n{colorize(header, Colors.BOLD)}")
-    print_separator(95)
-    
+def print_task_list(tasks: Iterable[Task]) -> None:
+    """Pretty-print tasks with colors, printing each one as it arrives."""
+    printed = False
     for task in tasks:
+        if not printed:
+            # Header
+            header = f"{'ID':<5} {'Title':<30} {'Priority':<10} {'Status':<15} {'Due Date':<12} {'Tags':<15}"
+            print(f"\n{colorize(header, Colors.BOLD)}")
+            print_separator(95)
+            printed = True
+        
         # Overdue indicator
         overdue_mark = colorize("⚠️ ", Colors.RED) if task.is_overdue() else "   "
         
@@ -126,6 +125,9 @@ def print_task_list(tasks: List[Task]) -> None:
         print(f"{task.id:<5} {overdue_mark}{title:<27} {priority:<18} {status:<23} "
               f"{due:<12} {colorize(tags_str, Colors.CYAN)}")
     
+    if not printed:
+        print(warning("No tasks found."))
+        return
     print()
 
 
@@ -161,11 +163,15 @@ def print_statistics(stats: Dict) -> None:
     total = stats.get("total", 0)
     if total == 0:
         print(warning("No tasks in the system."))
+        print_cache_statistics(stats.get("cache"))
         return
     
     print_header("Task Statistics", 70)
     
-    print(f"{colorize('Total Tasks:', Colors.BOLD)} {colorize(str(total), Colors.GREEN + Colors.BOLD)}\n")
+    print(f"{colorize('Total Tasks:', Colors.BOLD)} {colorize(str(total), Colors.GREEN + Colors.BOLD)}")
+    if stats.get("archived"):
+        print(colorize(f"  (including {stats['archived']} archived)", Colors.GRAY))
+    print()
     
     print(colorize("By Status:", Colors.BOLD))
     for status, count in stats.get("by_status", {}).items():
@@ -198,9 +204,22 @@ def print_statistics(stats: Dict) -> None:
         tags_text = ', '.join(sorted(tags))
         print(f"\n{colorize('Active Tags:', Colors.BOLD)} {colorize(tags_text, Colors.CYAN)}")
     
+    print_cache_statistics(stats.get("cache"))
     print(colorize("=" * 70, Colors.CYAN) + "\n")
 
 
+def print_cache_statistics(cache: Optional[Dict], label: str = "Task Cache", unit: str = "tasks") -> None:
+    """Print the counters of a cache (paged storage's tasks or AI responses), if any."""
+    if not cache:
+        return
+    lookups = cache["hits"] + cache["misses"]
+    hit_rate = f"{cache['hits'] / lookups * 100:.1f}%" if lookups else "n/a"
+    print(f"\n{colorize(label + ':', Colors.BOLD)} "
+          f"{cache['size']}/{cache['capacity']} {unit}, "
+          f"{cache['hits']} hits, {cache['misses']} misses "
+          f"{colorize(f'(hit rate {hit_rate})', Colors.GRAY)}")
+
+
 def print_welcome():
     """Print welcome banner."""
     banner = """
@@ -0,0 +1,191 @@
+"""
+Streaming, fault-isolating task loader for TaskMaster.
+Parses a JSON task list one record at a time, so a single bad record or a
+truncated file costs that record instead of the whole task list.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from datetime import datetime
+from typing import Dict, IO, Iterator, List, Optional, Set, Tuple
+
+from .models import Task
+
+CHUNK_SIZE = 64 * 1024
+MAX_RECORD_BYTES = 1024 * 1024
+WHITESPACE = " \t\r\n"
+NEXT_RECORD = re.compile(r",\s*(?=\{)")
+
+
+def iter_json_array(f: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[object, Optional[str]]]:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Each item is (value, None) for an element that parsed, or (None, text)
+    for a stretch that did not; parsing resumes at the next object. Only one
+    element (at most MAX_RECORD_BYTES) plus one chunk is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def fill() -> None:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    def skip_whitespace() -> bool:
+        """Advance past whitespace, returning False at the end of the file."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if eof:
+                return False
+            fill()
+
+    if not skip_whitespace():
+        return
+    if buffer[pos] != "[":
+        rest = buffer[pos:] + f.read()
+        yield None, rest
+        return
+    pos += 1
+
+    while skip_whitespace():
+        char = buffer[pos]
+        if char == "]":
+            return
+        if char == ",":
+            pos += 1
+            continue
+        try:
+            value, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not eof and len(buffer) - pos < MAX_RECORD_BYTES:
+                fill()  # Probably just cut off at the end of the chunk
+                continue
+            match = NEXT_RECORD.search(buffer, pos + 1)
+            if match is None and not eof:
+                # Skip the unparseable stretch, keeping memory bounded
+                bad, pos = buffer[pos:], len(buffer)
+                yield None, bad
+                continue
+            end = match.start() if match else len(buffer)
+            bad = buffer[pos:end]
+            pos = match.end() if match else len(buffer)
+            yield None, bad.rstrip(WHITESPACE + "]")
+            continue
+        yield value, None
+
+
+def check_task_dict(data) -> Optional[str]:
+    """Check a decoded record has the basic shape of a task (None if fine)."""
+    if not isinstance(data, dict):
+        return "record is not an object"
+    if not isinstance(data.get("id"), int) or isinstance(data.get("id"), bool):
+        return "missing or non-integer id"
+    if not isinstance(data.get("title"), str):
+        return "missing or non-string title"
+    if not isinstance(data.get("tags", []), list):
+        return "tags is not a list"
+    return None
+
+
+def quarantine_key(source: str, record) -> str:
+    """Hash a quarantined record and where it came from, to spot repeats."""
+    payload = json.dumps([source, record], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _quarantined_keys(path: str) -> Set[str]:
+    """Keys of the entries already in a quarantine file."""
+    keys = set()
+    try:
+        with open(path, 'r', errors='replace') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    keys.add(quarantine_key(entry["source"], entry["record"]))
+                except (ValueError, TypeError, KeyError):
+                    continue
+    except IOError:
+        pass
+    return keys
+
+
+def quarantine(path: str, source: str, entries: List[Tuple[object, str]]) -> bool:
+    """Append bad records with their errors to a JSON Lines side file.
+    
+    A record already quarantined from the same source is not written again,
+    so loading a store that still holds it does not grow the file.
+    """
+    if not entries:
+        return True
+    seen = _quarantined_keys(path)
+    now = datetime.now().isoformat()
+    try:
+        with open(path, 'a') as f:
+            for record, reason in entries:
+                key = quarantine_key(source, record)
+                if key in seen:
+                    continue
+                seen.add(key)
+                f.write(json.dumps({
+                    "quarantined_at": now,
+                    "source": source,
+                    "error": reason,
+                    "record": record,
+                }) + "\n")
+        return True
+    except (IOError, TypeError, ValueError):
+        return False
+
+
+def load_tasks(path: str, task_class=Task, quarantine_file: Optional[str] = None) -> Tuple[List[Task], Dict]:
+    """Stream tasks from a JSON task list, setting bad records aside.
+
+    Returns the tasks that loaded and a report with the counts, the time
+    taken and the load rate. Records that fail to parse or validate (or
+    repeat an earlier ID) are written to quarantine_file if given.
+    """
+    start = time.perf_counter()
+    tasks: Dict[int, Task] = {}
+    bad: List[Tuple[object, str]] = []
+    with open(path, 'r') as f:
+        for record, text in iter_json_array(f):
+            if text is not None:
+                if text.strip():
+                    bad.append((text, "unparseable JSON"))
+                continue
+            reason = check_task_dict(record)
+            if reason is None and record["id"] in tasks:
+                reason = "duplicate id"
+            if reason is None:
+                try:
+                    tasks[record["id"]] = task_class(**record)
+                except (TypeError, ValueError) as e:
+                    reason = str(e)
+            if reason is not None:
+                bad.append((record, reason))
+
+    if quarantine_file is not None:
+        quarantine(quarantine_file, path, bad)
+    return list(tasks.values()), load_report(len(tasks), len(bad), quarantine_file, start)
+
+
+def load_report(records: int, quarantined: int, quarantine_file: Optional[str], start: float) -> Dict:
+    """Summarize a load that began at perf_counter() value start."""
+    seconds = time.perf_counter() - start
+    return {
+        "records": records,
+        "quarantined": quarantined,
+        "quarantine_file": quarantine_file,
+        "seconds": seconds,
+        "records_per_second": records / seconds if seconds > 0 else 0.0,
+    }
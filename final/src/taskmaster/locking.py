@@ -0,0 +1,59 @@
+"""
+Inter-process file locking for TaskMaster.
+Uses advisory fcntl locks where available so several sessions and scripts
+can share one task store.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to locking within this process only
+    fcntl = None
+
+
+class FileLock:
+    """Advisory lock on a lock file, reentrant within one process.
+
+    acquire(shared=True) lets several readers in at once; acquire() is
+    exclusive. Nested acquisitions from the same thread reuse the lock held
+    by the outermost one (upgrading a shared lock to exclusive if needed).
+    """
+
+    def __init__(self, path: str):
+        """Create a lock backed by the file at path (created on first use)."""
+        self.path = path
+        self._mutex = threading.RLock()
+        self._fd = None
+        self._depth = 0
+        self._shared = False
+
+    @contextmanager
+    def acquire(self, shared: bool = False):
+        """Hold the lock for the duration of the block."""
+        with self._mutex:
+            if self._depth == 0:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._shared = shared
+                self._flock("LOCK_SH" if shared else "LOCK_EX")
+            elif self._shared and not shared:
+                self._shared = False
+                self._flock("LOCK_EX")
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._flock("LOCK_UN")
+                    os.close(self._fd)
+                    self._fd = None
+
+    def _flock(self, operation: str) -> None:
+        """Apply a flock operation (by name) if the platform supports it."""
+        if fcntl is not None:
+            fcntl.flock(self._fd, getattr(fcntl, operation))
@@ -5,53 +5,425 @@ Handles CRUD operations, persistence, and task queries.
 
 from __future__ import annotations
 
-import json
-import os
 import csv
-from typing import List, Dict, Optional
+from bisect import bisect_left, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, List, Dict, Iterable, Iterator, Optional, Set
 
-from .models import Task, VALID_STATUSES, VALID_PRIORITIES, PRIORITY_ORDER
-from .ai import AITaskSummarizer
-from .display import success, error, warning, ai_message
+from .models import (
+    Task, CompactTask, VALID_STATUSES, VALID_PRIORITIES, PRIORITY_ORDER, today_ordinal, parse_timestamp
+)
+from .display import success, error, warning, info, ai_message
+from .storage import create_storage, apply_record
+from .writer import WriteBehindStorage
+from .search_index import InvertedIndex, TrigramIndex, SEARCH_MODES, match_score, tokenize
+from .archive import TaskArchive
+from .columns import ColumnStore, numpy_available
+
+if TYPE_CHECKING:
+    from .ai import AITaskSummarizer
+
+TEXT_FIELDS = {"title", "description", "tags"}
 
 
 class TaskManager:
     """Manages tasks with persistence, AI features, and comprehensive operations."""
     
-    def __init__(self, data_file: str = "tasks.json"):
-        """Initialize the task manager with a data file."""
+    def __init__(
+        self,
+        data_file: str = "tasks.json",
+        storage: str = "json",
+        persist_search_index: bool = False,
+        compact_tasks: bool = False,
+        write_behind: Optional[float] = None,
+        write_behind_max: float = 2.0,
+        durability: str = "batch",
+        group_commit_ms: int = 100,
+        archive_file: Optional[str] = None,
+        read_only: bool = False,
+        columnar: bool = False,
+        cache_size: Optional[int] = None
+    ):
+        """Initialize the task manager with a data file.
+        
+        storage selects the backend: "json" rewrites the whole file on every
+        change, "journal" appends each change to a log next to it, "jsonl"
+        keeps one task per line and rewrites only changed lines
+        (tasks.json -> tasks.jsonl), "paged" reads that same file on demand
+        through an LRU cache of cache_size tasks, "sharded" spreads tasks over several
+        files and loads them on demand (tasks.json -> tasks.shards/), and
+        "sqlite" keeps tasks in an indexed database (tasks.json -> tasks.db).
+        persist_search_index keeps the full-text index in <data_file>.idx
+        between sessions. compact_tasks stores tasks as CompactTask objects
+        to cut memory use on large task lists. write_behind saves changes
+        from a background thread that many seconds after the last one (and
+        at most write_behind_max seconds after the first); close() flushes.
+        durability is "always" (fsync every write), "batch" (group journal
+        fsyncs every group_commit_ms) or "none" (leave it to the OS).
+        archive_tasks() moves old finished tasks to archive_file (default
+        <data_file>.archive.gz; use .xz for lzma). read_only answers
+        queries from the memory-mapped <data_file>.snap snapshot (rebuilt
+        first if the store has changed since) and refuses changes.
+        columnar answers list_tasks and get_statistics from NumPy columns
+        (ignored with a warning if NumPy is not installed). cache_size caps
+        how many tasks "paged" storage keeps in memory. AI summaries are
+        cached in <data_file>.summaries.db.
+        """
         self.data_file = data_file
-        self.tasks: List[Task] = self._load_tasks()
-        self.ai_summarizer = AITaskSummarizer()
+        self.durability = durability
+        self.index_file = f"{data_file}.idx"
+        self.persist_search_index = persist_search_index
+        self.task_class = CompactTask if compact_tasks else Task
+        options = {}
+        if cache_size is not None:
+            if storage == "paged":
+                options["cache_size"] = cache_size
+            else:
+                print(warning("A cache size only applies to paged storage"))
+        self.storage = create_storage(
+            storage, data_file, task_class=self.task_class,
+            durability=durability, group_commit_ms=group_commit_ms, **options
+        )
+        if read_only:
+            from .snapshot import SnapshotStorage
+            try:
+                self.storage = SnapshotStorage.open_for(self.storage, data_file, self.task_class)
+            except OSError as e:
+                print(warning(f"{e}; reading the store directly instead"))
+                self.storage.read_only = True  # still refuse changes
+        self.archive = TaskArchive(archive_file or f"{data_file}.archive.gz", self.task_class,
+                                   f"{data_file}.quarantine")
+        if write_behind is not None:
+            if self.storage.in_memory:
+                self.storage = WriteBehindStorage(self.storage, write_behind, write_behind_max)
+            else:
+                print(warning("Write-behind only applies to JSON and journal storage"))
+        self._text_index: Optional[InvertedIndex] = None
+        self._trigram_index: Optional[TrigramIndex] = None
+        self._loaded_signature = None
+        self._by_id: Dict[int, Task] = {}
+        self._by_status: Dict[str, Set[int]] = defaultdict(set)
+        self._by_priority: Dict[str, Set[int]] = defaultdict(set)
+        self._by_tag: Dict[str, Set[int]] = defaultdict(set)
+        self._open_due: List[int] = []  # sorted due ordinals of unfinished tasks
+        self._columns: Optional[ColumnStore] = None
+        if columnar and self.storage.in_memory:
+            if numpy_available():
+                self._columns = ColumnStore()
+            else:
+                print(warning("NumPy is not installed; using the standard indexes"))
+        self._next_id = 1
+        self._undo: Optional[List] = None     # set while a transaction is open
+        self._pending: Optional[List[Dict]] = None
+        self.tasks = self._load_tasks() if self.storage.in_memory else []
+        if self.storage.in_memory:
+            self._loaded_signature = self.storage.signature()
+        self._ai_summarizer: Optional[AITaskSummarizer] = None
     
-    def _load_tasks(self) -> List[Task]:
-        """Load tasks from the JSON file."""
-        if not os.path.exists(self.data_file):
-            return []
+    @property
+    def ai_summarizer(self) -> AITaskSummarizer:
+        """AI summarizer, created the first time an AI feature is used."""
+        if self._ai_summarizer is None:
+            from .ai import AITaskSummarizer
+            self._ai_summarizer = AITaskSummarizer(cache_file=f"{self.data_file}.summaries.db")
+        return self._ai_summarizer
+    
+    @property
+    def tasks(self) -> List[Task]:
+        """All tasks (fetched from the database for SQLite storage)."""
+        if not self.storage.in_memory:
+            return self.storage.load()
+        return list(self._by_id.values())
+    
+    @tasks.setter
+    def tasks(self, tasks: Iterable[Task]) -> None:
+        """Replace all in-memory tasks and rebuild the indexes."""
+        self._by_id = {}
+        self._by_status.clear()
+        self._by_priority.clear()
+        self._by_tag.clear()
+        self._open_due = []
+        self._text_index = None
+        self._trigram_index = None
+        for task in tasks:
+            self._index_task(task, bulk=True)
+        self._open_due.sort()
+        if self._columns is not None:
+            self._columns = ColumnStore(self._by_id.values())
+        self._next_id = max(self.storage.next_id, max(self._by_id, default=0) + 1)
+    
+    def _index_task(self, task: Task, bulk: bool = False) -> None:
+        """Add a task to the in-memory indexes."""
+        self._by_id[task.id] = task
+        self._index_fields(task, bulk)
+        for index in self._built_text_indexes():
+            index.add(task)
+        if self._undo is not None and not bulk:
+            self._undo.append(("added", task, None))
+    
+    def _unindex_task(self, task: Task) -> None:
+        """Remove a task from the in-memory indexes."""
+        del self._by_id[task.id]
+        self._unindex_fields(task)
+        for index in self._built_text_indexes():
+            index.remove(task)
+        if self._undo is not None:
+            self._undo.append(("removed", task, None))
+    
+    def _index_fields(self, task: Task, bulk: bool = False) -> None:
+        """Add a task to the status, priority, tag and due date indexes.
         
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                return [Task(**task_dict) for task_dict in data]
-        except (json.JSONDecodeError, IOError):
-            return []
-        except TypeError:
-            return []
+        With bulk=True due dates are appended unsorted; the caller sorts
+        _open_due once at the end. In columnar mode the column store
+        replaces these indexes (and is rebuilt in one go after a bulk load).
+        """
+        if self._columns is not None:
+            if not bulk:
+                self._columns.add(task)
+            return
+        
+        self._by_status[task.status].add(task.id)
+        self._by_priority[task.priority].add(task.id)
+        for tag in task.tags:
+            self._by_tag[tag].add(task.id)
+        
+        ordinal = self._open_due_ordinal(task)
+        if ordinal is not None:
+            if bulk:
+                self._open_due.append(ordinal)
+            else:
+                insort(self._open_due, ordinal)
+    
+    def _unindex_fields(self, task: Task) -> None:
+        """Remove a task from the status, priority, tag and due date indexes."""
+        if self._columns is not None:
+            self._columns.remove(task)
+            return
+        
+        ordinal = self._open_due_ordinal(task)
+        if ordinal is not None:
+            del self._open_due[bisect_left(self._open_due, ordinal)]
+        
+        for index, keys in (
+            (self._by_status, [task.status]),
+            (self._by_priority, [task.priority]),
+            (self._by_tag, task.tags),
+        ):
+            for key in keys:
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(task.id)
+                    if not ids:
+                        del index[key]
+    
+    @staticmethod
+    def _open_due_ordinal(task: Task) -> Optional[int]:
+        """Get the due ordinal of a task that can still become overdue."""
+        if task.status == "completed":
+            return None
+        return task.due_ordinal
+    
+    def _update_fields(self, task: Task, fields: Dict) -> None:
+        """Set task fields while keeping the indexes up to date."""
+        if self._undo is not None:
+            before = {field: getattr(task, field) for field in fields}
+            self._undo.append(("updated", task, before))
+        text_indexes = self._built_text_indexes() if not TEXT_FIELDS.isdisjoint(fields) else []
+        if self.storage.in_memory:
+            self._unindex_fields(task)
+        for index in text_indexes:
+            index.remove(task)
+        for field, value in fields.items():
+            setattr(task, field, value)
+        if self.storage.in_memory:
+            self._index_fields(task)
+        for index in text_indexes:
+            index.add(task)
+    
+    def _built_text_indexes(self) -> List:
+        """Get the search indexes that have been built so far."""
+        return [index for index in (self._text_index, self._trigram_index) if index is not None]
+    
+    def _search_index(self) -> InvertedIndex:
+        """Get the full-text index, loading or building it on first use."""
+        if self._text_index is None:
+            if self.persist_search_index and self._loaded_signature is not None:
+                self._text_index = InvertedIndex.load(self.index_file, self._loaded_signature)
+            if self._text_index is None:
+                self._text_index = InvertedIndex.build(self._by_id.values())
+        return self._text_index
+    
+    def _substring_index(self) -> TrigramIndex:
+        """Get the trigram index, building it on first use."""
+        if self._trigram_index is None:
+            self._trigram_index = TrigramIndex.build(self._by_id.values())
+        return self._trigram_index
+    
+    def _load_tasks(self) -> List[Task]:
+        """Load tasks from storage."""
+        return self.storage.load()
     
     def _save_tasks(self) -> bool:
-        """Save tasks to the JSON file."""
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump([task.to_dict() for task in self.tasks], f, indent=2)
+        """Save all tasks to storage."""
+        return self.storage.save(self._by_id.values())
+    
+    def _writable(self) -> bool:
+        """Check the store accepts changes, reporting it if not."""
+        if getattr(self.storage, "read_only", False):
+            print(error("Task store is open read-only"))
+            return False
+        return True
+    
+    def _commit(self, record: Dict) -> bool:
+        """Persist a single mutation record (deferred inside a transaction)."""
+        if not self._writable():
+            return False
+        self._loaded_signature = None
+        if self._pending is not None:
+            self._pending.append(record)
             return True
-        except IOError:
+        return self._persist([record])
+    
+    def _persist(self, records: List[Dict]) -> bool:
+        """Write mutation records, first merging in changes from other processes."""
+        if not self.storage.in_memory:
+            saved = self.storage.apply_batch(records, ())
+            self._report_renumbered()
+            return saved
+        with self.storage.lock():
+            if self.storage.is_stale():
+                self._merge(records)
+            return self.storage.apply_batch(records, self._by_id.values())
+    
+    def _merge(self, records: List[Dict]) -> None:
+        """Reload the newer store from disk and replay our records on top.
+        
+        Updates and deletes apply field by field to the fresh tasks. A task
+        we added whose ID was taken by another process meanwhile gets the
+        next free ID; the records are rewritten to match.
+        """
+        fresh = {task.id: task for task in self.storage.load()}
+        next_id = max(self.storage.next_id, max(fresh, default=0) + 1)
+        renumbered: Dict[int, int] = {}
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                task_id = record["task"]["id"]
+                task = self._by_id.get(task_id) or self.task_class(**record["task"])
+                if task_id in fresh:
+                    task.id = renumbered[task_id] = next_id
+                    record["task"]["id"] = task.id
+                    print(warning(f"Task {task_id} is now task {task.id} (ID taken by another session)"))
+                fresh[task.id] = task
+                next_id = max(next_id, task.id + 1)
+            else:
+                if op == "update":
+                    record["id"] = renumbered.get(record["id"], record["id"])
+                elif op == "delete":
+                    record["ids"] = [renumbered.get(i, i) for i in record["ids"]]
+                apply_record(fresh, record, self.task_class)
+        self.tasks = fresh.values()
+        self.storage.next_id = self._next_id
+    
+    def _report_renumbered(self) -> None:
+        """Warn about new tasks a self-managing backend moved to a free ID on write."""
+        renumbered = getattr(self.storage, "renumbered", None)
+        if not renumbered:
+            return
+        for old_id, new_id in sorted(renumbered.items()):
+            print(warning(f"Task {old_id} is now task {new_id} (ID taken by another session)"))
+        renumbered.clear()
+    
+    @property
+    def load_report(self) -> Optional[Dict]:
+        """Counts and timing of the last load from disk (None if not tracked)."""
+        return getattr(self.storage, "last_load", None)
+    
+    def has_changed(self) -> bool:
+        """Check (with a few stat calls) if another process changed the store."""
+        return self.storage.in_memory and self.storage.changed()
+    
+    def refresh(self) -> bool:
+        """Reload tasks if another process changed the store since we last synced."""
+        if not self.has_changed():
             return False
+        self.tasks = self._load_tasks()
+        return True
+    
+    @contextmanager
+    def transaction(self):
+        """Group mutations so they are persisted once, when the block exits.
+        
+        If the block raises, every change made inside it is undone in memory
+        and nothing is written. Transactions may be nested; an inner block
+        that raises only undoes its own changes. SQLite storage runs the
+        block inside a database transaction instead.
+        """
+        if not self.storage.in_memory:
+            try:
+                with self.storage.transaction():
+                    yield self
+            finally:
+                self._report_renumbered()
+            return
+        
+        outermost = self._undo is None
+        if outermost:
+            self._undo, self._pending = [], []
+        undo_mark, pending_mark = len(self._undo), len(self._pending)
+        next_id = self._next_id
+        try:
+            yield self
+        except BaseException:
+            self._rollback(undo_mark)
+            del self._pending[pending_mark:]
+            self._next_id = self.storage.next_id = next_id
+            if outermost:
+                self._undo = self._pending = None
+            raise
+        
+        if outermost:
+            records = self._pending
+            self._undo = self._pending = None
+            if records and not self._persist(records):
+                print(error("Failed to save changes"))
+    
+    def batch(self):
+        """Alias for transaction(), for bulk scripts."""
+        return self.transaction()
+    
+    def _rollback(self, mark: int) -> None:
+        """Undo in-memory changes logged after position mark."""
+        undo, self._undo = self._undo, None  # don't log the undo steps
+        restored = False
+        try:
+            while len(undo) > mark:
+                action, task, before = undo.pop()
+                if action == "added":
+                    self._unindex_task(task)
+                elif action == "removed":
+                    self._index_task(task)
+                    restored = True
+                else:
+                    self._update_fields(task, before)
+        finally:
+            self._undo = undo
+        if restored:
+            self._by_id = dict(sorted(self._by_id.items()))
     
     def _get_next_id(self) -> int:
-        """Get the next available task ID."""
-        if not self.tasks:
-            return 1
-        return max(task.id for task in self.tasks) + 1
+        """Get the next available task ID.
+        
+        IDs come from a high-water mark kept by storage, so deleting the
+        newest task never causes its ID to be handed out again.
+        """
+        if not self.storage.in_memory:
+            # Skip IDs other sessions handed out since we last looked
+            refresh_next_id = getattr(self.storage, "refresh_next_id", None)
+            return refresh_next_id() if refresh_next_id else self.storage.next_id
+        return self._next_id
     
     def add_task(
         self,
@@ -63,6 +435,9 @@ class TaskManager:
         use_ai_summary: bool = False
     ) -> Optional[Task]:
         """Add a new task."""
+        if not self._writable():
+            return None
+        
         # Validate priority
         if priority.lower() not in VALID_PRIORITIES:
             print(warning(f"Invalid priority: {priority}. Using 'medium'."))
@@ -80,7 +455,7 @@ class TaskManager:
             else:
                 print(warning("AI features not available (missing API key or openai package)"))
         
-        task = Task(
+        task = self.task_class(
             id=self._get_next_id(),
             title=title,
             description=description,
@@ -88,9 +463,16 @@ class TaskManager:
             due_date=due_date,
             tags=tags if tags else []
         )
+        if task.due_date_invalid:
+            print(warning(f"Unrecognized due date: {due_date}. It will never count as overdue."))
         
-        self.tasks.append(task)
-        if self._save_tasks():
+        if self.storage.in_memory:
+            self._index_task(task)
+            self._next_id = task.id + 1
+            self.storage.next_id = self._next_id
+        record = {"op": "add", "task": task.to_dict()}
+        if self._commit(record):
+            task.id = record["task"]["id"]  # moved if another session took the ID meanwhile
             print(success(f"Task added successfully (ID: {task.id})"))
             return task
         else:
@@ -99,37 +481,50 @@ class TaskManager:
     
     def get_task(self, task_id: int) -> Optional[Task]:
         """Get a task by ID."""
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        if not self.storage.in_memory:
+            return self.storage.get_task(task_id)
+        return self._by_id.get(task_id)
     
     def list_tasks(
         self,
         status_filter: Optional[str] = None,
         sort_by: str = "id",
-        tag_filter: Optional[str] = None
+        tag_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None
     ) -> List[Task]:
-        """List tasks with optional filtering and sorting."""
-        filtered = self.tasks
+        """List tasks with optional filtering and sorting.
         
-        # Filter by status
-        if status_filter:
-            filtered = [t for t in filtered if t.status == status_filter.lower()]
+        Filters are answered from the status, priority and tag indexes, so
+        the cost grows with the number of matches rather than all tasks.
+        With paged storage the result is a generator streamed from disk.
+        """
+        if not self.storage.in_memory:
+            return self.storage.list_tasks(status_filter, sort_by, tag_filter, priority_filter)
+        if self._columns is not None:
+            ids = self._columns.select(status_filter, sort_by, tag_filter, priority_filter)
+            return [self._by_id[task_id] for task_id in ids]
         
-        # Filter by tag
+        matches = []
+        if status_filter:
+            matches.append(self._by_status.get(status_filter.lower(), set()))
+        if priority_filter:
+            matches.append(self._by_priority.get(priority_filter.lower(), set()))
         if tag_filter:
-            filtered = [t for t in filtered if tag_filter in t.tags]
+            matches.append(self._by_tag.get(tag_filter, set()))
         
-        # Sort tasks
+        if matches:
+            ids = sorted(set.intersection(*sorted(matches, key=len)))
+        else:
+            ids = sorted(self._by_id)
+        filtered = [self._by_id[task_id] for task_id in ids]
+        
+        # Sort tasks (already in ID order, which is the default; ties keep it)
         if sort_by == "priority":
-            filtered = sorted(filtered, key=lambda x: PRIORITY_ORDER.get(x.priority, 3))
+            filtered.sort(key=lambda x: PRIORITY_ORDER.get(x.priority, 3))
         elif sort_by == "due_date":
-            filtered = sorted(filtered, key=lambda x: (x.due_date or '9999-12-31'))
+            filtered.sort(key=lambda x: (x.due_date or '9999-12-31'))
         elif sort_by == "created":
-            filtered = sorted(filtered, key=lambda x: x.created_at)
-        else:  # sort by id (default)
-            filtered = sorted(filtered, key=lambda x: x.id)
+            filtered.sort(key=lambda x: x.created_at)
         
         return filtered
     
@@ -145,16 +540,19 @@ class TaskManager:
             return False
         
         old_status = task.status
-        task.status = new_status.lower()
+        fields = {"status": new_status.lower(), "completed_at": task.completed_at}
         
         # Set completion timestamp
         if new_status.lower() == "completed" and not task.completed_at:
             from datetime import datetime
-            task.completed_at = datetime.now().isoformat()
+            fields["completed_at"] = datetime.now().isoformat()
         elif new_status.lower() != "completed":
-            task.completed_at = None
+            fields["completed_at"] = None
         
-        if self._save_tasks():
+        if not self._writable():
+            return False
+        self._update_fields(task, fields)
+        if self._commit({"op": "update", "id": task_id, "fields": fields}):
             print(success(f"Task {task_id} status updated: {old_status} → {new_status}"))
             return True
         return False
@@ -174,25 +572,70 @@ class TaskManager:
             print(error(f"Task {task_id} not found."))
             return False
         
+        fields = {}
         if title is not None:
-            task.title = title
+            fields["title"] = title
         if description is not None:
-            task.description = description
+            fields["description"] = description
         if priority is not None:
             if priority.lower() in VALID_PRIORITIES:
-                task.priority = priority.lower()
+                fields["priority"] = priority.lower()
             else:
                 print(warning(f"Invalid priority: {priority}"))
         if due_date is not None:
-            task.due_date = due_date
+            fields["due_date"] = due_date
         if tags is not None:
-            task.tags = tags
+            fields["tags"] = tags
         
-        if self._save_tasks():
+        if not self._writable():
+            return False
+        self._update_fields(task, fields)
+        if due_date is not None and task.due_date_invalid:
+            print(warning(f"Unrecognized due date: {due_date}. It will never count as overdue."))
+        
+        if self._commit({"op": "update", "id": task_id, "fields": fields}):
             print(success(f"Task {task_id} updated successfully"))
             return True
         return False
     
+    def retitle_tasks(
+        self,
+        status_filter: Optional[str] = None,
+        tag_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None
+    ) -> int:
+        """Replace the titles of matching tasks with AI summaries of their descriptions.
+        
+        The descriptions are summarized together (see summarize_many) and
+        the new titles saved in one transaction. Returns how many changed.
+        """
+        if not self._writable():
+            return 0
+        if not self.ai_summarizer.is_available():
+            print(warning("AI features not available (missing API key or openai package)"))
+            return 0
+        tasks = [
+            task for task in self.list_tasks(status_filter, "id", tag_filter, priority_filter)
+            if task.description
+        ]
+        if not tasks:
+            print(info("No matching tasks have a description to summarize"))
+            return 0
+        
+        print(info(f"Summarizing {len(tasks)} description(s)..."))
+        results = self.ai_summarizer.summarize_many([task.description for task in tasks])
+        changed = 0
+        with self.transaction():
+            for task, result in zip(tasks, results):
+                if not result.ok:
+                    print(warning(f"Task {task.id}: {result.error}"))
+                elif result.summary != task.title:
+                    self._update_fields(task, {"title": result.summary})
+                    self._commit({"op": "update", "id": task.id, "fields": {"title": result.summary}})
+                    changed += 1
+        print(success(f"Retitled {changed} task(s)"))
+        return changed
+    
     def delete_task(self, task_id: int) -> bool:
         """Delete a task."""
         task = self.get_task(task_id)
@@ -200,52 +643,163 @@ class TaskManager:
             print(error(f"Task {task_id} not found."))
             return False
         
-        self.tasks.remove(task)
-        if self._save_tasks():
+        if not self._writable():
+            return False
+        if self.storage.in_memory:
+            self._unindex_task(task)
+        if self._commit({"op": "delete", "ids": [task_id]}):
             print(success(f"Task {task_id} deleted successfully"))
             return True
         return False
     
-    def search_tasks(self, query: str) -> List[Task]:
-        """Search tasks by title or description."""
+    def search_tasks(self, query: str, mode: str = "substring", include_archive: bool = False) -> List[Task]:
+        """Search tasks by title or description.
+        
+        The default "substring" mode matches query anywhere in the title or
+        description. Modes "all" and "any" use the full-text index instead:
+        every (or any) word in query must prefix-match a word in the title,
+        description or tags, and results are ranked by term frequency.
+        include_archive also streams the archive, adding its matches after
+        the ones from the hot store.
+        """
+        results = self._search_hot(query, mode)
+        if not include_archive:
+            return results
+        results = list(results)
+        
+        if mode in SEARCH_MODES:
+            terms = tokenize(query)
+            if not terms:
+                return results
+            scored = [(match_score(task, terms, mode), task) for task in self._iter_archive()]
+            scored.sort(key=lambda pair: (-pair[0], pair[1].id))
+            return results + [task for score, task in scored if score]
+        
         query_lower = query.lower()
+        return results + [
+            task for task in self._iter_archive()
+            if query_lower in task.title.lower() or query_lower in task.description.lower()
+        ]
+    
+    def _search_hot(self, query: str, mode: str) -> List[Task]:
+        """Search the tasks in the main store."""
+        if mode in SEARCH_MODES:
+            if self.storage.in_memory:
+                return [self._by_id[i] for i in self._search_index().search(query, mode)]
+            # Score tasks as they stream past, keeping only the matching IDs
+            terms = tokenize(query)
+            scores = {task.id: match_score(task, terms, mode) for task in self.storage.list_tasks()} if terms else {}
+            ranked = sorted((i for i in scores if scores[i]), key=lambda i: (-scores[i], i))
+            return [self.get_task(task_id) for task_id in ranked]
+        
+        if not self.storage.in_memory:
+            return self.storage.search_tasks(query)
+        
+        query_lower = query.lower()
+        candidate_ids = self._substring_index().candidates(query_lower)
+        if candidate_ids is None:
+            candidates = self._by_id.values()
+        else:
+            candidates = [self._by_id[task_id] for task_id in sorted(candidate_ids)]
         return [
-            task for task in self.tasks
+            task for task in candidates
             if query_lower in task.title.lower() or query_lower in task.description.lower()
         ]
     
-    def get_statistics(self) -> Dict:
-        """Get comprehensive task statistics."""
-        total = len(self.tasks)
-        if total == 0:
-            return {"total": 0}
-        
-        stats = {
-            "total": total,
-            "by_status": {},
-            "by_priority": {},
-            "overdue": 0,
-            "tags": set()
-        }
-        
-        for task in self.tasks:
-            # Count by status
-            stats["by_status"][task.status] = stats["by_status"].get(task.status, 0) + 1
-            
-            # Count by priority
-            stats["by_priority"][task.priority] = stats["by_priority"].get(task.priority, 0) + 1
-            
-            # Count overdue
+    def get_statistics(self, include_archive: bool = False) -> Dict:
+        """Get comprehensive task statistics.
+        
+        Counts come straight from the indexes that add/update/delete keep
+        current, and the overdue count is a bisect of the sorted due dates
+        of unfinished tasks against today. include_archive adds the
+        archived tasks, streamed from disk, and an "archived" count.
+        """
+        if not self.storage.in_memory:
+            stats = self.storage.get_statistics()
+        elif self._columns is not None:
+            stats = self._columns.statistics(today_ordinal())
+        elif not self._by_id:
+            stats = {"total": 0}
+        else:
+            stats = {
+                "total": len(self._by_id),
+                "by_status": {status: len(ids) for status, ids in self._by_status.items()},
+                "by_priority": {priority: len(ids) for priority, ids in self._by_priority.items()},
+                "overdue": bisect_left(self._open_due, today_ordinal()),
+                "tags": set(self._by_tag),
+            }
+        if not include_archive:
+            return stats
+        
+        by_status = stats.setdefault("by_status", {})
+        by_priority = stats.setdefault("by_priority", {})
+        tags = stats.setdefault("tags", set())
+        stats.setdefault("overdue", 0)
+        archived = 0
+        for task in self._iter_archive():
+            archived += 1
+            by_status[task.status] = by_status.get(task.status, 0) + 1
+            by_priority[task.priority] = by_priority.get(task.priority, 0) + 1
+            tags.update(task.tags)
             if task.is_overdue():
                 stats["overdue"] += 1
-            
-            # Collect tags
-            stats["tags"].update(task.tags)
-        
+        stats["total"] += archived
+        stats["archived"] = archived
         return stats
     
+    def archive_tasks(self, days: int = 30) -> int:
+        """Move completed and cancelled tasks older than days to the archive.
+        
+        A task's age runs from when it was completed (or created, if it has
+        no completion time). The tasks are appended to the archive before
+        they are deleted, so a crash in between leaves a copy in both
+        places rather than none; archive reads skip IDs still in the store.
+        The store lock is held throughout, so two sessions archiving at once
+        neither interleave their writes nor archive the same tasks twice.
+        """
+        if not self._writable():
+            return 0
+        with self.storage.lock():
+            if self._pending is None:
+                self.refresh()  # another session may have archived meanwhile
+            cutoff = parse_timestamp((datetime.now() - timedelta(days=days)).isoformat())
+            old = []
+            for status in ("completed", "cancelled"):
+                for task in self.list_tasks(status_filter=status):
+                    stamp = task.completed_timestamp or task.created_timestamp
+                    if stamp is not None and stamp <= cutoff:
+                        old.append(task)
+            if not old:
+                print(info(f"No finished tasks older than {days} day(s) to archive"))
+                return 0
+            old.sort(key=lambda task: task.id)
+            
+            try:
+                self.archive.append(old, sync=self.durability != "none")
+            except (IOError, OSError) as e:
+                print(error(f"Error writing archive {self.archive.path}: {e}"))
+                return 0
+            
+            if self.storage.in_memory:
+                for task in old:
+                    self._unindex_task(task)
+            if self._commit({"op": "delete", "ids": [task.id for task in old]}):
+                print(success(f"Archived {len(old)} task(s) to {self.archive.path}"))
+                return len(old)
+        return 0
+    
+    def _iter_archive(self) -> Iterator[Task]:
+        """Stream archived tasks, skipping any still in the main store."""
+        for task in self.archive:
+            if self.get_task(task.id) is None:
+                yield task
+        if self.archive.skipped:
+            print(warning(f"Skipped {self.archive.skipped} unreadable archive record(s) "
+                          f"(copied to {self.archive.quarantine_file})"))
+    
     def export_to_csv(self, filename: str = "tasks_export.csv") -> bool:
-        """Export all tasks to CSV file."""
+        """Export all tasks to CSV file (streamed row by row with paged storage)."""
+        count = 0
         try:
             with open(filename, 'w', newline='') as csvfile:
                 fieldnames = ['id', 'title', 'description', 'priority', 'status', 
@@ -253,26 +807,77 @@ class TaskManager:
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 
                 writer.writeheader()
-                for task in self.tasks:
+                for task in self.list_tasks():
                     row = task.to_dict()
                     row['tags'] = ','.join(row['tags'])  # Convert list to string
                     writer.writerow(row)
+                    count += 1
             
-            print(success(f"Exported {len(self.tasks)} tasks to {filename}"))
+            print(success(f"Exported {count} tasks to {filename}"))
             return True
         except IOError as e:
             print(error(f"Error exporting to CSV: {e}"))
             return False
     
+    def compact(self) -> bool:
+        """Fold the journal into a fresh tasks.json snapshot."""
+        if not hasattr(self.storage, "compact"):
+            print(warning("Compaction only applies to journal storage"))
+            return False
+        
+        if self.storage.compact(self._by_id.values()):
+            print(success(f"Compacted journal into {self.data_file}"))
+            return True
+        print(error("Failed to compact journal"))
+        return False
+    
+    def write_snapshot(self) -> bool:
+        """Write the memory-mapped snapshot used by read-only sessions."""
+        from .snapshot import snapshot_path_for, write_snapshot
+        path = snapshot_path_for(self.data_file)
+        if write_snapshot(path, self.tasks, self._get_next_id(), sync=self.durability != "none"):
+            print(success(f"Wrote snapshot {path}"))
+            return True
+        print(error(f"Failed to write snapshot {path}"))
+        return False
+    
+    def import_json(self, json_file: str) -> int:
+        """Import tasks from a JSON file into SQLite storage."""
+        if not hasattr(self.storage, "import_json"):
+            print(warning("Importing only applies to SQLite storage"))
+            return 0
+        
+        try:
+            count = self.storage.import_json(json_file)
+        except (IOError, ValueError, TypeError) as e:
+            print(error(f"Error importing {json_file}: {e}"))
+            return 0
+        print(success(f"Imported {count} task(s) from {json_file}"))
+        for old_id, new_id in sorted(self.storage.renumbered.items()):
+            print(info(f"Task {old_id} was imported as task {new_id} (ID already in use)"))
+        self.storage.renumbered.clear()
+        return count
+    
+    def close(self) -> None:
+        """Finish any pending storage work before exiting."""
+        self.storage.close()
+        if self._ai_summarizer is not None:
+            self._ai_summarizer.close()
+        if self.persist_search_index and self._text_index is not None and self.storage.in_memory:
+            self._text_index.save(self.index_file, self.storage.signature())
+    
     def clear_completed(self) -> int:
         """Remove all completed tasks."""
-        completed = [t for t in self.tasks if t.status == "completed"]
+        completed = list(self.list_tasks(status_filter="completed"))
         count = len(completed)
         
-        self.tasks = [t for t in self.tasks if t.status != "completed"]
+        if not self._writable():
+            return 0
+        if self.storage.in_memory:
+            for task in completed:
+                self._unindex_task(task)
         
-        if self._save_tasks():
+        if self._commit({"op": "delete", "ids": [t.id for t in completed]}):
             print(success(f"Removed {count} completed task(s)"))
             return count
         return 0
-
@@ -1,18 +1,25 @@
 """
 Data models for TaskMaster.
-Defines the Task dataclass and related types.
+Defines the Task dataclass, its memory-compact variant and related types.
 """
 
 from __future__ import annotations
 
+import sys
+import time
 from dataclasses import dataclass, asdict
-from datetime import datetime
-from typing import List, Dict, Optional
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional, Union
 
 
 @dataclass
 class Task:
-    """Represents a single task with all its properties."""
+    """Represents a single task with all its properties.
+    
+    Date fields are parsed once when assigned: due_ordinal,
+    created_timestamp and completed_timestamp hold the parsed values
+    (None when missing or invalid), so overdue checks never re-parse.
+    """
     
     id: int
     title: str
@@ -31,19 +38,78 @@ class Task:
         if not self.created_at:
             self.created_at = datetime.now().isoformat()
     
+    def __setattr__(self, name, value):
+        """Set a field, parsing date fields once on assignment."""
+        object.__setattr__(self, name, value)
+        if name == "due_date":
+            object.__setattr__(self, "due_ordinal", due_ordinal(value))
+        elif name == "created_at":
+            object.__setattr__(self, "created_timestamp", parse_timestamp(value))
+        elif name == "completed_at":
+            object.__setattr__(self, "completed_timestamp", parse_timestamp(value))
+    
+    @property
+    def due_date_invalid(self) -> bool:
+        """Check if a due date is set but could not be parsed."""
+        return bool(self.due_date) and self.due_ordinal is None
+    
     def to_dict(self) -> Dict:
         """Convert task to dictionary."""
         return asdict(self)
     
     def is_overdue(self) -> bool:
         """Check if task is overdue."""
-        if not self.due_date or self.status == "completed":
-            return False
-        try:
-            due = datetime.fromisoformat(self.due_date.replace('Z', '+00:00'))
-            return due.date() < datetime.now().date()
-        except (ValueError, AttributeError):
+        if self.status == "completed" or self.due_ordinal is None:
             return False
+        return self.due_ordinal < today_ordinal()
+
+
+def due_ordinal(due_date: Optional[str]) -> Optional[int]:
+    """Parse a due date string into a date ordinal (None if missing or invalid)."""
+    if not due_date:
+        return None
+    try:
+        due = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
+        return due.date().toordinal()
+    except (ValueError, AttributeError):
+        return None
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO timestamp into seconds since the epoch (None if invalid).
+    
+    Naive timestamps are counted from a naive 1970-01-01, so the result does
+    not depend on the local timezone.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return None
+    if parsed.tzinfo is None:
+        return (parsed - EPOCH).total_seconds()
+    return parsed.timestamp()
+
+
+_today = {"ordinal": 0, "expires": 0.0}
+
+
+def today_ordinal() -> int:
+    """Get today's date ordinal, cached until the next local midnight."""
+    now = time.time()
+    if now >= _today["expires"]:
+        today = date.today()
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        _today["ordinal"] = today.toordinal()
+        _today["expires"] = midnight.timestamp()
+    return _today["ordinal"]
+
+
+def is_past_due(due_date: Optional[str]) -> bool:
+    """Check if a due date string falls before today."""
+    ordinal = due_ordinal(due_date)
+    return ordinal is not None and ordinal < today_ordinal()
 
 
 # Valid values for task fields
@@ -51,3 +117,193 @@ VALID_STATUSES = ["pending", "in_progress", "completed", "cancelled"]
 VALID_PRIORITIES = ["low", "medium", "high"]
 PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
 
+
+
+# Codes used by CompactTask; values outside these lists are kept as strings
+STATUS_CODES = {status: code for code, status in enumerate(VALID_STATUSES)}
+PRIORITY_CODES = {priority: code for code, priority in enumerate(VALID_PRIORITIES)}
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_timestamp(value: Optional[str]) -> Union[int, str, None]:
+    """Store an ISO timestamp as epoch microseconds when that round-trips exactly."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return value
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return value
+    return (parsed - EPOCH) // MICROSECOND
+
+
+def decode_timestamp(value: Union[int, str, None]) -> Optional[str]:
+    """Turn an encoded timestamp back into its ISO string."""
+    if isinstance(value, int):
+        return (EPOCH + value * MICROSECOND).isoformat()
+    return value
+
+
+def encode_date(value: Optional[str]) -> Union[int, str, None]:
+    """Store a YYYY-MM-DD date as a date ordinal when that round-trips exactly."""
+    if value is None:
+        return None
+    try:
+        parsed = date.fromisoformat(value)
+    except (ValueError, TypeError):
+        return value
+    return parsed.toordinal() if parsed.isoformat() == value else value
+
+
+def decode_date(value: Union[int, str, None]) -> Optional[str]:
+    """Turn an encoded date back into its ISO string."""
+    if isinstance(value, int):
+        return date.fromordinal(value).isoformat()
+    return value
+
+
+class CompactTask:
+    """A memory-compact Task with the same attributes and to_dict() output.
+
+    Uses __slots__ instead of a per-instance __dict__, small-int codes for
+    status and priority, epoch integers for timestamps, date ordinals for
+    due dates and interned tuples for tags. Values that would not convert
+    back to exactly the same string are stored unchanged.
+
+    Note that tags returns a new list, so change tags by assigning to it
+    rather than mutating the returned list in place.
+    """
+
+    __slots__ = ("id", "title", "description", "_priority", "_status",
+                 "_created_at", "_completed_at", "_due_date", "_tags")
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        description: str = "",
+        priority: str = "medium",
+        status: str = "pending",
+        created_at: str = "",
+        completed_at: Optional[str] = None,
+        due_date: Optional[str] = None,
+        tags: Optional[List[str]] = None
+    ):
+        """Create a compact task from the same fields as Task."""
+        self.id = id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.status = status
+        self.created_at = created_at or datetime.now().isoformat()
+        self.completed_at = completed_at
+        self.due_date = due_date
+        self.tags = tags
+
+    @property
+    def priority(self) -> str:
+        value = self._priority
+        return VALID_PRIORITIES[value] if isinstance(value, int) else value
+
+    @priority.setter
+    def priority(self, value: str) -> None:
+        self._priority = PRIORITY_CODES.get(value, value)
+
+    @property
+    def status(self) -> str:
+        value = self._status
+        return VALID_STATUSES[value] if isinstance(value, int) else value
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status = STATUS_CODES.get(value, value)
+
+    @property
+    def created_at(self) -> str:
+        return decode_timestamp(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value: str) -> None:
+        self._created_at = encode_timestamp(value)
+
+    @property
+    def completed_at(self) -> Optional[str]:
+        return decode_timestamp(self._completed_at)
+
+    @completed_at.setter
+    def completed_at(self, value: Optional[str]) -> None:
+        self._completed_at = encode_timestamp(value)
+
+    @property
+    def due_date(self) -> Optional[str]:
+        return decode_date(self._due_date)
+
+    @due_date.setter
+    def due_date(self, value: Optional[str]) -> None:
+        self._due_date = encode_date(value)
+
+    @property
+    def tags(self) -> List[str]:
+        return list(self._tags)
+
+    @tags.setter
+    def tags(self, value: Optional[List[str]]) -> None:
+        self._tags = tuple(sys.intern(tag) for tag in value) if value else ()
+
+    def to_dict(self) -> Dict:
+        """Convert task to dictionary (same keys and values as Task.to_dict)."""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "priority": self.priority,
+            "status": self.status,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "due_date": self.due_date,
+            "tags": self.tags,
+        }
+
+    @property
+    def due_ordinal(self) -> Optional[int]:
+        """Due date as a date ordinal (None when missing or invalid)."""
+        value = self._due_date
+        return value if isinstance(value, int) else due_ordinal(value)
+
+    @property
+    def created_timestamp(self) -> Optional[float]:
+        """Creation time in seconds since the epoch."""
+        value = self._created_at
+        return value / 1_000_000 if isinstance(value, int) else parse_timestamp(value)
+
+    @property
+    def completed_timestamp(self) -> Optional[float]:
+        """Completion time in seconds since the epoch."""
+        value = self._completed_at
+        return value / 1_000_000 if isinstance(value, int) else parse_timestamp(value)
+
+    @property
+    def due_date_invalid(self) -> bool:
+        """Check if a due date is set but could not be parsed."""
+        return bool(self._due_date) and self.due_ordinal is None
+
+    def is_overdue(self) -> bool:
+        """Check if task is overdue."""
+        if self.status == "completed":
+            return False
+        ordinal = self.due_ordinal
+        return ordinal is not None and ordinal < today_ordinal()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (Task, CompactTask)):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"CompactTask({fields})"
@@ -0,0 +1,72 @@
+"""
+Token-bucket rate limiting for TaskMaster's AI requests.
+Keeps batch summarization under the API's requests-per-minute and
+tokens-per-minute limits no matter how many worker threads are running.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """Holds up to capacity tokens, refilled continuously at rate per second.
+
+    acquire() takes tokens, sleeping until enough have accumulated. A
+    request for more than the capacity is clamped to it so it can still
+    go through once the bucket is full.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """Create a full bucket."""
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """Take amount tokens, waiting as needed; return the seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits applied together."""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """Create both buckets, each allowing one minute's worth of burst."""
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60, clock, sleep)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60, clock, sleep)
+        self.waited = 0.0
+
+    def acquire(self, tokens: float) -> None:
+        """Wait until one request using about tokens tokens is allowed."""
+        self.waited += self.requests.acquire(1) + self.tokens.acquire(tokens)
@@ -0,0 +1,218 @@
+"""
+Search indexes for TaskMaster.
+Provides a tokenized inverted index for ranked full-text search and a
+trigram index that speeds up plain substring search.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from .models import Task
+
+TOKEN_PATTERN = re.compile(r"\w+")
+SEARCH_MODES = ["all", "any"]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def task_tokens(task: Task) -> Counter:
+    """Count the tokens in a task's title, description and tags."""
+    return Counter(tokenize(" ".join([task.title, task.description, *task.tags])))
+
+
+class InvertedIndex:
+    """Maps word tokens to the tasks that contain them.
+
+    Each query term matches every indexed token it is a prefix of, so
+    "meet" finds "meeting". Results are ranked by how often the matched
+    tokens occur in each task.
+    """
+
+    def __init__(self):
+        """Create an empty index."""
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.vocabulary: List[str] = []  # sorted, for prefix lookups
+
+    @classmethod
+    def build(cls, tasks: Iterable[Task]) -> "InvertedIndex":
+        """Build an index over tasks."""
+        index = cls()
+        for task in tasks:
+            index.add(task)
+        return index
+
+    def add(self, task: Task) -> None:
+        """Index a task's text."""
+        for token, count in task_tokens(task).items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                insort(self.vocabulary, token)
+            posting[task.id] = count
+
+    def remove(self, task: Task) -> None:
+        """Remove a task's text (call before its fields change)."""
+        for token in task_tokens(task):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(task.id, None)
+            if not posting:
+                del self.postings[token]
+                position = bisect_left(self.vocabulary, token)
+                del self.vocabulary[position]
+
+    def _prefix_scores(self, term: str) -> Dict[int, int]:
+        """Sum term frequencies over every token starting with term."""
+        scores: Dict[int, int] = {}
+        position = bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+            for task_id, count in self.postings[self.vocabulary[position]].items():
+                scores[task_id] = scores.get(task_id, 0) + count
+            position += 1
+        return scores
+
+    def search(self, query: str, mode: str = "all") -> List[int]:
+        """Return task IDs matching query, best matches first.
+
+        mode "all" requires every term to match (AND), "any" at least one (OR).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        totals: Optional[Dict[int, int]] = None
+        for term in dict.fromkeys(terms):
+            scores = self._prefix_scores(term)
+            if totals is None:
+                totals = scores
+            elif mode == "any":
+                for task_id, count in scores.items():
+                    totals[task_id] = totals.get(task_id, 0) + count
+            else:
+                totals = {
+                    task_id: count + scores[task_id]
+                    for task_id, count in totals.items() if task_id in scores
+                }
+            if not totals and mode != "any":
+                return []
+
+        return sorted(totals, key=lambda task_id: (-totals[task_id], task_id))
+
+    def save(self, path: str, signature) -> bool:
+        """Write the index to path, tagged with the data it was built from."""
+        data = {
+            "signature": signature,
+            "postings": {token: list(posting.items()) for token, posting in self.postings.items()},
+        }
+        try:
+            with open(path, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            return True
+        except IOError:
+            return False
+
+    @classmethod
+    def load(cls, path: str, signature) -> Optional["InvertedIndex"]:
+        """Read an index from path if it was built from the same data."""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            return None
+        if data.get("signature") != signature:
+            return None
+
+        index = cls()
+        index.postings = {token: dict(posting) for token, posting in data["postings"].items()}
+        index.vocabulary = sorted(index.postings)
+        return index
+
+
+def match_score(task: Task, terms: List[str], mode: str = "all") -> int:
+    """Score one task against query terms the way InvertedIndex.search does.
+
+    Returns 0 when the task does not match. Used to search tasks streamed
+    from disk without building an index over them.
+    """
+    counts = task_tokens(task)
+    score = 0
+    for term in dict.fromkeys(terms):
+        term_score = sum(count for token, count in counts.items() if token.startswith(term))
+        if not term_score and mode != "any":
+            return 0
+        score += term_score
+    return score
+
+
+def trigrams(text: str) -> Set[str]:
+    """Get every three-character substring of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def task_trigrams(task: Task) -> Set[str]:
+    """Get the trigrams of a task's lowercased title and description."""
+    return trigrams(task.title.lower()) | trigrams(task.description.lower())
+
+
+class TrigramIndex:
+    """Maps three-character substrings to the tasks that contain them.
+
+    Any text containing a query also contains all of the query's trigrams,
+    so intersecting their task sets gives a small candidate set that only
+    needs to be checked with a real substring test.
+    """
+
+    def __init__(self):
+        """Create an empty index."""
+        self.grams: Dict[str, Set[int]] = {}
+
+    @classmethod
+    def build(cls, tasks: Iterable[Task]) -> "TrigramIndex":
+        """Build an index over tasks."""
+        index = cls()
+        for task in tasks:
+            index.add(task)
+        return index
+
+    def add(self, task: Task) -> None:
+        """Index a task's title and description."""
+        for gram in task_trigrams(task):
+            self.grams.setdefault(gram, set()).add(task.id)
+
+    def remove(self, task: Task) -> None:
+        """Remove a task (call before its fields change)."""
+        for gram in task_trigrams(task):
+            ids = self.grams.get(gram)
+            if ids is None:
+                continue
+            ids.discard(task.id)
+            if not ids:
+                del self.grams[gram]
+
+    def candidates(self, query_lower: str) -> Optional[Set[int]]:
+        """Get IDs of tasks that may contain query_lower.
+
+        Returns None for queries shorter than three characters, which the
+        index cannot narrow down.
+        """
+        grams = trigrams(query_lower)
+        if not grams:
+            return None
+
+        sets = []
+        for gram in grams:
+            ids = self.grams.get(gram)
+            if not ids:
+                return set()
+            sets.append(ids)
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
@@ -0,0 +1,396 @@
+"""
+Sharded storage backend for TaskMaster.
+Spreads tasks over several small JSON files so a change rewrites one shard
+instead of the whole task list, and a lookup reads only the shard it needs.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set
+
+from .loader import load_report, load_tasks
+from .locking import FileLock
+from .models import Task, PRIORITY_ORDER
+
+DEFAULT_SHARDS = 16
+MAX_LOAD_THREADS = 8
+
+
+def shard_dir_for(data_file: str) -> str:
+    """Derive the shard directory from a data file name (tasks.json -> tasks.shards)."""
+    return f"{os.path.splitext(data_file)[0]}.shards"
+
+
+class ShardedStorage:
+    """Tasks spread over N shard files by ID (task ID modulo N).
+
+    <dir>/manifest.json holds the shard count, the ID high-water mark, the
+    store version and the version at which each shard was last written.
+    Shards are loaded the first time a task in them is needed, so get_task
+    reads one file; queries over every task load the missing shards on a
+    thread pool. A batch of records rewrites only the shards it touched.
+
+    Like SQLite storage this backend answers queries itself (in_memory is
+    False). Another process's writes are picked up per shard by comparing
+    the shard versions in the manifest.
+    """
+
+    in_memory = False
+
+    def __init__(
+        self,
+        data_file: str,
+        task_class=Task,
+        durability: str = "batch",
+        group_commit_ms: int = 100,
+        shards: int = DEFAULT_SHARDS
+    ):
+        """Open (and if needed create) the shard directory next to data_file.
+
+        shards only sets the count for a new store; an existing one keeps
+        the count in its manifest. A new store imports the existing JSON
+        data file, if any. Shards are written atomically and synced unless
+        durability is "none"; group_commit_ms is not used.
+        """
+        self.data_file = data_file
+        self.task_class = task_class
+        self.durability = durability
+        self.shard_dir = shard_dir_for(data_file)
+        self.manifest_file = os.path.join(self.shard_dir, "manifest.json")
+        self.quarantine_file = f"{data_file}.quarantine"
+        self.last_load: Optional[Dict] = None
+        self._lock = FileLock(f"{data_file}.lock")
+        self._cache: Dict[int, Dict[int, Task]] = {}  # loaded shards
+        self._dirty: Set[int] = set()                 # shards with unwritten changes
+        self._pending: List[Dict] = []                # records not yet written
+        self._depth = 0                               # open transaction() blocks
+        self._manifest_signature = None
+        self.renumbered: Dict[int, int] = {}          # new task IDs moved at flush, old -> new
+
+        os.makedirs(self.shard_dir, exist_ok=True)
+        manifest = self._read_manifest()
+        if manifest is None:
+            self.shard_count = max(1, shards)
+            self._adopt({"next_id": 1, "version": 0, "shard_versions": [0] * self.shard_count})
+            if os.path.exists(data_file):
+                tasks, _ = load_tasks(data_file, task_class, self.quarantine_file)
+                self.save(tasks)
+        else:
+            self.shard_count = len(manifest["shard_versions"])
+            self._adopt(manifest)
+
+    # -- manifest ----------------------------------------------------------
+
+    def _read_manifest(self) -> Optional[Dict]:
+        """Read the manifest (None if missing or unreadable)."""
+        try:
+            with open(self.manifest_file, 'r') as f:
+                manifest = json.load(f)
+            if isinstance(manifest, dict) and isinstance(manifest.get("shard_versions"), list):
+                return manifest
+        except (IOError, ValueError):
+            pass
+        return None
+
+    def _adopt(self, manifest: Dict) -> None:
+        """Take the ID mark and versions from a manifest, dropping outdated shards."""
+        versions = manifest["shard_versions"]
+        for shard, version in enumerate(getattr(self, "shard_versions", versions)):
+            if versions[shard] != version:
+                self._cache.pop(shard, None)
+        self.shard_versions = list(versions)
+        self.version = manifest["version"]
+        self.next_id = max(getattr(self, "next_id", 1), manifest["next_id"])
+        self._synced_next_id = manifest["next_id"]
+        self._manifest_signature = self._stat_manifest()
+
+    def _write_manifest(self) -> bool:
+        """Write the manifest atomically."""
+        from .storage import write_json_atomic  # storage imports this module
+        manifest = {"next_id": self.next_id, "version": self.version, "shard_versions": self.shard_versions}
+        saved = write_json_atomic(self.manifest_file, manifest, sync=self.durability != "none", indent=None)
+        self._manifest_signature = self._stat_manifest()
+        return saved
+
+    def _stat_manifest(self) -> Optional[List]:
+        """Fingerprint the manifest by size, mtime and inode."""
+        try:
+            st = os.stat(self.manifest_file)
+            return [st.st_size, st.st_mtime_ns, st.st_ino]
+        except OSError:
+            return None
+
+    def _refresh(self) -> None:
+        """Drop cached shards that another process has rewritten since."""
+        if self._dirty or self._stat_manifest() == self._manifest_signature:
+            return
+        manifest = self._read_manifest()
+        if manifest is not None:
+            self._adopt(manifest)
+
+    # -- shards ------------------------------------------------------------
+
+    def shard_of(self, task_id: int) -> int:
+        """Number of the shard that owns a task ID."""
+        return task_id % self.shard_count
+
+    def shard_path(self, shard: int) -> str:
+        """Path of one shard file."""
+        return os.path.join(self.shard_dir, f"shard-{shard:04d}.json")
+
+    def _read_shard(self, shard: int):
+        """Load one shard file, quarantining bad records."""
+        path = self.shard_path(shard)
+        if not os.path.exists(path):
+            return {}, None
+        try:
+            tasks, report = load_tasks(path, self.task_class, self.quarantine_file)
+        except (IOError, ValueError):
+            return {}, None
+        return {task.id: task for task in tasks}, report
+
+    def _shard(self, shard: int) -> Dict[int, Task]:
+        """Get one shard's tasks, loading the file on first use."""
+        if shard not in self._cache:
+            self._cache[shard] = self._read_shard(shard)[0]
+        return self._cache[shard]
+
+    def _all_shards(self) -> List[Dict[int, Task]]:
+        """Get every shard, loading the missing ones in parallel."""
+        self._refresh()
+        missing = [shard for shard in range(self.shard_count) if shard not in self._cache]
+        if missing:
+            start = time.perf_counter()
+            with self.lock(shared=True):
+                with ThreadPoolExecutor(min(MAX_LOAD_THREADS, len(missing))) as pool:
+                    results = list(pool.map(self._read_shard, missing))
+            records = quarantined = 0
+            for shard, (tasks, report) in zip(missing, results):
+                self._cache[shard] = tasks
+                if report:
+                    records += report["records"]
+                    quarantined += report["quarantined"]
+            self.last_load = load_report(records, quarantined, self.quarantine_file, start)
+        return [self._cache[shard] for shard in range(self.shard_count)]
+
+    def _iter_tasks(self) -> Iterable[Task]:
+        """All tasks in ID order."""
+        tasks = [task for shard in self._all_shards() for task in shard.values()]
+        tasks.sort(key=lambda task: task.id)
+        return tasks
+
+    # -- reading -----------------------------------------------------------
+
+    def load(self) -> List[Task]:
+        """Load every task (only used for exports, full-text search and migrations)."""
+        return list(self._iter_tasks())
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a task by ID, reading only the shard that owns it."""
+        self._refresh()
+        return self._shard(self.shard_of(task_id)).get(task_id)
+
+    def list_tasks(
+        self,
+        status_filter: Optional[str] = None,
+        sort_by: str = "id",
+        tag_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None
+    ) -> List[Task]:
+        """List tasks with optional filtering and sorting."""
+        tasks = [
+            task for task in self._iter_tasks()
+            if (not status_filter or task.status == status_filter.lower())
+            and (not priority_filter or task.priority == priority_filter.lower())
+            and (not tag_filter or tag_filter in task.tags)
+        ]
+        if sort_by == "priority":
+            tasks.sort(key=lambda x: PRIORITY_ORDER.get(x.priority, 3))
+        elif sort_by == "due_date":
+            tasks.sort(key=lambda x: (x.due_date or '9999-12-31'))
+        elif sort_by == "created":
+            tasks.sort(key=lambda x: x.created_at)
+        return tasks
+
+    def search_tasks(self, query: str) -> List[Task]:
+        """Search titles and descriptions case-insensitively."""
+        query_lower = query.lower()
+        return [
+            task for task in self._iter_tasks()
+            if query_lower in task.title.lower() or query_lower in task.description.lower()
+        ]
+
+    def get_statistics(self) -> Dict:
+        """Compute statistics over every shard."""
+        tasks = self._iter_tasks()
+        if not tasks:
+            return {"total": 0}
+
+        by_status: Dict[str, int] = {}
+        by_priority: Dict[str, int] = {}
+        tags = set()
+        for task in tasks:
+            by_status[task.status] = by_status.get(task.status, 0) + 1
+            by_priority[task.priority] = by_priority.get(task.priority, 0) + 1
+            tags.update(task.tags)
+        return {
+            "total": len(tasks),
+            "by_status": by_status,
+            "by_priority": by_priority,
+            "overdue": sum(1 for task in tasks if task.is_overdue()),
+            "tags": tags,
+        }
+
+    # -- writing -----------------------------------------------------------
+
+    def _apply(self, records: List[Dict]) -> None:
+        """Apply records to the cached shards they touch."""
+        from .storage import apply_record
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                task_ids = [record["task"]["id"]]
+                self.next_id = max(self.next_id, record["task"]["id"] + 1)
+            elif op == "update":
+                task_ids = [record["id"]]
+            elif op == "delete":
+                task_ids = record["ids"]
+            else:
+                continue
+            for shard in {self.shard_of(task_id) for task_id in task_ids}:
+                apply_record(self._shard(shard), record, self.task_class)
+                self._dirty.add(shard)
+
+    def _renumber(self, records: List[Dict], first_free: int) -> None:
+        """Move our new tasks off IDs another process has handed out meanwhile.
+
+        IDs from our last synced mark up to first_free may now belong to
+        the other process's tasks. Records are rewritten in place (so
+        callers holding them see the new IDs) and the moves are kept in
+        self.renumbered.
+        """
+        added = [r["task"]["id"] for r in records if r.get("op") == "add"]
+        next_free = max([first_free] + [task_id + 1 for task_id in added])
+        ids: Dict[int, int] = {}
+        for record in records:
+            op = record.get("op")
+            if op == "add" and self._synced_next_id <= record["task"]["id"] < first_free:
+                ids[record["task"]["id"]] = record["task"]["id"] = next_free
+                next_free += 1
+            elif op == "update":
+                record["id"] = ids.get(record["id"], record["id"])
+            elif op == "delete":
+                record["ids"] = [ids.get(i, i) for i in record["ids"]]
+        self.renumbered.update(ids)
+
+    def _flush(self) -> bool:
+        """Write the dirty shards, first rebasing on any newer manifest.
+
+        The manifest (with the new ID mark) is written before the shards,
+        so a crash part way through can waste IDs but never reuse them.
+        """
+        with self.lock():
+            manifest = self._read_manifest()
+            if manifest is not None and manifest["version"] != self.version:
+                for shard in self._dirty:
+                    self._cache.pop(shard, None)
+                self._dirty.clear()
+                self._renumber(self._pending, manifest["next_id"])
+                self.next_id = 1
+                self._adopt(manifest)
+                self._apply(self._pending)
+
+            self.version += 1
+            for shard in self._dirty:
+                self.shard_versions[shard] = self.version
+            if not self._write_manifest():
+                return False
+            from .storage import write_json_atomic
+            for shard in sorted(self._dirty):
+                data = [task.to_dict() for task in sorted(self._cache[shard].values(), key=lambda t: t.id)]
+                if not write_json_atomic(self.shard_path(shard), data,
+                                         sync=self.durability != "none", indent=None):
+                    return False
+            self._synced_next_id = self.next_id
+            self._dirty.clear()
+            self._pending = []
+        return True
+
+    def refresh_next_id(self) -> int:
+        """Catch up with IDs other processes have handed out, and return the next free one.
+
+        Called before a new task is numbered, so it rarely has to be moved
+        when it is written.
+        """
+        self._refresh()
+        if self._dirty:  # _refresh keeps our unwritten shards; just skip past the taken IDs
+            manifest = self._read_manifest()
+            if manifest is not None:
+                self.next_id = max(self.next_id, manifest["next_id"])
+        return self.next_id
+
+    def apply(self, record: Dict, tasks: Iterable[Task]) -> bool:
+        """Persist a single mutation record."""
+        return self.apply_batch([record], tasks)
+
+    def apply_batch(self, records: List[Dict], tasks: Iterable[Task]) -> bool:
+        """Persist records by rewriting only the shards they touch.
+
+        Inside transaction() the shards are written when it ends.
+        """
+        self._apply(records)
+        self._pending.extend(records)
+        if self._depth:
+            return True
+        return self._flush()
+
+    @contextmanager
+    def transaction(self):
+        """Group the records applied inside the block into one write.
+
+        A block that raises discards its own records: the shards it touched
+        are reloaded and the records from before it are applied again.
+        """
+        mark, next_id = len(self._pending), self.next_id
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            del self._pending[mark:]
+            for shard in self._dirty:
+                self._cache.pop(shard, None)
+            self._dirty.clear()
+            self._apply(self._pending)
+            self.next_id = next_id
+            raise
+        finally:
+            self._depth -= 1
+        if self._depth == 0 and self._pending:
+            self._flush()
+
+    def save(self, tasks: Iterable[Task]) -> bool:
+        """Replace the whole store with tasks."""
+        self._cache = {shard: {} for shard in range(self.shard_count)}
+        for task in tasks:
+            self._cache[self.shard_of(task.id)][task.id] = task
+            self.next_id = max(self.next_id, task.id + 1)
+        self._dirty = set(range(self.shard_count))
+        return self._flush()
+
+    def lock(self, shared: bool = False):
+        """Hold the inter-process store lock (shared for readers)."""
+        return self._lock.acquire(shared)
+
+    def files(self) -> List[str]:
+        """Files that make up the store."""
+        return [self.manifest_file] + [self.shard_path(shard) for shard in range(self.shard_count)]
+
+    def close(self) -> None:
+        """Write any records still pending."""
+        if self._pending:
+            self._flush()
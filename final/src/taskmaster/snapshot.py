@@ -0,0 +1,309 @@
+"""
+Memory-mapped binary snapshot of the task list for TaskMaster.
+Lets read-only reporting (stats, list, export) answer queries straight from
+fixed-width columns without parsing JSON or building every Task up front.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, Iterable, List, Optional
+
+from .loader import load_report
+from .models import Task, VALID_STATUSES, VALID_PRIORITIES, PRIORITY_ORDER, today_ordinal
+from .storage import write_atomic
+
+MAGIC = b"TMSNAP1\0"
+PREAMBLE = struct.Struct("<8sI")  # magic, header length
+ALIGNMENT = 8
+STRING_FIELDS = ["title", "description", "created_at", "completed_at", "due_date", "tags"]
+TAG_SEPARATOR = "\x1f"
+NO_DUE_DATE = 0  # date ordinals start at 1
+
+
+def snapshot_path_for(data_file: str) -> str:
+    """Derive the snapshot path from a data file name (tasks.json -> tasks.json.snap)."""
+    return f"{data_file}.snap"
+
+
+def write_snapshot(path: str, tasks: Iterable[Task], next_id: int = 1, sync: bool = True) -> bool:
+    """Write tasks to a binary snapshot file atomically.
+
+    Layout: magic and header length, a JSON header (row count, code tables,
+    distinct tags and column offsets), then one 8-byte aligned array per
+    column and finally the UTF-8 string heap. Column "strings" holds
+    len(STRING_FIELDS) heap offsets per row plus a final end offset, so
+    field f of row r spans strings[r*F+f] to strings[r*F+f+1].
+    """
+    tasks = sorted(tasks, key=lambda task: task.id)
+    statuses = list(VALID_STATUSES)
+    priorities = list(VALID_PRIORITIES)
+    tags = set()
+    columns = {
+        "id": array('q'), "status": array('B'), "priority": array('B'),
+        "due": array('i'), "created": array('d'), "completed": array('d'),
+        "strings": array('Q'),
+    }
+    heap = bytearray()
+    for task in tasks:
+        for values, value in ((statuses, task.status), (priorities, task.priority)):
+            if value not in values:
+                values.append(value)
+        columns["id"].append(task.id)
+        columns["status"].append(statuses.index(task.status))
+        columns["priority"].append(priorities.index(task.priority))
+        columns["due"].append(task.due_ordinal or NO_DUE_DATE)
+        columns["created"].append(_float(task.created_timestamp))
+        columns["completed"].append(_float(task.completed_timestamp))
+        tags.update(task.tags)
+        for field in STRING_FIELDS:
+            value = TAG_SEPARATOR.join(task.tags) if field == "tags" else getattr(task, field)
+            columns["strings"].append(len(heap))
+            heap += (value or "").encode("utf-8")
+    columns["strings"].append(len(heap))
+    if len(statuses) > 255 or len(priorities) > 255:
+        raise ValueError("Too many distinct status or priority values for a snapshot")
+
+    layout = {}
+    position = 0
+    for name, column in columns.items():
+        layout[name] = [position, column.typecode, len(column)]
+        position = _align(position + len(column) * column.itemsize)
+    header = {
+        "count": len(tasks),
+        "next_id": next_id,
+        "statuses": statuses,
+        "priorities": priorities,
+        "tags": sorted(tags),
+        "columns": layout,
+        "heap": position,
+    }
+    header_bytes = json.dumps(header, separators=(',', ':')).encode("utf-8")
+    header_bytes += b" " * (_align(PREAMBLE.size + len(header_bytes)) - PREAMBLE.size - len(header_bytes))
+
+    def write(f):
+        f.write(PREAMBLE.pack(MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        for column in columns.values():
+            data = column.tobytes()
+            f.write(data + b"\0" * (_align(len(data)) - len(data)))
+        f.write(heap)
+
+    return write_atomic(path, write, sync=sync, mode='wb')
+
+
+def _float(value: Optional[float]) -> float:
+    """Store a missing timestamp as NaN."""
+    return math.nan if value is None else value
+
+
+def _align(position: int) -> int:
+    """Round a byte position up to the column alignment."""
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+class SnapshotStorage:
+    """Read-only storage backend answering queries from a mapped snapshot.
+
+    Only the preamble and JSON header are parsed on open. Each column is a
+    zero-copy memoryview over the mapping, so counts and filters read the
+    fixed-width columns directly and Task objects are built only for the
+    rows a query returns. Writes are refused.
+    """
+
+    in_memory = False
+    read_only = True
+
+    def __init__(self, path: str, task_class=Task):
+        """Map the snapshot at path (raises ValueError if it is not one)."""
+        start = time.perf_counter()
+        self.path = path
+        self.task_class = task_class
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, header_length = PREAMBLE.unpack_from(self._map)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a TaskMaster snapshot")
+            base = PREAMBLE.size + header_length
+            self.header = json.loads(self._map[PREAMBLE.size:base])
+        except (struct.error, ValueError):
+            self._map.close()
+            raise ValueError(f"{path} is not a TaskMaster snapshot")
+        self.count = self.header["count"]
+        self.next_id = self.header["next_id"]
+        self._view = memoryview(self._map)
+        self._columns = {
+            name: self._view[base + offset:base + offset + length * struct.calcsize(typecode)].cast(typecode)
+            for name, (offset, typecode, length) in self.header["columns"].items()
+        }
+        self._heap = base + self.header["heap"]
+        self.last_load = load_report(self.count, 0, None, start)
+
+    @classmethod
+    def open_for(cls, storage, data_file: str, task_class=Task) -> "SnapshotStorage":
+        """Open the snapshot of a store, rewriting it first if it is out of date.
+
+        The snapshot is current when it is newer than every file of the
+        store. The source storage is closed once the snapshot is open; if
+        the snapshot cannot be written, OSError is raised and the source
+        is left open for the caller to fall back on.
+        """
+        path = snapshot_path_for(data_file)
+        newest = max((os.stat(p).st_mtime_ns for p in storage.files() if os.path.exists(p)), default=0)
+        if not os.path.exists(path) or os.stat(path).st_mtime_ns < newest:
+            if not write_snapshot(path, storage.load(), storage.next_id):
+                raise OSError(f"Could not write snapshot {path}")
+        snapshot = cls(path, task_class)
+        storage.close()
+        return snapshot
+
+    # -- reading -----------------------------------------------------------
+
+    def _string(self, row: int, field: int) -> str:
+        """Decode one string field of a row from the heap."""
+        offsets = self._columns["strings"]
+        index = row * len(STRING_FIELDS) + field
+        return str(self._view[self._heap + offsets[index]:self._heap + offsets[index + 1]], "utf-8")
+
+    def _task(self, row: int) -> Task:
+        """Build the Task object for one row."""
+        title, description, created_at, completed_at, due_date, tags = (
+            self._string(row, field) for field in range(len(STRING_FIELDS))
+        )
+        return self.task_class(
+            id=self._columns["id"][row],
+            title=title,
+            description=description,
+            priority=self.header["priorities"][self._columns["priority"][row]],
+            status=self.header["statuses"][self._columns["status"][row]],
+            created_at=created_at,
+            completed_at=completed_at or None,
+            due_date=due_date or None,
+            tags=tags.split(TAG_SEPARATOR) if tags else [],
+        )
+
+    def _rows_with(self, column: str, values: List[str], value: str) -> List[int]:
+        """Rows whose coded column equals value."""
+        if value not in values:
+            return []
+        code = values.index(value)
+        return [row for row, c in enumerate(self._columns[column]) if c == code]
+
+    def load(self) -> List[Task]:
+        """Build every task (used for exports)."""
+        return [self._task(row) for row in range(self.count)]
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a task by binary search over the sorted ID column."""
+        ids = self._columns["id"]
+        row = bisect_left(ids, task_id)
+        if row < self.count and ids[row] == task_id:
+            return self._task(row)
+        return None
+
+    def list_tasks(
+        self,
+        status_filter: Optional[str] = None,
+        sort_by: str = "id",
+        tag_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None
+    ) -> List[Task]:
+        """List tasks, filtering on the coded columns before building any Task."""
+        rows = range(self.count)
+        if status_filter:
+            rows = self._rows_with("status", self.header["statuses"], status_filter.lower())
+        if priority_filter:
+            matches = set(self._rows_with("priority", self.header["priorities"], priority_filter.lower()))
+            rows = [row for row in rows if row in matches]
+        if tag_filter:
+            if tag_filter not in self.header["tags"]:
+                return []
+            tags_field = STRING_FIELDS.index("tags")
+            rows = [row for row in rows if tag_filter in self._string(row, tags_field).split(TAG_SEPARATOR)]
+
+        tasks = [self._task(row) for row in rows]
+        if sort_by == "priority":
+            tasks.sort(key=lambda x: PRIORITY_ORDER.get(x.priority, 3))
+        elif sort_by == "due_date":
+            tasks.sort(key=lambda x: (x.due_date or '9999-12-31'))
+        elif sort_by == "created":
+            tasks.sort(key=lambda x: x.created_at)
+        return tasks
+
+    def search_tasks(self, query: str) -> List[Task]:
+        """Search titles and descriptions case-insensitively."""
+        query_lower = query.lower()
+        return [
+            self._task(row) for row in range(self.count)
+            if query_lower in self._string(row, 0).lower() or query_lower in self._string(row, 1).lower()
+        ]
+
+    def get_statistics(self) -> Dict:
+        """Count statuses, priorities and overdue tasks from the columns alone."""
+        if self.count == 0:
+            return {"total": 0}
+
+        by_status = _count_codes(self._columns["status"], self.header["statuses"])
+        by_priority = _count_codes(self._columns["priority"], self.header["priorities"])
+        today = today_ordinal()
+        completed = self.header["statuses"].index("completed")
+        overdue = sum(
+            1 for due, status in zip(self._columns["due"], self._columns["status"])
+            if due != NO_DUE_DATE and due < today and status != completed
+        )
+        return {
+            "total": self.count,
+            "by_status": by_status,
+            "by_priority": by_priority,
+            "overdue": overdue,
+            "tags": set(self.header["tags"]),
+        }
+
+    # -- writing (refused) -------------------------------------------------
+
+    def apply(self, record: Dict, tasks: Iterable[Task]) -> bool:
+        """Snapshots are read-only."""
+        return False
+
+    def apply_batch(self, records: List[Dict], tasks: Iterable[Task]) -> bool:
+        """Snapshots are read-only."""
+        return False
+
+    def save(self, tasks: Iterable[Task]) -> bool:
+        """Snapshots are read-only."""
+        return False
+
+    def transaction(self):
+        """Nothing to group; writes are refused."""
+        return nullcontext(self)
+
+    def lock(self, shared: bool = False):
+        """A mapped snapshot is replaced by rename, so readers need no lock."""
+        return nullcontext(self)
+
+    def files(self) -> List[str]:
+        """Files that make up the store."""
+        return [self.path]
+
+    def close(self) -> None:
+        """Release the mapping."""
+        for column in self._columns.values():
+            column.release()
+        self._view.release()
+        self._map.close()
+
+
+def _count_codes(column: memoryview, values: List[str]) -> Dict[str, int]:
+    """Count the rows per value of a one-byte coded column."""
+    data = column.tobytes()
+    counts = {value: data.count(code) for code, value in enumerate(values)}
+    return {value: count for value, count in counts.items() if count}
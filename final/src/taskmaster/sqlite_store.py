@@ -0,0 +1,332 @@
+"""
+SQLite storage backend for TaskMaster.
+Keeps tasks in an indexed database instead of loading them all into memory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .locking import FileLock
+from .models import Task, PRIORITY_ORDER, is_past_due
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT 'medium',
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    due_date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+CREATE TABLE IF NOT EXISTS task_tags (
+    task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (task_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags (tag);
+"""
+
+COLUMNS = ["id", "title", "description", "priority", "status",
+           "created_at", "completed_at", "due_date"]
+
+# How often SQLite syncs for each durability policy
+SYNCHRONOUS_MODES = {"always": "FULL", "batch": "NORMAL", "none": "OFF"}
+
+SORT_ORDERS = {
+    "priority": "CASE t.priority " + " ".join(
+        f"WHEN '{name}' THEN {rank}" for name, rank in PRIORITY_ORDER.items()
+    ) + f" ELSE {len(PRIORITY_ORDER)} END",
+    "due_date": "COALESCE(t.due_date, '9999-12-31')",
+    "created": "t.created_at",
+}
+
+
+def db_path_for(data_file: str) -> str:
+    """Derive the database path from a data file name (tasks.json -> tasks.db)."""
+    root, ext = os.path.splitext(data_file)
+    return data_file if ext == ".db" else f"{root}.db"
+
+
+class SQLiteStorage:
+    """Stores tasks in SQLite with indexed status, priority, due date and tags.
+
+    Unlike the file backends this one answers queries itself, so TaskManager
+    never has to hold the whole task list in memory.
+    """
+
+    in_memory = False
+
+    def __init__(
+        self,
+        data_file: str,
+        task_class=Task,
+        durability: str = "batch",
+        group_commit_ms: int = 100
+    ):
+        """Open (and if needed create) the database next to data_file.
+        
+        durability maps to PRAGMA synchronous; SQLite commits atomically on
+        its own, so group_commit_ms is not used.
+        """
+        self.data_file = data_file
+        self.task_class = task_class
+        self.db_file = db_path_for(data_file)
+        self._depth = 0  # open transaction() blocks
+        self.renumbered: Dict[int, int] = {}  # new tasks moved off a taken ID
+        self._lock = FileLock(f"{data_file}.lock")
+        is_new = not os.path.exists(self.db_file)
+
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS_MODES[durability]}")
+        self.conn.create_function("py_lower", 1, str.lower, deterministic=True)
+        self.conn.executescript(SCHEMA)
+
+        if is_new and self.db_file != data_file and os.path.exists(data_file):
+            try:
+                self.import_json(data_file)
+            except (json.JSONDecodeError, IOError, TypeError):
+                pass  # Start empty; the JSON file is left untouched
+
+    # -- reading -----------------------------------------------------------
+
+    def _query(self, where: str = "", params=(), order: str = "t.id") -> Iterator[Task]:
+        """Run a task query and yield Task objects with their tags."""
+        sql = (
+            f"SELECT {', '.join('t.' + c for c in COLUMNS)}, g.tag "
+            f"FROM tasks t LEFT JOIN task_tags g ON g.task_id = t.id "
+            f"{where} ORDER BY {order}, t.id, g.position"
+        )
+        current = None
+        for row in self.conn.execute(sql, params):
+            if current is None or current["id"] != row[0]:
+                if current is not None:
+                    yield self.task_class(**current)
+                current = dict(zip(COLUMNS, row[:-1]), tags=[])
+            if row[-1] is not None:
+                current["tags"].append(row[-1])
+        if current is not None:
+            yield self.task_class(**current)
+
+    def load(self) -> List[Task]:
+        """Load every task (only used for exports and migrations)."""
+        return list(self._query())
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a task by ID using the primary key."""
+        return next(self._query("WHERE t.id = ?", (task_id,)), None)
+
+    def list_tasks(
+        self,
+        status_filter: Optional[str] = None,
+        sort_by: str = "id",
+        tag_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None
+    ) -> List[Task]:
+        """List tasks with indexed filtering and SQL sorting."""
+        clauses, params = [], []
+        if status_filter:
+            clauses.append("t.status = ?")
+            params.append(status_filter.lower())
+        if priority_filter:
+            clauses.append("t.priority = ?")
+            params.append(priority_filter.lower())
+        if tag_filter:
+            clauses.append("t.id IN (SELECT task_id FROM task_tags WHERE tag = ?)")
+            params.append(tag_filter)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return list(self._query(where, params, SORT_ORDERS.get(sort_by, "t.id")))
+
+    def search_tasks(self, query: str) -> List[Task]:
+        """Search titles and descriptions case-insensitively."""
+        where = "WHERE instr(py_lower(t.title), ?) > 0 OR instr(py_lower(t.description), ?) > 0"
+        query_lower = query.lower()
+        return list(self._query(where, (query_lower, query_lower)))
+
+    def count(self) -> int:
+        """Count stored tasks."""
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    @property
+    def next_id(self) -> int:
+        """Get the next available task ID (AUTOINCREMENT never reuses IDs)."""
+        row = self.conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'tasks'"
+        ).fetchone()
+        return (row[0] if row else 0) + 1
+
+    def get_statistics(self) -> Dict:
+        """Compute statistics with grouped SQL queries."""
+        total = self.count()
+        if total == 0:
+            return {"total": 0}
+
+        by_status = dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+        ))
+        by_priority = dict(self.conn.execute(
+            "SELECT priority, COUNT(*) FROM tasks GROUP BY priority"
+        ))
+        tags = {row[0] for row in self.conn.execute("SELECT DISTINCT tag FROM task_tags")}
+
+        # ISO dates sort as text, so the due_date index narrows the candidates
+        # and is_past_due() confirms each one.
+        today = datetime.now().date().isoformat()
+        overdue = sum(
+            1 for (due_date,) in self.conn.execute(
+                "SELECT due_date FROM tasks WHERE due_date < ? AND status != 'completed'",
+                (today,)
+            )
+            if is_past_due(due_date)
+        )
+
+        return {
+            "total": total,
+            "by_status": by_status,
+            "by_priority": by_priority,
+            "overdue": overdue,
+            "tags": tags,
+        }
+
+    # -- writing -----------------------------------------------------------
+
+    def _insert(self, task_dict: Dict) -> None:
+        """Insert one task row and its tags.
+        
+        If the ID is already taken (by another session, or by an existing
+        row during an import) the task gets the next AUTOINCREMENT ID
+        instead; task_dict is updated and the move noted in renumbered.
+        """
+        sql = (f"INSERT INTO tasks ({', '.join(COLUMNS)}) "
+               f"VALUES ({', '.join('?' for _ in COLUMNS)})")
+        values = [task_dict.get(c) for c in COLUMNS]
+        try:
+            self.conn.execute(sql, values)  # a failed statement leaves the transaction open
+        except sqlite3.IntegrityError:
+            if self.conn.execute("SELECT 1 FROM tasks WHERE id = ?", (values[0],)).fetchone() is None:
+                raise  # Not an ID clash
+            cursor = self.conn.execute(sql, [None] + values[1:])
+            self.renumbered[task_dict["id"]] = task_dict["id"] = cursor.lastrowid
+        self._set_tags(task_dict["id"], task_dict.get("tags") or [])
+
+    def _set_tags(self, task_id: int, tags: List[str]) -> None:
+        """Replace the tags of a task."""
+        self.conn.execute("DELETE FROM task_tags WHERE task_id = ?", (task_id,))
+        self.conn.executemany(
+            "INSERT INTO task_tags (task_id, position, tag) VALUES (?, ?, ?)",
+            [(task_id, position, tag) for position, tag in enumerate(tags)]
+        )
+
+    def _apply(self, record: Dict) -> None:
+        """Translate a mutation record into SQL statements."""
+        op = record.get("op")
+        if op == "add":
+            self._insert(record["task"])
+        elif op == "update":
+            fields = dict(record["fields"])
+            tags = fields.pop("tags", None)
+            columns = [c for c in fields if c in COLUMNS and c != "id"]
+            if columns:
+                self.conn.execute(
+                    f"UPDATE tasks SET {', '.join(c + ' = ?' for c in columns)} WHERE id = ?",
+                    [fields[c] for c in columns] + [record["id"]]
+                )
+            if tags is not None:
+                self._set_tags(record["id"], tags)
+        elif op == "delete":
+            self.conn.executemany(
+                "DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in record["ids"]]
+            )
+
+    def apply(self, record: Dict, tasks: Iterable[Task]) -> bool:
+        """Persist a single mutation record."""
+        return self.apply_batch([record], tasks)
+
+    def apply_batch(self, records: List[Dict], tasks: Iterable[Task]) -> bool:
+        """Persist several mutation records in one database transaction.
+
+        Inside transaction() the statements join the open transaction and
+        are committed when it ends.
+        """
+        try:
+            if self._depth:
+                for record in records:
+                    self._apply(record)
+            else:
+                with self.conn:
+                    for record in records:
+                        self._apply(record)
+            return True
+        except sqlite3.Error:
+            return False
+
+    @contextmanager
+    def transaction(self):
+        """Group the records applied inside the block into one commit.
+
+        Each level is a savepoint, so a nested block that raises rolls back
+        only its own statements.
+        """
+        savepoint = f"batch_{self._depth}"
+        self.conn.execute(f"SAVEPOINT {savepoint}")
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.conn.execute(f"ROLLBACK TO {savepoint}")
+            raise
+        finally:
+            self._depth -= 1
+            self.conn.execute(f"RELEASE {savepoint}")
+
+    def save(self, tasks: Iterable[Task]) -> bool:
+        """Replace the whole database contents with tasks."""
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM tasks")
+                for task in tasks:
+                    self._insert(task.to_dict())
+            return True
+        except sqlite3.Error:
+            return False
+
+    def import_json(self, json_file: str) -> int:
+        """Import tasks from a TaskMaster JSON file, returning the count.
+        
+        Existing tasks are kept; an imported task whose ID is in use gets a
+        new one (listed in renumbered).
+        """
+        with open(json_file, 'r') as f:
+            data = json.load(f)
+
+        tasks = [Task(**task_dict) for task_dict in data]
+        with self.conn:
+            for task in tasks:
+                self._insert(task.to_dict())
+        return len(tasks)
+
+    def lock(self, shared: bool = False):
+        """Hold the inter-process store lock, for work outside the database such as archiving."""
+        return self._lock.acquire(shared)
+
+    def files(self) -> List[str]:
+        """Files that make up the store."""
+        return [self.db_file]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
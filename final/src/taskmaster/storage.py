@@ -0,0 +1,1179 @@
+"""
+Storage backends for TaskMaster.
+Handles reading and writing tasks to disk in different formats.
+
+Every backend exposes the same small interface used by TaskManager:
+- load()                -> list of Task objects
+- save(tasks)           -> rewrite the whole store
+- apply(record, tasks)  -> persist a single mutation record
+- apply_batch(records, tasks) -> persist several records with one write
+- close()               -> finish pending work
+- next_id               -> high-water mark for new task IDs
+- signature()           -> cheap fingerprint of the files on disk
+
+Every backend takes a durability policy: "always" syncs each write to disk
+before returning, "batch" group-commits small appends with one fsync every
+group_commit_ms, and "none" leaves flushing to the operating system.
+Snapshots are always replaced atomically via a temp file and rename.
+
+File backends are safe to share between processes: writes hold an advisory
+lock on <data_file>.lock and bump a version number kept in <data_file>.meta.
+- lock(shared=False)    -> context manager holding the store lock
+- is_stale()            -> True if another process wrote since our last sync
+- changed()             -> cheap stat check for readers deciding to reload
+
+Backends with in_memory = False (SQLite, sharded and paged) also answer get_task,
+list_tasks, search_tasks, get_statistics and next_id themselves, so the
+manager does not keep the task list in memory. They provide transaction()
+to group applied records instead of apply_batch buffering.
+
+Mutation records are plain dicts:
+- {"op": "add", "task": {...}}
+- {"op": "update", "id": 3, "fields": {"status": "completed", ...}}
+- {"op": "delete", "ids": [3, 4]}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .loader import check_task_dict, load_report, load_tasks, quarantine
+from .locking import FileLock
+from .models import Task, PRIORITY_ORDER
+
+
+def apply_record(tasks_by_id: Dict[int, Task], record: Dict, task_class=Task) -> None:
+    """Apply one mutation record to a dict of tasks keyed by ID."""
+    op = record.get("op")
+    if op == "add":
+        task = task_class(**record["task"])
+        tasks_by_id[task.id] = task
+    elif op == "update":
+        task = tasks_by_id.get(record["id"])
+        if task is not None:
+            for field, value in record["fields"].items():
+                setattr(task, field, value)
+    elif op == "delete":
+        for task_id in record["ids"]:
+            tasks_by_id.pop(task_id, None)
+
+
+def check_record(record) -> Optional[str]:
+    """Check a decoded record has the shape of a mutation record (None if fine)."""
+    if not isinstance(record, dict):
+        return "record is not an object"
+    op = record.get("op")
+    if op == "add":
+        return check_task_dict(record.get("task"))
+    if op == "update":
+        if not isinstance(record.get("id"), int):
+            return "missing or non-integer id"
+        if not isinstance(record.get("fields"), dict):
+            return "fields is not an object"
+        return None
+    if op == "delete":
+        ids = record.get("ids")
+        if not isinstance(ids, list) or not all(isinstance(task_id, int) for task_id in ids):
+            return "ids is not a list of integers"
+        return None
+    return "unknown op"
+
+
+def replay(tasks: List[Task], records, task_class=Task, bad: Optional[List] = None) -> List[Task]:
+    """Replay mutation records on top of a list of tasks.
+    
+    If bad is given, a record that cannot be applied is skipped and added
+    to it as (record, reason) instead of raising.
+    """
+    tasks_by_id = {task.id: task for task in tasks}
+    for record in records:
+        try:
+            apply_record(tasks_by_id, record, task_class)
+        except (TypeError, ValueError, KeyError, AttributeError) as e:
+            if bad is None:
+                raise
+            bad.append((record, str(e) or type(e).__name__))
+    return list(tasks_by_id.values())
+
+
+DURABILITY_POLICIES = ["always", "batch", "none"]
+DEFAULT_CACHE_SIZE = 10_000
+
+
+def fsync_directory(directory: str) -> None:
+    """Sync a directory so a rename or new file inside it survives a crash."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(
+    path: str,
+    data,
+    sync: bool = True,
+    indent: Optional[int] = 2,
+    mode_from: Optional[str] = None
+) -> bool:
+    """Write JSON to a temp file and rename it over path."""
+    return write_atomic(path, lambda f: json.dump(data, f, indent=indent), sync,
+                        mode_from=mode_from)
+
+
+def _read_umask() -> int:
+    """Current process umask (it can only be read by setting it)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+UMASK = _read_umask()
+
+
+def file_mode(path: str) -> int:
+    """Permission bits for a file replacing path: its current ones, or open()'s default."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~UMASK
+
+
+def write_atomic(
+    path: str,
+    write: Callable,
+    sync: bool = True,
+    mode: str = 'w',
+    mode_from: Optional[str] = None
+) -> bool:
+    """Call write(file) on a temp file and rename it over path.
+    
+    Readers see either the old file or the new one, never a half-written mix.
+    With sync=True the temp file is fsynced before the rename and the
+    directory after it, so the new contents also survive a power loss.
+    The new file keeps the permissions of mode_from (default path), since
+    mkstemp() would otherwise leave it readable by its owner only.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    permissions = file_mode(mode_from or path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, mode) as f:
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), permissions)
+            else:
+                os.chmod(tmp_path, permissions)
+            write(f)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        if sync:
+            fsync_directory(directory)
+        return True
+    except (IOError, OSError, TypeError, ValueError):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+class JSONStorage:
+    """Stores the whole task list as a single pretty-printed JSON file.
+
+    Every successful write increments the store version in the .meta file.
+    A writer compares it with the version it last loaded or wrote to tell
+    whether its in-memory copy is stale.
+    """
+
+    in_memory = True
+
+    def __init__(
+        self,
+        data_file: str,
+        task_class=Task,
+        durability: str = "batch",
+        group_commit_ms: int = 100
+    ):
+        """Initialize the storage with a data file.
+        
+        task_class builds the loaded tasks (Task or CompactTask). Whole-file
+        saves are synced unless durability is "none".
+        """
+        self.data_file = data_file
+        self.meta_file = f"{data_file}.meta"
+        self.quarantine_file = f"{data_file}.quarantine"
+        self.last_load: Optional[Dict] = None  # report from the last load
+        self.task_class = task_class
+        self.durability = durability
+        self.group_commit_ms = group_commit_ms
+        self.next_id = 1
+        self.version = 0
+        self.lock_file = f"{data_file}.lock"
+        self._lock = FileLock(self.lock_file)
+        self._signature = None  # files as of our last load or write
+        self.append_file: Optional[str] = None  # synced by the group-commit timer
+        self._sync_timer: Optional[threading.Timer] = None
+        self._sync_lock = threading.Lock()
+
+    def lock(self, shared: bool = False):
+        """Hold the inter-process store lock (shared for readers)."""
+        return self._lock.acquire(shared)
+
+    def _read_meta(self) -> Dict:
+        """Read the .meta file (empty if missing or unreadable)."""
+        try:
+            with open(self.meta_file, 'r') as f:
+                meta = json.load(f)
+            return meta if isinstance(meta, dict) else {}
+        except (IOError, ValueError):
+            return {}
+
+    def _load_meta(self) -> None:
+        """Read the ID high-water mark and version stored next to the data file."""
+        meta = self._read_meta()
+        try:
+            self.next_id = max(1, int(meta.get("next_id", 1)))
+            self.version = int(meta.get("version", 0))
+        except (ValueError, TypeError):
+            self.next_id, self.version = 1, 0
+
+    def _save_meta(self, sync: Optional[bool] = None) -> bool:
+        """Write the ID high-water mark and version next to the data file."""
+        if sync is None:
+            sync = self.durability != "none"
+        return write_json_atomic(self.meta_file, {"next_id": self.next_id, "version": self.version},
+                                 sync=sync, indent=None)
+
+    def is_stale(self) -> bool:
+        """Check if another process has written since our last load or write."""
+        if self.signature() == self._signature:
+            return False
+        try:
+            return int(self._read_meta().get("version", 0)) != self.version
+        except (ValueError, TypeError):
+            return True
+
+    def changed(self) -> bool:
+        """Check by file size and mtime whether the store changed since our last sync."""
+        return self.signature() != self._signature
+
+    def load(self) -> List[Task]:
+        """Load tasks from the JSON file."""
+        with self.lock(shared=True):
+            self._load_meta()
+            tasks = self._load_snapshot()
+            self._signature = self.signature()
+        return tasks
+
+    def _load_snapshot(self) -> List[Task]:
+        """Stream the task list from the JSON file, quarantining bad records.
+        
+        The counts and timing end up in last_load.
+        """
+        if not os.path.exists(self.data_file):
+            self.last_load = None
+            return []
+
+        try:
+            tasks, self.last_load = load_tasks(self.data_file, self.task_class, self.quarantine_file)
+        except (IOError, ValueError):  # unreadable or not text
+            self.last_load = None
+            return []
+        return tasks
+
+    def save(self, tasks: Iterable[Task]) -> bool:
+        """Save tasks to the JSON file atomically and bump the version."""
+        data = [task.to_dict() for task in tasks]
+        with self.lock():
+            if not write_json_atomic(self.data_file, data, sync=self.durability != "none"):
+                return False
+            self.version += 1
+            saved = self._save_meta()
+            self._signature = self.signature()
+        return saved
+
+    def apply(self, record: Dict, tasks: Iterable[Task]) -> bool:
+        """Persist a mutation by rewriting the whole file."""
+        return self.save(tasks)
+
+    def apply_batch(self, records: List[Dict], tasks: Iterable[Task]) -> bool:
+        """Persist a batch of mutations with a single rewrite."""
+        return self.save(tasks)
+
+    def _schedule_sync(self) -> None:
+        """Start the group-commit timer unless one is already pending."""
+        with self._sync_lock:
+            if self._sync_timer is None:
+                self._sync_timer = threading.Timer(self.group_commit_ms / 1000, self.sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+    def sync(self) -> None:
+        """Fsync the append-only file, committing every append made so far."""
+        with self._sync_lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if self.append_file is None:
+                return
+            try:
+                fd = os.open(self.append_file, os.O_RDONLY)
+            except OSError:
+                return  # Nothing appended since the last rotation
+            try:
+                os.fsync(fd)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+            fsync_directory(os.path.dirname(os.path.abspath(self.append_file)))
+
+    def files(self) -> List[str]:
+        """Files that make up the store."""
+        return [self.data_file, self.meta_file]
+
+    def signature(self) -> List:
+        """Fingerprint the store files by size and modification time."""
+        result = []
+        for path in self.files():
+            try:
+                st = os.stat(path)
+                result.append([os.path.basename(path), st.st_size, st.st_mtime_ns, st.st_ino])
+            except OSError:
+                result.append([os.path.basename(path), None, None, None])
+        return result
+
+    def close(self) -> None:
+        """Nothing to clean up for plain JSON files."""
+
+
+class JournalStorage(JSONStorage):
+    """JSON snapshot plus an append-only journal of mutation records.
+
+    Each mutation appends one compact line to ``<data_file>.journal``, so a
+    status flip costs a single small write no matter how many tasks exist.
+    Loading reads the last snapshot and replays the journal on top of it.
+
+    With durability "batch" appends reach the OS immediately, and a timer
+    fsyncs the journal at most group_commit_ms later, so a burst of
+    mutations shares one fsync. "always" fsyncs after every append.
+
+    Once the journal passes max_bytes or max_records it is compacted: the
+    journal is rotated to ``<data_file>.journal.1``, a fresh snapshot is
+    written in a background thread and then renamed into place, and the
+    rotated journal is removed. Replaying records is idempotent, so a crash at any point leaves
+    a snapshot plus journals that still load to the latest state.
+    """
+
+    def __init__(
+        self,
+        data_file: str,
+        task_class=Task,
+        max_bytes: int = 1024 * 1024,
+        max_records: int = 1000,
+        durability: str = "batch",
+        group_commit_ms: int = 100
+    ):
+        """Initialize the storage with a data file and compaction thresholds."""
+        super().__init__(data_file, task_class, durability, group_commit_ms)
+        self.journal_file = f"{data_file}.journal"
+        self.rotated_file = f"{self.journal_file}.1"
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.journal_bytes = 0
+        self.journal_records = 0
+        self.compact_file = f"{data_file}.compact"
+        self._compactor: Optional[threading.Thread] = None
+        self._compacted = False
+        self._rotated_signature = None
+        self.append_file = self.journal_file
+
+    def read_journal(self, path: Optional[str] = None, bad: Optional[List] = None) -> Iterator[Dict]:
+        """Yield the valid records stored in a journal file.
+        
+        Lines that do not parse (such as a torn final line from an
+        interrupted append) or are not a mutation record are skipped and,
+        if bad is given, added to it as (line or record, reason).
+        """
+        path = path or self.journal_file
+        if not os.path.exists(path):
+            return
+
+        with open(path, 'r', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    if bad is not None:
+                        bad.append((line, "unparseable JSON"))
+                    continue
+                reason = check_record(record)
+                if reason is not None:
+                    if bad is not None:
+                        bad.append((record, reason))
+                    continue
+                if record["op"] == "add":
+                    self.next_id = max(self.next_id, record["task"]["id"] + 1)
+                yield record
+
+    def _count_journal(self) -> None:
+        """Refresh the size and record count of the live journal."""
+        self.journal_records = sum(1 for _ in self.read_journal())
+        try:
+            self.journal_bytes = os.path.getsize(self.journal_file)
+        except OSError:
+            self.journal_bytes = 0
+
+    def load(self) -> List[Task]:
+        """Load the snapshot and replay the journals on top of it.
+        
+        Journal records that are malformed or cannot be applied are skipped
+        and quarantined one by one, like bad records in the snapshot.
+        """
+        self.wait()
+        start = time.perf_counter()
+        with self.lock(shared=True):
+            self._load_meta()
+            tasks = self._load_snapshot()
+            quarantined = self.last_load["quarantined"] if self.last_load else 0
+            for path in (self.rotated_file, self.journal_file):
+                bad: List[Tuple[object, str]] = []
+                tasks = replay(tasks, self.read_journal(path, bad), self.task_class, bad)
+                quarantine(self.quarantine_file, path, bad)
+                quarantined += len(bad)
+            self.last_load = load_report(len(tasks), quarantined, self.quarantine_file, start)
+            self._count_journal()
+            self._signature = self.signature()
+
+        if self.needs_compaction() or os.path.exists(self.rotated_file):
+            self.compact(tasks, background=True)
+        return tasks
+
+    def save(self, tasks: Iterable[Task]) -> bool:
+        """Write a full snapshot and start a fresh journal."""
+        self.wait()
+        data = [task.to_dict() for task in tasks]
+        with self.lock():
+            if not write_json_atomic(self.data_file, data, sync=self.durability != "none"):
+                return False
+            self.version += 1
+            if not self._save_meta():
+                return False
+            try:
+                for path in (self.journal_file, self.rotated_file):
+                    if os.path.exists(path):
+                        os.remove(path)
+            except OSError:
+                return False
+            self._signature = self.signature()
+        self.journal_bytes = 0
+        self.journal_records = 0
+        return True
+
+    def apply(self, record: Dict, tasks: Iterable[Task]) -> bool:
+        """Append a mutation record to the journal."""
+        return self.apply_batch([record], tasks)
+
+    def apply_batch(self, records: List[Dict], tasks: Iterable[Task]) -> bool:
+        """Append several mutation records to the journal in one write."""
+        self._finish_compaction()
+        data = "".join(json.dumps(record, separators=(',', ':')) + "\n" for record in records)
+        with self.lock():
+            is_new = not os.path.exists(self.journal_file)
+            try:
+                with open(self.journal_file, 'a') as f:
+                    f.write(data)
+                    if self.durability == "always":
+                        f.flush()
+                        os.fsync(f.fileno())
+            except (IOError, OSError):
+                return False
+
+            if self.durability == "always" and is_new:
+                fsync_directory(os.path.dirname(os.path.abspath(self.journal_file)))
+            elif self.durability == "batch":
+                self._schedule_sync()
+
+            # Recovery does not depend on the version, so it is only synced
+            # when every write is
+            self.version += 1
+            self._save_meta(sync=self.durability == "always")
+            self._signature = self.signature()
+
+            self.journal_bytes += len(data)
+            self.journal_records += len(records)
+            if self.needs_compaction():
+                self.compact(tasks, background=True)
+        return True
+
+    def needs_compaction(self) -> bool:
+        """Check whether the journal has grown past its thresholds."""
+        return (
+            self.journal_bytes >= self.max_bytes
+            or self.journal_records >= self.max_records
+        )
+
+    def is_compacting(self) -> bool:
+        """Check if a background compaction is still running."""
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def compact(self, tasks: Iterable[Task], background: bool = False) -> bool:
+        """Fold the journal into a fresh snapshot.
+        
+        The journal is rotated and the task data captured in the calling
+        thread, so later appends go to a new journal while the snapshot is
+        written to <data_file>.compact. Installing that file and dropping the
+        rotated journal happens back on the calling thread, under the store
+        lock, once the write has finished. Compaction is skipped when another
+        process has written since tasks were loaded.
+        """
+        if self._compactor is not None:
+            return False
+
+        with self.lock():
+            if self.signature() != self._signature:
+                return False
+            try:
+                self._rotate_journal()
+            except OSError:
+                return False
+            self._rotated_signature = self._file_signature(self.rotated_file)
+            self._signature = self.signature()
+        self.journal_bytes = 0
+        self.journal_records = 0
+
+        data = [task.to_dict() for task in tasks]
+        self._compactor = threading.Thread(
+            target=self._write_snapshot, args=(data,), daemon=True
+        )
+        self._compactor.start()
+        if background:
+            return True
+        return self.wait()
+
+    def _rotate_journal(self) -> None:
+        """Move the live journal aside so compaction can fold it in."""
+        if not os.path.exists(self.journal_file):
+            return
+        if self.durability != "none":
+            self.sync()
+        if os.path.exists(self.rotated_file):
+            # Left behind by an interrupted compaction; merge into it
+            with open(self.journal_file, 'r') as src, open(self.rotated_file, 'a') as dst:
+                dst.write(src.read())
+            os.remove(self.journal_file)
+        else:
+            os.replace(self.journal_file, self.rotated_file)
+
+    def _write_snapshot(self, data: List[Dict]) -> None:
+        """Write the compacted snapshot next to the live one (runs in the background)."""
+        self._compacted = write_json_atomic(
+            self.compact_file, data, sync=self.durability != "none", mode_from=self.data_file
+        )
+
+    def _finish_compaction(self) -> bool:
+        """Install a finished background snapshot and drop the rotated journal.
+        
+        If another process touched the rotated journal in the meantime, the
+        snapshot may be missing its records, so it is discarded instead.
+        """
+        if self._compactor is None or self._compactor.is_alive():
+            return False
+        self._compactor.join()
+        self._compactor = None
+
+        with self.lock():
+            in_sync = self.signature() == self._signature
+            if not (self._compacted and self._file_signature(self.rotated_file) == self._rotated_signature):
+                try:
+                    os.remove(self.compact_file)
+                except OSError:
+                    pass
+                return False
+            try:
+                os.replace(self.compact_file, self.data_file)
+                if self.durability != "none":
+                    fsync_directory(os.path.dirname(os.path.abspath(self.data_file)))
+                if os.path.exists(self.rotated_file):
+                    os.remove(self.rotated_file)
+            except OSError:
+                return False
+            if in_sync:
+                self._signature = self.signature()
+        return True
+
+    @staticmethod
+    def _file_signature(path: str) -> Optional[List]:
+        """Size, mtime and inode of one file (None if it does not exist)."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+    def files(self) -> List[str]:
+        """Files that make up the store, including the journals."""
+        return super().files() + [self.journal_file, self.rotated_file]
+
+    def wait(self) -> bool:
+        """Block until any background compaction has finished and install it."""
+        if self._compactor is None:
+            return False
+        self._compactor.join()
+        return self._finish_compaction()
+
+    def close(self) -> None:
+        """Wait for background compaction and commit pending appends."""
+        self.wait()
+        if self.durability != "none":
+            self.sync()
+
+
+def jsonl_path_for(data_file: str) -> str:
+    """Derive the JSON Lines path from a data file name (tasks.json -> tasks.jsonl)."""
+    root, ext = os.path.splitext(data_file)
+    return data_file if ext == ".jsonl" else f"{root}.jsonl"
+
+
+class JSONLinesStorage(JSONStorage):
+    """One compact JSON object per task per line, updated record by record.
+
+    offsets maps each live task ID to the byte offset and length of its
+    line, so a mutation only touches the lines of the tasks it changed:
+    an update that fits is rewritten in place (padded with spaces), a longer
+    one is appended and the old line blanked out, and a delete blanks the
+    line and appends a ``{"id": N, "deleted": true}`` tombstone. Several
+    changes to one task in a batch are folded into a single write.
+
+    Loading streams the file line by line; later lines win, so a crash
+    between appending and blanking still loads the newest version. Once
+    blank and superseded lines make up half the file (and at least
+    min_dead_bytes) it is rewritten.
+    """
+
+    min_dead_bytes = 64 * 1024
+
+    def __init__(
+        self,
+        data_file: str,
+        task_class=Task,
+        durability: str = "batch",
+        group_commit_ms: int = 100
+    ):
+        """Initialize the storage next to data_file (tasks.json -> tasks.jsonl).
+        
+        A new store imports the existing JSON data file, if any.
+        """
+        super().__init__(data_file, task_class, durability, group_commit_ms)
+        self.lines_file = jsonl_path_for(data_file)
+        self.append_file = self.lines_file
+        self.offsets: Dict[int, Tuple[int, int]] = {}
+        self.end = 0
+        self.dead_bytes = 0
+
+        if (self.lines_file != data_file and not os.path.exists(self.lines_file)
+                and os.path.exists(data_file)):
+            self.save(self._load_snapshot())
+
+    def files(self) -> List[str]:
+        """Files that make up the store."""
+        return [self.lines_file, self.meta_file]
+
+    def load(self) -> List[Task]:
+        """Stream the tasks in from the lines file."""
+        with self.lock(shared=True):
+            self._load_meta()
+            tasks = self._scan()
+            self._signature = self.signature()
+        return list(tasks.values())
+
+    def _scan(self, keep: bool = True) -> Dict[int, Task]:
+        """Read every line, rebuilding offsets and the dead byte count.
+        
+        With keep=False only the offsets are kept, not the tasks.
+        """
+        start = time.perf_counter()
+        tasks: Dict[int, Task] = {}
+        bad = []
+        self.offsets = {}
+        self.dead_bytes = 0
+        self.last_load = None
+        offset = 0
+        try:
+            f = open(self.lines_file, 'rb')
+        except OSError:
+            self.end = 0
+            return tasks
+
+        with f:
+            for raw in f:
+                text = raw.strip()
+                task = None
+                if text:
+                    try:
+                        data = json.loads(text)
+                        if data.get("deleted"):
+                            old = self.offsets.pop(data["id"], None)
+                            tasks.pop(data["id"], None)
+                            self.dead_bytes += old[1] + 1 if old else 0
+                        else:
+                            task = self.task_class(**data)
+                    except (ValueError, TypeError, KeyError, AttributeError) as e:
+                        # A torn or malformed line
+                        bad.append((text.decode(errors="replace"), str(e) or type(e).__name__))
+                if task is None:
+                    self.dead_bytes += len(raw)
+                else:
+                    old = self.offsets.get(task.id)
+                    if old is not None:
+                        self.dead_bytes += old[1] + 1  # superseded by this line
+                    self.offsets[task.id] = (offset, len(raw.rstrip(b"\n")))
+                    if keep:
+                        tasks[task.id] = task
+                    self.next_id = max(self.next_id, task.id + 1)
+                offset += len(raw)
+        self.end = offset
+
+        quarantine(self.quarantine_file, self.lines_file, bad)
+        self.last_load = load_report(len(self.offsets), len(bad), self.quarantine_file, start)
+        # Lines are in write order, not ID order; the other backends load by ID
+        return dict(sorted(tasks.items()))
+
+    def save(self, tasks: Iterable[Task]) -> bool:
+        """Rewrite the whole file compactly and atomically."""
+        offsets: Dict[int, Tuple[int, int]] = {}
+        lines = []
+        position = 0
+        for task in tasks:
+            line = json.dumps(task.to_dict(), separators=(',', ':')).encode()
+            offsets[task.id] = (position, len(line))
+            lines.append(line)
+            position += len(line) + 1
+
+        def write(f):
+            for line in lines:
+                f.write(line + b"\n")
+
+        with self.lock():
+            if not write_atomic(self.lines_file, write, sync=self.durability != "none", mode='wb'):
+                return False
+            self.offsets, self.end, self.dead_bytes = offsets, position, 0
+            self.version += 1
+            saved = self._save_meta()
+            self._signature = self.signature()
+        return saved
+
+    def apply_batch(self, records: List[Dict], tasks: Iterable[Task]) -> bool:
+        """Rewrite or append only the lines of the tasks the records touch."""
+        with self.lock():
+            if not os.path.exists(self.lines_file):
+                open(self.lines_file, 'ab').close()
+                self.end = 0
+            try:
+                with open(self.lines_file, 'r+b') as f:
+                    for task_id, data in self._fold(f, records).items():
+                        self._write_task(f, task_id, data)
+                    if self.durability == "always":
+                        f.flush()
+                        os.fsync(f.fileno())
+            except (IOError, OSError, ValueError):
+                return False
+
+            if self.durability == "batch":
+                self._schedule_sync()
+            self.version += 1
+            self._save_meta(sync=self.durability == "always")
+            self._signature = self.signature()
+
+            if self.dead_bytes > max(self.end // 2, self.min_dead_bytes):
+                return self.save(tasks)
+        return True
+
+    def _fold(self, f, records: List[Dict]) -> Dict[int, Optional[Dict]]:
+        """Work out the final line content per changed task (None = deleted)."""
+        changed: Dict[int, Optional[Dict]] = {}
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                changed[record["task"]["id"]] = dict(record["task"])
+            elif op == "update":
+                task_id = record["id"]
+                current = changed[task_id] if task_id in changed else self._read_line(f, task_id)
+                if current is not None:
+                    current.update(record["fields"])
+                    changed[task_id] = current
+            elif op == "delete":
+                for task_id in record["ids"]:
+                    changed[task_id] = None
+        return changed
+
+    def _read_line(self, f, task_id: int) -> Optional[Dict]:
+        """Read the stored fields of one task by its offset."""
+        location = self.offsets.get(task_id)
+        if location is None:
+            return None
+        f.seek(location[0])
+        return json.loads(f.read(location[1]))
+
+    def _write_task(self, f, task_id: int, data: Optional[Dict]) -> None:
+        """Write one task's new line (or tombstone) and retire the old one."""
+        old = self.offsets.get(task_id)
+        if data is None:
+            if old is None:
+                return
+            self._append(f, {"id": task_id, "deleted": True})
+            del self.offsets[task_id]
+        else:
+            line = json.dumps(data, separators=(',', ':')).encode()
+            if old is not None and len(line) <= old[1]:
+                f.seek(old[0])
+                f.write(line.ljust(old[1]))
+                return
+            self.offsets[task_id] = self._append(f, data)
+        if old is not None:
+            # Blank the old line only after the new one is written
+            f.seek(old[0])
+            f.write(b" " * old[1])
+            self.dead_bytes += old[1] + 1
+
+    def _append(self, f, data: Dict) -> Tuple[int, int]:
+        """Append one line at the end of the file, returning its location."""
+        line = json.dumps(data, separators=(',', ':')).encode()
+        f.seek(self.end)
+        f.write(line + b"\n")
+        location = (self.end, len(line))
+        self.end += len(line) + 1
+        if data.get("deleted"):
+            self.dead_bytes += len(line) + 1
+        return location
+
+
+class PagedStorage(JSONLinesStorage):
+    """JSON Lines store read on demand through a bounded LRU cache of tasks.
+
+    Only the line offsets stay in memory. get_task reads one line on a
+    cache miss and keeps at most cache_size recently used tasks; list,
+    search and statistics stream the file in ID order and bypass the
+    cache, so one scan does not evict the working set. list_tasks and
+    search_tasks return generators; don't write while one is running.
+
+    Changes made inside transaction() are kept in an overlay that reads
+    see, and written as one batch when it ends. The file format is the
+    same as the "jsonl" backend.
+    """
+
+    in_memory = False
+
+    def __init__(
+        self,
+        data_file: str,
+        task_class=Task,
+        durability: str = "batch",
+        group_commit_ms: int = 100,
+        cache_size: int = DEFAULT_CACHE_SIZE
+    ):
+        """Index the lines file (importing tasks.json if it is new)."""
+        super().__init__(data_file, task_class, durability, group_commit_ms)
+        self.cache_size = max(0, cache_size)
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[int, Task] = OrderedDict()
+        self._overlay: Dict[int, Optional[Task]] = {}  # None marks a deleted task
+        self._pending: List[Dict] = []
+        self._depth = 0
+        self.renumbered: Dict[int, int] = {}  # new task IDs moved at flush, old -> new
+        self._index()
+
+    def _index(self) -> None:
+        """Rebuild the line offsets from the file and empty the cache."""
+        with self.lock(shared=True):
+            self._load_meta()
+            self._scan(keep=False)
+            self._signature = self.signature()
+        # Tasks we added but have not written yet keep their IDs reserved
+        self.next_id = max([self.next_id] + [task_id + 1 for task_id in self._overlay])
+        self._cache.clear()
+
+    def _refresh(self) -> None:
+        """Re-index if another process has changed the file."""
+        if self.changed():
+            self._index()
+
+    def refresh_next_id(self) -> int:
+        """Catch up with IDs other processes have handed out, and return the next free one."""
+        self._refresh()
+        return self.next_id
+
+    def _read(self, f, task_id: int) -> Optional[Task]:
+        """Build one task from its line."""
+        data = self._read_line(f, task_id)
+        return None if data is None else self.task_class(**data)
+
+    # -- reading -----------------------------------------------------------
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a task from the cache, or read its line on a miss."""
+        self._refresh()
+        if task_id in self._overlay:
+            return self._overlay[task_id]
+        task = self._cache.get(task_id)
+        if task is not None:
+            self._cache.move_to_end(task_id)
+            self.hits += 1
+            return task
+
+        self.misses += 1
+        if task_id not in self.offsets:
+            return None
+        with open(self.lines_file, 'rb') as f:
+            task = self._read(f, task_id)
+        if self.cache_size:
+            self._cache[task_id] = task
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return task
+
+    def _stream(self, overlay: bool = True) -> Iterator[Task]:
+        """Yield every task in ID order, reading lines as they are needed.
+        
+        With overlay=False only the file is read (cache and overlay aside).
+        """
+        self._refresh()
+        if overlay:
+            ids = sorted(self.offsets.keys() | self._overlay.keys())
+        else:
+            ids = sorted(self.offsets)
+        try:
+            f = open(self.lines_file, 'rb')
+        except OSError:
+            f = None
+        try:
+            for task_id in ids:
+                if not overlay:
+                    task = self._read(f, task_id)
+                elif task_id in self._overlay:
+                    task = self._overlay[task_id]
+                else:
+                    task = self._cache.get(task_id) or self._read(f, task_id)
+                if task is not None:
+                    yield task
+        finally:
+            if f is not None:
+                f.close()
+
+    def load(self) -> List[Task]:
+        """Read every task (prefer list_tasks, which streams)."""
+        return list(self._stream())
+
+    def list_tasks(
+        self,
+        status_filter: Optional[str] = None,
+        sort_by: str = "id",
+        tag_filter: Optional[str] = None,
+        priority_filter: Optional[str] = None
+    ) -> Iterator[Task]:
+        """Stream matching tasks (sorting by anything but ID collects the matches)."""
+        tasks = (
+            task for task in self._stream()
+            if (not status_filter or task.status == status_filter.lower())
+            and (not priority_filter or task.priority == priority_filter.lower())
+            and (not tag_filter or tag_filter in task.tags)
+        )
+        if sort_by == "priority":
+            tasks = iter(sorted(tasks, key=lambda x: PRIORITY_ORDER.get(x.priority, 3)))
+        elif sort_by == "due_date":
+            tasks = iter(sorted(tasks, key=lambda x: (x.due_date or '9999-12-31')))
+        elif sort_by == "created":
+            tasks = iter(sorted(tasks, key=lambda x: x.created_at))
+        return tasks
+
+    def search_tasks(self, query: str) -> Iterator[Task]:
+        """Stream tasks whose title or description contains query."""
+        query_lower = query.lower()
+        return (
+            task for task in self._stream()
+            if query_lower in task.title.lower() or query_lower in task.description.lower()
+        )
+
+    def get_statistics(self) -> Dict:
+        """Compute statistics in one pass over the file, plus cache counters."""
+        total = overdue = 0
+        by_status: Dict[str, int] = {}
+        by_priority: Dict[str, int] = {}
+        tags = set()
+        for task in self._stream():
+            total += 1
+            by_status[task.status] = by_status.get(task.status, 0) + 1
+            by_priority[task.priority] = by_priority.get(task.priority, 0) + 1
+            tags.update(task.tags)
+            overdue += task.is_overdue()
+
+        cache = {"capacity": self.cache_size, "size": len(self._cache), "hits": self.hits, "misses": self.misses}
+        if total == 0:
+            return {"total": 0, "cache": cache}
+        return {
+            "total": total,
+            "by_status": by_status,
+            "by_priority": by_priority,
+            "overdue": overdue,
+            "tags": tags,
+            "cache": cache,
+        }
+
+    # -- writing -----------------------------------------------------------
+
+    def _apply_overlay(self, records: List[Dict]) -> None:
+        """Make records visible to reads before they are written."""
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                task = self.task_class(**record["task"])
+                self._overlay[task.id] = task
+                self.next_id = max(self.next_id, task.id + 1)
+            elif op == "update":
+                current = self.get_task(record["id"])
+                if current is not None:
+                    task = self.task_class(**current.to_dict())
+                    for field, value in record["fields"].items():
+                        setattr(task, field, value)
+                    self._overlay[task.id] = task
+            elif op == "delete":
+                for task_id in record["ids"]:
+                    self._overlay[task_id] = None
+
+    def _renumber(self, records: List[Dict]) -> None:
+        """Give new tasks whose ID another process has taken the next free one.
+
+        Records are rewritten in place (so callers holding them see the new
+        IDs) and the moves are kept in self.renumbered.
+        """
+        ids: Dict[int, int] = {}
+        for record in records:
+            op = record.get("op")
+            if op == "add" and record["task"]["id"] in self.offsets:
+                ids[record["task"]["id"]] = record["task"]["id"] = self.next_id
+                self.next_id += 1
+            elif op == "update":
+                record["id"] = ids.get(record["id"], record["id"])
+            elif op == "delete":
+                record["ids"] = [ids.get(i, i) for i in record["ids"]]
+        self.renumbered.update(ids)
+
+    def _flush(self) -> bool:
+        """Write the pending records as one batch and drop the overlay."""
+        records, self._pending = self._pending, []
+        with self.lock():
+            if self.is_stale():
+                self._index()
+            # Checked even when not stale: a read may already have re-indexed
+            # the file after another process took one of our IDs
+            self._renumber(records)
+            for record in records:
+                if record.get("op") == "add":
+                    self.next_id = max(self.next_id, record["task"]["id"] + 1)
+            try:
+                # Compaction, if due, rewrites the file from what was just written
+                saved = super().apply_batch(records, self._stream(overlay=False))
+            finally:
+                # Cached copies of touched tasks may have been edited in place;
+                # drop them so the next read comes from the file
+                for task_id in self._overlay:
+                    self._cache.pop(task_id, None)
+                self._overlay.clear()
+        return saved
+
+    def apply_batch(self, records: List[Dict], tasks: Iterable[Task]) -> bool:
+        """Persist records (held in the overlay until an open transaction ends)."""
+        self._apply_overlay(records)
+        self._pending.extend(records)
+        if self._depth:
+            return True
+        return self._flush()
+
+    @contextmanager
+    def transaction(self):
+        """Group the records applied inside the block into one write.
+
+        A block that raises discards its own records; the overlay is
+        rebuilt from the ones before it.
+        """
+        mark, next_id = len(self._pending), self.next_id
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            del self._pending[mark:]
+            # get_task hands out cached objects that callers edit in place,
+            # so any of them may hold changes that are now undone
+            self._cache.clear()
+            self._overlay.clear()
+            self._apply_overlay(self._pending)
+            self.next_id = next_id
+            raise
+        finally:
+            self._depth -= 1
+        if self._depth == 0 and self._pending:
+            self._flush()
+
+    def close(self) -> None:
+        """Write any pending records and sync."""
+        if self._pending:
+            self._flush()
+        super().close()
+
+
+def _sharded_storage(data_file: str, **options):
+    """Open sharded storage (imported on first use, as it brings in a thread pool)."""
+    from .shards import ShardedStorage
+    return ShardedStorage(data_file, **options)
+
+
+def _sqlite_storage(data_file: str, **options):
+    """Open SQLite storage (imported on first use to keep sqlite3 off the startup path)."""
+    from .sqlite_store import SQLiteStorage
+    return SQLiteStorage(data_file, **options)
+
+
+STORAGE_BACKENDS = {
+    "json": JSONStorage,
+    "journal": JournalStorage,
+    "jsonl": JSONLinesStorage,
+    "paged": PagedStorage,
+    "sharded": _sharded_storage,
+    "sqlite": _sqlite_storage,
+}
+
+
+def create_storage(kind: str, data_file: str, **options):
+    """Create a storage backend by name."""
+    if kind not in STORAGE_BACKENDS:
+        raise ValueError(
+            f"Unknown storage: {kind}. Must be one of: {', '.join(STORAGE_BACKENDS)}"
+        )
+    durability = options.get("durability", "batch")
+    if durability not in DURABILITY_POLICIES:
+        raise ValueError(
+            f"Unknown durability: {durability}. Must be one of: {', '.join(DURABILITY_POLICIES)}"
+        )
+    return STORAGE_BACKENDS[kind](data_file, **options)
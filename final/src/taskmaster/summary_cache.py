@@ -0,0 +1,152 @@
+"""
+Response cache for TaskMaster's AI summaries.
+An in-process LRU in front of an on-disk SQLite table, so a description that
+was summarized before (in this session or an earlier one) costs no API call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_ENTRIES = 10_000
+DEFAULT_TTL = 30 * 24 * 3600  # seconds
+
+
+def cache_key(model: str, system_prompt: str, temperature: float, text: str) -> str:
+    """Hash everything that determines a response into a cache key."""
+    payload = json.dumps([model, system_prompt, temperature, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """Two-level cache of AI responses keyed by cache_key().
+
+    Lookups try the in-process LRU first, then the SQLite file (if any);
+    a disk hit is promoted into the LRU. Entries older than ttl seconds
+    count as misses and are deleted. The file keeps at most max_entries
+    rows, dropping the least recently used. Without a path, or if the file
+    cannot be opened, only the in-process level is used.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_entries: int = DEFAULT_DISK_ENTRIES,
+        ttl: float = DEFAULT_TTL
+    ):
+        """Open the cache, creating the SQLite table on first use."""
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            try:
+                import sqlite3
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS summaries ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created REAL NOT NULL, used REAL NOT NULL)"
+                )
+                self._db.execute("DELETE FROM summaries WHERE created < ?", (time.time() - ttl,))
+                self._db.commit()
+            except Exception:
+                self._db = None  # Fall back to the in-process level
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] >= now - self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._memory[key]
+
+            row = self._query("SELECT value, created FROM summaries WHERE key = ?", (key,))
+            if row is not None and row[1] >= now - self.ttl:
+                self._execute("UPDATE summaries SET used = ? WHERE key = ?", (now, key))
+                self._remember(key, row[0], row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return row[0]
+            if row is not None:
+                self._execute("DELETE FROM summaries WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        """Store a response in both levels, evicting the oldest disk rows past max_entries."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._execute(
+                "INSERT OR REPLACE INTO summaries (key, value, created, used) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._execute(
+                "DELETE FROM summaries WHERE key NOT IN "
+                "(SELECT key FROM summaries ORDER BY used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        """Put an entry in the LRU, dropping the least recently used past capacity."""
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _query(self, sql: str, params: tuple):
+        """Fetch one row from the disk level (None if there is none)."""
+        if self._db is None:
+            return None
+        try:
+            return self._db.execute(sql, params).fetchone()
+        except Exception:
+            return None
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        """Run and commit one statement on the disk level, ignoring failures."""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(sql, params)
+            self._db.commit()
+        except Exception:
+            pass
+
+    def statistics(self) -> Dict:
+        """Counters in the shape display.print_cache_statistics expects."""
+        with self._lock:
+            row = self._query("SELECT COUNT(*) FROM summaries", ())
+            return {
+                "capacity": self.memory_entries,
+                "size": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "disk_entries": row[0] if row else 0,
+            }
+
+    def close(self) -> None:
+        """Close the SQLite file."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,171 @@
+"""
+Write-behind persistence for TaskMaster.
+Wraps a storage backend so mutations return immediately and a background
+thread saves them after a short debounce window.
+"""
+
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, Iterable, List
+
+from .models import Task
+
+
+class WriteBehindStorage:
+    """Queues mutation records and persists them from a background thread.
+
+    apply() only records the mutation and wakes the writer. The writer waits
+    until no new mutation has arrived for delay seconds (but never longer
+    than max_delay after the first unsaved one) and then hands every queued
+    record to the wrapped backend in a single apply_batch() call, so a burst
+    of commands costs one write. flush() and close() save synchronously, and
+    close() is also registered with atexit.
+
+    Other attributes (compact, wait, journal_file, ...) are forwarded to the
+    wrapped backend. Changes are not merged with other processes' writes,
+    so write-behind is meant for a store with a single writer.
+    """
+
+    in_memory = True
+
+    def __init__(self, storage, delay: float = 0.2, max_delay: float = 2.0):
+        """Wrap storage, saving delay seconds after the last mutation."""
+        if not storage.in_memory:
+            raise ValueError("Write-behind only applies to JSON and journal storage")
+        self.storage = storage
+        self.delay = delay
+        self.max_delay = max(delay, max_delay)
+        self.failed_writes = 0
+        self._pending: List[Dict] = []
+        self._tasks: Iterable[Task] = ()
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __getattr__(self, name):
+        """Forward anything else to the wrapped backend."""
+        return getattr(self.storage, name)
+
+    @property
+    def next_id(self) -> int:
+        """ID high-water mark of the wrapped backend."""
+        return self.storage.next_id
+
+    @next_id.setter
+    def next_id(self, value: int) -> None:
+        self.storage.next_id = value
+
+    def is_dirty(self) -> bool:
+        """Check if there are mutations that have not been saved yet."""
+        with self._cond:
+            return bool(self._pending)
+
+    def lock(self, shared: bool = False):
+        """Queueing needs no lock; the wrapped backend locks when it writes."""
+        return nullcontext()
+
+    def is_stale(self) -> bool:
+        """Write-behind assumes it is the only writer, so never merge."""
+        return False
+
+    def changed(self) -> bool:
+        """Check if another process changed the store (never while we have unsaved work)."""
+        return not self.is_dirty() and self.storage.changed()
+
+    # -- storage interface -------------------------------------------------
+
+    def load(self) -> List[Task]:
+        """Load tasks from the wrapped backend."""
+        self.flush()
+        return self.storage.load()
+
+    def save(self, tasks: Iterable[Task]) -> bool:
+        """Rewrite the whole store right away (queued records are included)."""
+        with self._write_lock:
+            with self._cond:
+                self._pending = []
+            return self.storage.save(tasks)
+
+    def apply(self, record: Dict, tasks: Iterable[Task]) -> bool:
+        """Queue a mutation record for the background writer."""
+        return self.apply_batch([record], tasks)
+
+    def apply_batch(self, records: List[Dict], tasks: Iterable[Task]) -> bool:
+        """Queue several mutation records for the background writer."""
+        with self._cond:
+            if self._closed:
+                return self.storage.apply_batch(records, tasks)
+            now = time.monotonic()
+            if not self._pending:
+                self._first_change = now
+            self._last_change = now
+            self._pending.extend(records)
+            self._tasks = tasks
+            self._cond.notify()
+        return True
+
+    def signature(self) -> List:
+        """Fingerprint the store files (only meaningful once flushed)."""
+        return self.storage.signature()
+
+    def files(self) -> List[str]:
+        """Files that make up the wrapped store."""
+        return self.storage.files()
+
+    def flush(self) -> bool:
+        """Save queued mutations now, returning False if the write failed."""
+        with self._write_lock:
+            with self._cond:
+                records, self._pending = self._pending, []
+                tasks = self._tasks
+            if not records:
+                return True
+            # list() copies the live view in one step, so the main thread
+            # can keep mutating while the snapshot is serialized.
+            if self.storage.apply_batch(records, list(tasks)):
+                return True
+            with self._cond:
+                self.failed_writes += 1
+                self._pending[:0] = records
+                self._first_change = self._last_change = time.monotonic()
+            return False
+
+    def close(self) -> None:
+        """Stop the writer, save anything queued and close the backend."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        self.storage.close()
+        atexit.unregister(self.close)
+
+    # -- background thread -------------------------------------------------
+
+    def _run(self) -> None:
+        """Wait for mutations, debounce them and save."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                while not self._closed:
+                    deadline = min(self._last_change + self.delay,
+                                   self._first_change + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return  # close() does the final flush
+            self.flush()
@@ -5,12 +5,25 @@ CSC299 Final Project
 
 import pytest
 import os
+import signal
 import json
+import asyncio
+import subprocess
+import sys
+import threading
+import time
 from datetime import datetime, timedelta
 
-from taskmaster.models import Task, VALID_STATUSES, VALID_PRIORITIES
+from taskmaster.models import Task, CompactTask, VALID_STATUSES, VALID_PRIORITIES
 from taskmaster.manager import TaskManager
-from taskmaster.ai import AITaskSummarizer
+from taskmaster.ai import AITaskSummarizer, AsyncAITaskSummarizer
+from taskmaster.chat import TaskMasterChat
+from taskmaster.async_chat import AsyncTaskMasterChat
+from taskmaster.storage import JournalStorage, create_storage
+from taskmaster.search_index import InvertedIndex, TrigramIndex, tokenize
+from taskmaster.loader import iter_json_array
+from taskmaster.summary_cache import SummaryCache, cache_key
+from taskmaster.ratelimit import RateLimiter, TokenBucket
 
 
 class TestTask:
@@ -75,6 +88,83 @@ class TestTask:
         """Test that tasks without due dates are not overdue."""
         task = Task(id=1, title="Test", status="pending")
         assert task.is_overdue() is False
+    
+    def test_task_dates_parsed_on_assignment(self):
+        """Test that date fields are parsed once and kept in sync."""
+        task = Task(id=1, title="Test", due_date="2025-12-01",
+                    created_at="1970-01-02T00:00:00")
+        assert task.due_ordinal == datetime(2025, 12, 1).toordinal()
+        assert task.created_timestamp == 86400
+        assert task.completed_timestamp is None
+        
+        task.due_date = "2000-01-01"
+        task.completed_at = "1970-01-01T00:01:00"
+        assert task.due_ordinal == datetime(2000, 1, 1).toordinal()
+        assert task.completed_timestamp == 60
+        assert task.is_overdue() is True
+        assert "due_ordinal" not in task.to_dict()
+    
+    def test_task_invalid_due_date_flagged(self):
+        """Test that unparseable due dates are flagged and never overdue."""
+        task = Task(id=1, title="Test", due_date="someday")
+        assert task.due_date_invalid is True
+        assert task.due_ordinal is None
+        assert task.is_overdue() is False
+        assert Task(id=2, title="Test").due_date_invalid is False
+
+
+class TestCompactTask:
+    """Test the memory-compact Task variant."""
+    
+    @pytest.mark.parametrize("fields", [
+        {"id": 1, "title": "Plain", "created_at": "2025-01-01T00:00:00"},
+        {"id": 2, "title": "Full", "description": "Desc", "priority": "high",
+         "status": "completed", "created_at": "2025-11-24T10:30:00.123456",
+         "completed_at": "2025-11-25T08:00:00", "due_date": "2025-12-01", "tags": ["a", "b"]},
+        {"id": 3, "title": "Odd values", "priority": "urgent", "status": "blocked",
+         "created_at": "2025-11-24T10:30:00+00:00", "completed_at": "2025-11-24T10:30:00.000000",
+         "due_date": "2025-12-01T09:00:00Z", "tags": []},
+        {"id": 4, "title": "Invalid date", "created_at": "yesterday", "due_date": "soon"},
+    ])
+    def test_to_dict_matches_task(self, fields):
+        """Test that to_dict() output is identical to the dataclass."""
+        compact = CompactTask(**fields)
+        assert compact.to_dict() == Task(**fields).to_dict()
+        assert compact == Task(**fields)
+    
+    def test_attribute_api(self):
+        """Test reading and assigning the public attributes."""
+        task = CompactTask(id=1, title="Test", tags=["work"])
+        task.status = "in_progress"
+        task.priority = "low"
+        task.due_date = "2000-01-01"
+        task.tags = ["home", "urgent"]
+        
+        assert (task.status, task.priority, task.tags) == ("in_progress", "low", ["home", "urgent"])
+        assert task.is_overdue() is True
+        assert not hasattr(task, "__dict__")
+        assert task.created_at
+    
+    def test_parsed_dates_match_task(self):
+        """Test that parsed date values agree with Task."""
+        fields = {"id": 1, "title": "Test", "created_at": "2025-11-24T10:30:00.123456",
+                  "completed_at": "2025-11-24T10:30:00+00:00", "due_date": "2025-12-01"}
+        compact, task = CompactTask(**fields), Task(**fields)
+        for name in ("due_ordinal", "created_timestamp", "completed_timestamp", "due_date_invalid"):
+            assert getattr(compact, name) == getattr(task, name)
+    
+    def test_manager_with_compact_tasks(self, tmp_path):
+        """Test that TaskManager can store CompactTask objects."""
+        temp_file = str(tmp_path / "test_tasks.json")
+        manager = TaskManager(temp_file, storage="journal", compact_tasks=True)
+        task = manager.add_task("Compact", priority="high", tags=["work"])
+        manager.update_status(task.id, "completed")
+        manager.update_task(task.id, tags=["home"])
+        
+        reloaded = TaskManager(temp_file, storage="journal", compact_tasks=True)
+        assert isinstance(reloaded.get_task(task.id), CompactTask)
+        assert reloaded.list_tasks("completed", tag_filter="home") == [reloaded.get_task(task.id)]
+        assert reloaded.get_task(task.id).to_dict() == task.to_dict()
 
 
 class TestTaskManager:
@@ -129,6 +219,40 @@ class TestTaskManager:
         manager.add_task("Task 2")
         assert manager._get_next_id() == 3
     
+    def test_next_id_not_reused_after_delete(self, manager, temp_file):
+        """Test that the ID high-water mark survives deletes and reloads."""
+        manager.add_task("Task 1")
+        task2 = manager.add_task("Task 2")
+        manager.delete_task(task2.id)
+        assert manager._get_next_id() == 3
+        
+        reloaded = TaskManager(temp_file)
+        assert reloaded._get_next_id() == 3
+        assert reloaded.add_task("Task 3").id == 3
+    
+    def test_next_id_from_journal(self, temp_file):
+        """Test that journal replay restores the high-water mark."""
+        manager = TaskManager(temp_file, storage="journal")
+        manager.add_task("Task 1")
+        manager.add_task("Task 2")
+        manager.clear_completed()
+        manager.delete_task(2)
+        
+        assert TaskManager(temp_file, storage="journal")._get_next_id() == 3
+    
+    def test_id_index_consistency(self, manager):
+        """Test that the ID index follows adds, deletes and clears."""
+        for i in range(5):
+            manager.add_task(f"Task {i}")
+        manager.update_status(2, "completed")
+        manager.update_status(4, "completed")
+        manager.delete_task(1)
+        manager.clear_completed()
+        
+        assert [t.id for t in manager.tasks] == [3, 5]
+        assert manager.get_task(2) is None
+        assert manager.get_task(5).title == "Task 4"
+    
     def test_get_task_existing(self, manager):
         """Test getting an existing task."""
         added_task = manager.add_task("Test Task")
@@ -211,6 +335,34 @@ class TestTaskManager:
         work_tasks = manager.list_tasks(tag_filter="work")
         assert len(work_tasks) == 2
     
+    def test_list_tasks_combined_filters(self, manager):
+        """Test combining status, priority and tag filters."""
+        manager.add_task("Task 1", priority="high", tags=["work"])
+        manager.add_task("Task 2", priority="high", tags=["home"])
+        manager.add_task("Task 3", priority="low", tags=["work"])
+        manager.add_task("Task 4", priority="high", tags=["work"])
+        manager.update_status(4, "completed")
+        
+        tasks = manager.list_tasks("pending", tag_filter="work", priority_filter="high")
+        assert [t.id for t in tasks] == [1]
+        assert manager.list_tasks(tag_filter="missing") == []
+    
+    def test_secondary_indexes_follow_updates(self, manager):
+        """Test that the status, priority and tag indexes track every mutation."""
+        task = manager.add_task("Task", priority="low", tags=["a", "b"])
+        manager.update_status(task.id, "in_progress")
+        manager.update_task(task.id, priority="high", tags=["b", "c"])
+        
+        assert manager.list_tasks("pending") == []
+        assert manager.list_tasks("in_progress") == [task]
+        assert manager.list_tasks(priority_filter="low") == []
+        assert manager.list_tasks(tag_filter="a") == []
+        assert manager.list_tasks(tag_filter="c") == [task]
+        
+        manager.delete_task(task.id)
+        assert manager.list_tasks(tag_filter="b") == []
+        assert "b" not in manager._by_tag
+    
     def test_search_tasks_found(self, manager):
         """Test searching for tasks."""
         manager.add_task("Buy groceries", "Milk and eggs")
@@ -260,6 +412,29 @@ class TestTaskManager:
         stats = manager.get_statistics()
         assert stats["overdue"] == 1
     
+    def test_statistics_follow_mutations(self, manager):
+        """Test that the live statistics match a full recount after changes."""
+        past = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")
+        future = (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d")
+        manager.add_task("Task 1", priority="high", due_date=past, tags=["a"])
+        manager.add_task("Task 2", due_date=past, tags=["a", "b"])
+        manager.add_task("Task 3", priority="low", due_date=future)
+        manager.add_task("Task 4", due_date="not a date")
+        manager.update_status(1, "completed")
+        manager.update_task(3, due_date=past, tags=["c"])
+        manager.delete_task(2)
+        
+        stats = manager.get_statistics()
+        tasks = manager.tasks
+        assert stats["total"] == 3
+        assert stats["overdue"] == sum(t.is_overdue() for t in tasks) == 1
+        assert stats["by_status"] == {"completed": 1, "pending": 2}
+        assert stats["by_priority"] == {"high": 1, "low": 1, "medium": 1}
+        assert stats["tags"] == {"a", "c"}
+        
+        manager.update_status(1, "pending")
+        assert manager.get_statistics()["overdue"] == 2
+    
     def test_export_to_csv(self, manager, tmp_path):
         """Test exporting tasks to CSV."""
         manager.add_task("Task 1", "Description 1", "high")
@@ -290,6 +465,50 @@ class TestTaskManager:
         assert len(manager.tasks) == 1
         assert manager.tasks[0].id == task2.id
     
+    def test_transaction_saves_once(self, manager, temp_file, monkeypatch):
+        """Test that a transaction persists all of its mutations in one write."""
+        saves = []
+        monkeypatch.setattr(manager.storage, "save", lambda tasks: saves.append(len(list(tasks))) or True)
+        with manager.transaction():
+            for i in range(5):
+                manager.add_task(f"Task {i}")
+            manager.update_status(1, "completed")
+            manager.clear_completed()
+            assert saves == []
+        assert saves == [4]
+    
+    def test_transaction_rolls_back_on_error(self, manager, temp_file):
+        """Test that a failed transaction leaves memory and disk unchanged."""
+        manager.add_task("Keep", tags=["work"])
+        manager.add_task("Done")
+        manager.update_status(2, "completed")
+        before = [t.to_dict() for t in manager.tasks]
+        stats = manager.get_statistics()
+        
+        with pytest.raises(RuntimeError):
+            with manager.batch():
+                manager.add_task("Discard")
+                manager.update_task(1, title="Changed", tags=["home"])
+                manager.clear_completed()
+                raise RuntimeError("boom")
+        
+        assert [t.to_dict() for t in manager.tasks] == before
+        assert manager.get_statistics() == stats
+        assert manager.search_tasks("Changed") == []
+        assert manager.add_task("Next").id == 3
+        assert len(TaskManager(temp_file).tasks) == 3
+    
+    def test_nested_transaction_rollback(self, manager, temp_file):
+        """Test that a failing inner transaction only undoes its own changes."""
+        with manager.transaction():
+            manager.add_task("Outer")
+            with pytest.raises(ValueError):
+                with manager.transaction():
+                    manager.add_task("Inner")
+                    raise ValueError
+        
+        assert [t.title for t in TaskManager(temp_file).tasks] == ["Outer"]
+    
     def test_persistence(self, temp_file):
         """Test that tasks persist across manager instances."""
         # Create first manager and add tasks
@@ -328,6 +547,1656 @@ class TestTaskManager:
         assert task.priority == "high"
 
 
+class TestInvertedIndex:
+    """Test ranked full-text search."""
+    
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create a TaskManager with a few searchable tasks."""
+        manager = TaskManager(str(tmp_path / "test_tasks.json"))
+        manager.add_task("Team meeting", "Weekly meeting about the roadmap", tags=["work"])
+        manager.add_task("Buy groceries", "Milk, eggs and bread")
+        manager.add_task("Prepare slides", "Slides for the team offsite", tags=["work"])
+        return manager
+    
+    def test_tokenize(self):
+        """Test that text is split into lowercase words."""
+        assert tokenize("Buy MILK, eggs & bread!") == ["buy", "milk", "eggs", "bread"]
+    
+    def test_prefix_and_ranking(self, manager):
+        """Test prefix matching with results ranked by term frequency."""
+        results = manager.search_tasks("meet", mode="all")
+        assert [t.id for t in results] == [1]
+        
+        results = manager.search_tasks("team", mode="all")
+        assert [t.id for t in results] == [1, 3]
+    
+    def test_and_or_queries(self, manager):
+        """Test multi-term AND and OR queries."""
+        assert [t.id for t in manager.search_tasks("team slides", mode="all")] == [3]
+        assert [t.id for t in manager.search_tasks("milk roadmap", mode="any")] == [1, 2]
+        assert manager.search_tasks("milk roadmap", mode="all") == []
+        assert [t.id for t in manager.search_tasks("work", mode="all")] == [1, 3]
+    
+    def test_index_follows_mutations(self, manager):
+        """Test that edits and deletes update the full-text index."""
+        manager.search_tasks("x", mode="all")  # build the index
+        manager.update_task(2, title="Buy vegetables", description="Carrots")
+        manager.delete_task(3)
+        manager.add_task("Carrot cake")
+        
+        assert manager.search_tasks("groceries", mode="any") == []
+        assert [t.id for t in manager.search_tasks("carrot", mode="any")] == [2, 4]
+        assert manager.search_tasks("slides", mode="any") == []
+        assert manager._text_index.search("carrot") == [2, 4]
+    
+    def test_persisted_index(self, tmp_path):
+        """Test that a saved index is reused only while the data is unchanged."""
+        temp_file = str(tmp_path / "test_tasks.json")
+        manager = TaskManager(temp_file, persist_search_index=True)
+        manager.add_task("Quarterly report")
+        manager.search_tasks("report", mode="all")
+        manager.close()
+        assert os.path.exists(temp_file + ".idx")
+        
+        reopened = TaskManager(temp_file, persist_search_index=True)
+        assert InvertedIndex.load(reopened.index_file, reopened._loaded_signature) is not None
+        assert [t.id for t in reopened.search_tasks("quarter", mode="all")] == [1]
+        
+        TaskManager(temp_file).add_task("Annual report")
+        stale = TaskManager(temp_file, persist_search_index=True)
+        assert [t.id for t in stale.search_tasks("report", mode="all")] == [1, 2]
+
+
+class TestTrigramIndex:
+    """Test the trigram index behind substring search."""
+    
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create a TaskManager with a few searchable tasks."""
+        manager = TaskManager(str(tmp_path / "test_tasks.json"))
+        manager.add_task("Team meeting", "Weekly sync")
+        manager.add_task("Buy groceries", "Milk, eggs and bread")
+        manager.add_task("Greet guests", "At the door")
+        return manager
+    
+    def test_substring_inside_word(self, manager):
+        """Test that arbitrary substrings still match."""
+        assert [t.id for t in manager.search_tasks("eet")] == [1, 3]
+        assert [t.id for t in manager.search_tasks("K, EG")] == [2]
+    
+    def test_candidates_are_verified(self):
+        """Test that trigram hits spanning two fields are rejected."""
+        index = TrigramIndex.build([Task(id=1, title="abc", description="def")])
+        assert index.candidates("abc") == {1}
+        assert index.candidates("abcdef") == set()
+        assert index.candidates("ab") is None
+    
+    def test_short_queries_fall_back_to_scan(self, manager):
+        """Test queries shorter than a trigram."""
+        assert [t.id for t in manager.search_tasks("ee")] == [1, 3]
+        assert len(manager.search_tasks("")) == 3
+    
+    def test_index_follows_mutations(self, manager):
+        """Test that edits, adds and deletes update the trigram index."""
+        assert manager.search_tasks("meeting")  # build the index
+        manager.update_task(1, title="Team lunch")
+        manager.delete_task(3)
+        manager.add_task("Meet the dean")
+        
+        assert manager.search_tasks("meeting") == []
+        assert [t.id for t in manager.search_tasks("lunch")] == [1]
+        assert [t.id for t in manager.search_tasks("mee")] == [4]
+        assert 3 not in manager._trigram_index.grams.get("gue", set())
+
+
+class TestJournalStorage:
+    """Test the append-only journal storage mode."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    def test_mutations_append_to_journal(self, temp_file):
+        """Test that mutations append records instead of rewriting the snapshot."""
+        manager = TaskManager(temp_file, storage="journal")
+        task = manager.add_task("Journaled", tags=["work"])
+        manager.update_status(task.id, "completed")
+        
+        assert not os.path.exists(temp_file)
+        with open(temp_file + ".journal") as f:
+            records = [json.loads(line) for line in f]
+        assert [r["op"] for r in records] == ["add", "update"]
+        assert records[1]["fields"]["status"] == "completed"
+    
+    def test_transaction_appends_once(self, temp_file):
+        """Test that a transaction writes its records in one append."""
+        manager = TaskManager(temp_file, storage="journal")
+        with manager.transaction():
+            manager.add_task("One")
+            manager.add_task("Two")
+            assert not os.path.exists(temp_file + ".journal")
+        
+        assert manager.storage.journal_records == 2
+        assert [t.title for t in TaskManager(temp_file, storage="journal").tasks] == ["One", "Two"]
+    
+    def test_replay_on_load(self, temp_file):
+        """Test that loading replays the journal on top of the snapshot."""
+        manager1 = TaskManager(temp_file, storage="journal")
+        task1 = manager1.add_task("Task 1")
+        task2 = manager1.add_task("Task 2")
+        manager1._save_tasks()  # snapshot
+        manager1.update_task(task1.id, title="Renamed", tags=["home"])
+        manager1.delete_task(task2.id)
+        manager1.add_task("Task 3")
+        
+        manager2 = TaskManager(temp_file, storage="journal")
+        assert [t.title for t in manager2.tasks] == ["Renamed", "Task 3"]
+        assert manager2.tasks[0].tags == ["home"]
+    
+    def test_save_resets_journal(self, temp_file):
+        """Test that a full snapshot clears the journal."""
+        manager = TaskManager(temp_file, storage="journal")
+        manager.add_task("Task 1")
+        assert manager._save_tasks() is True
+        assert os.path.exists(temp_file)
+        assert not os.path.exists(temp_file + ".journal")
+    
+    def test_torn_journal_line_ignored(self, temp_file):
+        """Test that a partially written trailing record is skipped."""
+        manager = TaskManager(temp_file, storage="journal")
+        manager.add_task("Task 1")
+        with open(temp_file + ".journal", "a") as f:
+            f.write('{"op":"add","task":{"id":2')
+        
+        storage = JournalStorage(temp_file)
+        assert [t.id for t in storage.load()] == [1]
+    
+    def test_bad_journal_records_are_quarantined(self, temp_file):
+        """Test that an invalid journal record costs only that record."""
+        manager = TaskManager(temp_file, storage="journal")
+        manager.add_task("one")
+        manager.add_task("two")
+        manager.close()
+        with open(temp_file + ".journal", "a") as f:
+            f.write('{"op":"add","task":{"id":9,"title":"x","bogus":1}}\n7\n')
+        
+        reopened = TaskManager(temp_file, storage="journal")
+        assert [t.title for t in reopened.tasks] == ["one", "two"]
+        assert reopened.load_report["quarantined"] == 2
+        reopened.add_task("three")
+        reopened.compact()
+        reopened.close()
+        
+        assert [t.title for t in TaskManager(temp_file, storage="journal").tasks] == ["one", "two", "three"]
+        with open(temp_file + ".quarantine") as f:
+            entries = [json.loads(line) for line in f]
+        assert [e["record"] for e in entries] == [
+            {"op": "add", "task": {"id": 9, "title": "x", "bogus": 1}}, 7]
+    
+    def test_compact_folds_journal(self, temp_file):
+        """Test that compaction writes a snapshot and empties the journal."""
+        manager = TaskManager(temp_file, storage="journal")
+        manager.add_task("Task 1")
+        manager.add_task("Task 2")
+        
+        assert manager.compact() is True
+        assert not os.path.exists(temp_file + ".journal")
+        assert not os.path.exists(temp_file + ".journal.1")
+        with open(temp_file) as f:
+            assert [t["title"] for t in json.load(f)] == ["Task 1", "Task 2"]
+    
+    def test_automatic_compaction(self, temp_file):
+        """Test that passing the record threshold compacts in the background."""
+        manager = TaskManager(temp_file, storage="journal")
+        manager.storage.max_records = 3
+        for i in range(5):
+            manager.add_task(f"Task {i}")
+        manager.close()
+        
+        assert manager.storage.journal_records == 2
+        with open(temp_file) as f:
+            assert len(json.load(f)) == 3
+        assert len(TaskManager(temp_file, storage="journal").tasks) == 5
+    
+    def test_interrupted_compaction_recovers(self, temp_file):
+        """Test that a rotated journal left by a crash is replayed on load."""
+        manager = TaskManager(temp_file, storage="journal")
+        task = manager.add_task("Task 1")
+        manager.storage._rotate_journal()  # crash before the snapshot was written
+        manager.update_status(task.id, "completed")
+        
+        reloaded = TaskManager(temp_file, storage="journal")
+        reloaded.close()
+        assert reloaded.tasks[0].status == "completed"
+        assert not os.path.exists(temp_file + ".journal.1")
+        assert TaskManager(temp_file).tasks[0].status == "completed"
+    
+    def test_compact_requires_journal(self, temp_file):
+        """Test that compaction is refused for plain JSON storage."""
+        manager = TaskManager(temp_file)
+        assert manager.compact() is False
+    
+    def test_unknown_storage(self, temp_file):
+        """Test that an unknown storage name is rejected."""
+        with pytest.raises(ValueError):
+            create_storage("xml", temp_file)
+
+
+class TestStreamingLoader:
+    """Test the fault-isolating JSON loader."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    def read_quarantine(self, temp_file):
+        """Return the quarantined entries."""
+        with open(temp_file + ".quarantine") as f:
+            return [json.loads(line) for line in f]
+    
+    def test_small_chunks_match_json_load(self, tmp_path):
+        """Test that records split across chunks parse like json.load."""
+        data = [Task(id=i, title=f"Task {i} \u00e9", tags=["a", "b"]).to_dict() for i in range(1, 20)]
+        path = tmp_path / "tasks.json"
+        path.write_text(json.dumps(data, indent=2))
+        with open(path) as f:
+            assert [value for value, _ in iter_json_array(f, chunk_size=7)] == data
+    
+    def test_bad_record_is_quarantined(self, temp_file):
+        """Test that one invalid record does not take the others down with it."""
+        with open(temp_file, "w") as f:
+            json.dump([
+                {"id": 1, "title": "Good"},
+                {"id": 2, "title": "Bad", "unknown_field": True},
+                {"id": "3", "title": "Bad id"},
+                {"id": 1, "title": "Duplicate"},
+                {"id": 4, "title": "Also good"},
+            ], f, indent=2)
+        
+        manager = TaskManager(temp_file)
+        assert [t.title for t in manager.tasks] == ["Good", "Also good"]
+        assert manager.load_report["records"] == 2
+        assert manager.load_report["quarantined"] == 3
+        entries = self.read_quarantine(temp_file)
+        assert [e["record"]["id"] for e in entries] == [2, "3", 1]
+        assert entries[2]["error"] == "duplicate id"
+    
+    def test_bad_record_is_quarantined_once(self, temp_file, capsys):
+        """Test that reloading a store that still holds a bad record does not copy it again."""
+        with open(temp_file, "w") as f:
+            json.dump([{"id": 1, "title": "Good"}, {"id": 2, "title": "Bad", "unknown_field": True}], f)
+        for _ in range(3):
+            TaskMasterChat(temp_file).greet()
+        
+        assert len(self.read_quarantine(temp_file)) == 1
+        assert capsys.readouterr().out.count("Skipped 1 unreadable record(s)") == 3
+    
+    def test_truncated_file_keeps_complete_records(self, temp_file):
+        """Test that a file cut off mid-record still loads the records before it."""
+        text = json.dumps([Task(id=i, title=f"Task {i}").to_dict() for i in (1, 2, 3)], indent=2)
+        with open(temp_file, "w") as f:
+            f.write(text[:text.rindex('"title"')])
+        
+        manager = TaskManager(temp_file)
+        assert [t.id for t in manager.tasks] == [1, 2]
+        assert manager.load_report["quarantined"] == 1
+        assert self.read_quarantine(temp_file)[0]["error"] == "unparseable JSON"
+    
+    def test_syntax_error_resumes_at_next_record(self, temp_file):
+        """Test that parsing picks up again after a malformed record."""
+        with open(temp_file, "w") as f:
+            f.write('[{"id": 1, "title": "One"}, {"id": 2, "title": oops}, {"id": 3, "title": "Three"}]')
+        
+        manager = TaskManager(temp_file)
+        assert [t.id for t in manager.tasks] == [1, 3]
+        assert '"id": 2' in self.read_quarantine(temp_file)[0]["record"]
+        assert manager.load_report["records_per_second"] > 0
+
+
+class TestJSONLinesStorage:
+    """Test the JSON Lines storage mode."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    @pytest.fixture
+    def lines_file(self, temp_file):
+        """Path of the JSON Lines file next to temp_file."""
+        return temp_file.replace(".json", ".jsonl")
+    
+    def read_lines(self, lines_file):
+        """Return the raw lines of the store."""
+        with open(lines_file) as f:
+            return f.read().split("\n")[:-1]
+    
+    def test_one_task_per_line(self, temp_file, lines_file):
+        """Test that tasks are stored as one compact JSON object per line."""
+        manager = TaskManager(temp_file, storage="jsonl")
+        manager.add_task("First", tags=["work"])
+        manager.add_task("Second")
+        
+        lines = self.read_lines(lines_file)
+        assert [json.loads(line)["title"] for line in lines] == ["First", "Second"]
+        assert not os.path.exists(temp_file)
+        assert [t.title for t in TaskManager(temp_file, storage="jsonl").tasks] == ["First", "Second"]
+    
+    def test_update_rewrites_in_place(self, temp_file, lines_file):
+        """Test that an update that fits rewrites only its own line."""
+        manager = TaskManager(temp_file, storage="jsonl")
+        manager.add_task("A long original title")
+        manager.add_task("Other")
+        size = os.path.getsize(lines_file)
+        
+        manager.update_task(1, title="Short")
+        assert os.path.getsize(lines_file) == size
+        lines = self.read_lines(lines_file)
+        assert json.loads(lines[0])["title"] == "Short"
+        assert json.loads(lines[1])["title"] == "Other"
+    
+    def test_reload_keeps_id_order(self, temp_file):
+        """Test that tasks moved to the end of the file by an update still load in ID order."""
+        manager = TaskManager(temp_file, storage="jsonl")
+        manager.add_task("Read notes")
+        manager.add_task("Reply to mail")
+        manager.update_task(1, title="Read the meeting notes again")
+        before = [t.id for t in manager.search_tasks("re")]
+        manager.close()
+        
+        reloaded = TaskManager(temp_file, storage="jsonl")
+        assert [t.id for t in reloaded.tasks] == [1, 2]
+        assert [t.id for t in reloaded.search_tasks("re")] == before == [1, 2]
+    
+    def test_longer_update_appends(self, temp_file, lines_file):
+        """Test that a longer update is appended and the old line blanked."""
+        manager = TaskManager(temp_file, storage="jsonl")
+        manager.add_task("A")
+        manager.add_task("B")
+        manager.update_task(1, description="Now with a much longer description")
+        
+        lines = self.read_lines(lines_file)
+        assert lines[0].strip() == ""
+        assert json.loads(lines[2])["id"] == 1
+        assert manager.storage.offsets[1][0] > manager.storage.offsets[2][0]
+        reloaded = TaskManager(temp_file, storage="jsonl")
+        assert reloaded.get_task(1).description == "Now with a much longer description"
+    
+    def test_delete_tombstones(self, temp_file, lines_file):
+        """Test that deletes blank the line and append a tombstone."""
+        manager = TaskManager(temp_file, storage="jsonl")
+        manager.add_task("Keep")
+        manager.add_task("Drop")
+        manager.delete_task(2)
+        
+        lines = self.read_lines(lines_file)
+        assert lines[1].strip() == ""
+        assert json.loads(lines[2]) == {"id": 2, "deleted": True}
+        assert [t.id for t in TaskManager(temp_file, storage="jsonl").tasks] == [1]
+    
+    def test_later_line_wins(self, temp_file, lines_file):
+        """Test that a newer copy appended before a crash wins on load."""
+        manager = TaskManager(temp_file, storage="jsonl")
+        task = manager.add_task("Old")
+        with open(lines_file, "a") as f:
+            f.write(json.dumps(dict(task.to_dict(), title="New")) + "\n")
+            f.write('{"id": 3, "tit')
+        
+        assert [t.title for t in TaskManager(temp_file, storage="jsonl").tasks] == ["New"]
+    
+    def test_rewrites_when_mostly_dead(self, temp_file, lines_file):
+        """Test that the file is rewritten once blank lines dominate."""
+        manager = TaskManager(temp_file, storage="jsonl")
+        manager.storage.min_dead_bytes = 0
+        manager.add_task("Keep")
+        for i in range(5):
+            manager.add_task(f"Temp {i}")
+        manager.clear_completed()
+        for task_id in range(2, 7):
+            manager.delete_task(task_id)
+        
+        assert [json.loads(line)["title"] for line in self.read_lines(lines_file)] == ["Keep"]
+        assert manager.storage.dead_bytes == 0
+    
+    def test_imports_existing_json(self, temp_file):
+        """Test that a new JSON Lines store imports the JSON file."""
+        TaskManager(temp_file).add_task("Legacy")
+        assert [t.title for t in TaskManager(temp_file, storage="jsonl").tasks] == ["Legacy"]
+
+
+class TestDurability:
+    """Test atomic writes and the durability policies."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    @pytest.fixture
+    def fsyncs(self, monkeypatch):
+        """Count calls to os.fsync (after earlier tests' group commits finish)."""
+        for thread in threading.enumerate():
+            if isinstance(thread, threading.Timer):
+                thread.join()
+        calls = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd) or real_fsync(fd))
+        return calls
+    
+    def test_failed_save_keeps_old_file(self, temp_file, monkeypatch):
+        """Test that a write failing halfway leaves the previous file intact."""
+        manager = TaskManager(temp_file)
+        manager.add_task("Safe")
+        
+        def broken_dump(data, f, **kwargs):
+            f.write('[{"id": 1, "tit')
+            raise OSError("disk full")
+        
+        monkeypatch.setattr(json, "dump", broken_dump)
+        assert manager.add_task("Lost") is None
+        monkeypatch.undo()
+        
+        assert [t.title for t in TaskManager(temp_file).tasks] == ["Safe"]
+        assert sorted(os.listdir(os.path.dirname(temp_file))) == [
+            "test_tasks.json", "test_tasks.json.lock", "test_tasks.json.meta"
+        ]
+    
+    def test_atomic_writes_keep_permissions(self, temp_file):
+        """Test that replacing a file keeps its mode and new files get the umask default."""
+        manager = TaskManager(temp_file, storage="journal")
+        manager.add_task("One")
+        manager.compact()
+        os.chmod(temp_file, 0o664)
+        manager.add_task("Two")
+        manager.compact()
+        manager.close()
+        
+        umask = os.umask(0)
+        os.umask(umask)
+        assert os.stat(temp_file).st_mode & 0o777 == 0o664
+        assert os.stat(temp_file + ".meta").st_mode & 0o777 == 0o666 & ~umask
+    
+    def test_always_syncs_every_write(self, temp_file, fsyncs):
+        """Test that durability "always" fsyncs each journal append."""
+        manager = TaskManager(temp_file, storage="journal", durability="always")
+        manager.add_task("One")
+        manager.add_task("Two")
+        assert len(fsyncs) >= 2
+    
+    def test_batch_group_commits(self, temp_file, fsyncs):
+        """Test that durability "batch" shares one fsync across a burst."""
+        manager = TaskManager(temp_file, storage="journal", group_commit_ms=50)
+        for i in range(10):
+            manager.add_task(f"Task {i}")
+        assert fsyncs == []
+        
+        deadline = time.monotonic() + 5
+        while not fsyncs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert 1 <= len(fsyncs) <= 2  # journal file plus its directory
+    
+    def test_none_never_syncs(self, temp_file, fsyncs):
+        """Test that durability "none" leaves flushing to the OS."""
+        manager = TaskManager(temp_file, durability="none")
+        manager.add_task("Unsynced")
+        manager.close()
+        assert fsyncs == []
+        assert len(TaskManager(temp_file).tasks) == 1
+    
+    def test_unknown_policy(self, temp_file):
+        """Test that an unknown durability policy is rejected."""
+        with pytest.raises(ValueError):
+            create_storage("json", temp_file, durability="sometimes")
+
+
+class TestMultiProcess:
+    """Test sharing one store between several TaskManager instances."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    @pytest.mark.parametrize("storage", ["json", "journal"])
+    def test_stale_writer_merges(self, temp_file, storage):
+        """Test that a writer with an old snapshot merges instead of clobbering."""
+        first = TaskManager(temp_file, storage=storage)
+        first.add_task("Shared")
+        second = TaskManager(temp_file, storage=storage)
+        
+        first.add_task("From first")
+        first.update_task(1, title="Renamed")
+        task = second.add_task("From second")
+        second.update_status(1, "completed")
+        
+        assert task.id == 3  # ID 2 was taken by the first session
+        reloaded = TaskManager(temp_file, storage=storage)
+        assert [(t.id, t.title) for t in reloaded.tasks] == [
+            (1, "Renamed"), (2, "From first"), (3, "From second")
+        ]
+        assert reloaded.get_task(1).status == "completed"
+    
+    def test_refresh_only_when_changed(self, temp_file):
+        """Test that readers reload only after another process writes."""
+        writer = TaskManager(temp_file)
+        reader = TaskManager(temp_file)
+        assert reader.has_changed() is False
+        assert reader.refresh() is False
+        
+        writer.add_task("New")
+        assert reader.has_changed() is True
+        assert reader.refresh() is True
+        assert [t.title for t in reader.tasks] == ["New"]
+        assert reader.has_changed() is False
+    
+    def test_concurrent_writers(self, temp_file):
+        """Test that interleaved writers never lose tasks or reuse IDs."""
+        TaskManager(temp_file).add_task("Seed")
+        managers = [TaskManager(temp_file, storage="journal") for _ in range(3)]
+        
+        def add_many(manager, name):
+            for i in range(15):
+                manager.add_task(f"{name} {i}")
+        
+        threads = [threading.Thread(target=add_many, args=(m, f"writer{n}")) for n, m in enumerate(managers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        tasks = TaskManager(temp_file, storage="journal").tasks
+        assert len(tasks) == 46
+        assert len({t.id for t in tasks}) == 46
+
+
+class TestWriteBehind:
+    """Test the debounced background writer."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    def test_changes_are_coalesced(self, temp_file, monkeypatch):
+        """Test that a burst of changes is saved in a single write."""
+        manager = TaskManager(temp_file, write_behind=0.05)
+        batches = []
+        real_apply_batch = manager.storage.storage.apply_batch
+        monkeypatch.setattr(manager.storage.storage, "apply_batch",
+                            lambda records, tasks: batches.append(len(records)) or real_apply_batch(records, tasks))
+        for i in range(5):
+            manager.add_task(f"Task {i}")
+        assert manager.storage.is_dirty()
+        
+        deadline = time.monotonic() + 5
+        while manager.storage.is_dirty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.storage.flush()
+        assert batches == [5]
+        assert len(TaskManager(temp_file).tasks) == 5
+        manager.close()
+    
+    def test_close_flushes(self, temp_file):
+        """Test that closing saves changes still waiting for the writer."""
+        manager = TaskManager(temp_file, storage="journal", write_behind=60)
+        manager.add_task("Pending")
+        assert not os.path.exists(temp_file + ".journal")
+        manager.close()
+        assert [t.title for t in TaskManager(temp_file, storage="journal").tasks] == ["Pending"]
+    
+    def test_chat_flushes_on_eof(self, temp_file, monkeypatch):
+        """Test that leaving the chat with EOF flushes pending writes."""
+        commands = iter(["add Written"])
+        
+        def fake_input(prompt):
+            try:
+                return next(commands)
+            except StopIteration:
+                raise EOFError
+        
+        monkeypatch.setattr("builtins.input", fake_input)
+        TaskMasterChat(temp_file, write_behind=60).start()
+        assert [t.title for t in TaskManager(temp_file).tasks] == ["Written"]
+
+
+class TestArchive:
+    """Test the compressed archive tier."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    @pytest.fixture
+    def manager(self, temp_file):
+        """Create a manager with old and recent finished tasks."""
+        old = (datetime.now() - timedelta(days=90)).isoformat()
+        manager = TaskManager(temp_file)
+        manager.tasks = [
+            Task(id=1, title="Old report", status="completed", completed_at=old, tags=["work"]),
+            Task(id=2, title="Old errand", status="cancelled", created_at=old, priority="high"),
+            Task(id=3, title="Recent report", status="completed", completed_at=datetime.now().isoformat()),
+            Task(id=4, title="Open report", created_at=old),
+        ]
+        manager._save_tasks()
+        return manager
+    
+    def test_archive_moves_old_finished_tasks(self, manager, temp_file):
+        """Test that only old completed and cancelled tasks are archived."""
+        assert manager.archive_tasks(30) == 2
+        assert [t.id for t in manager.tasks] == [3, 4]
+        assert [t.id for t in TaskManager(temp_file).tasks] == [3, 4]
+        assert [t.title for t in manager.archive] == ["Old report", "Old errand"]
+        assert manager.archive_tasks(30) == 0
+    
+    def test_archive_is_append_only(self, manager, temp_file):
+        """Test that later archive runs add to the file without rewriting it."""
+        manager.archive_tasks(30)
+        size = os.path.getsize(manager.archive.path)
+        manager.update_status(4, "completed")
+        manager.archive_tasks(0)
+        assert os.path.getsize(manager.archive.path) > size
+        assert [t.id for t in manager.archive] == [1, 2, 3, 4]
+    
+    def test_read_only_session_does_not_archive(self, manager, temp_file):
+        """Test that a read-only manager refuses before writing the archive."""
+        reader = TaskManager(temp_file, read_only=True)
+        assert reader.archive_tasks(30) == 0
+        assert reader.archive_tasks(30) == 0
+        reader.close()
+        assert not os.path.exists(manager.archive.path)
+        assert len(TaskManager(temp_file).tasks) == 4
+    
+    def test_sessions_archive_under_the_store_lock(self, manager, temp_file, monkeypatch):
+        """Test that archiving holds the store lock and skips tasks another session archived."""
+        other = TaskManager(temp_file)
+        real_append = manager.archive.append
+        
+        def append(tasks, sync=True):
+            assert manager.storage._lock._depth > 0
+            return real_append(tasks, sync)
+        
+        monkeypatch.setattr(manager.archive, "append", append)
+        assert manager.archive_tasks(30) == 2
+        assert other.archive_tasks(30) == 0
+        assert [t.id for t in other.archive] == [1, 2]
+    
+    def test_lzma_archive(self, manager, temp_file):
+        """Test that a .xz archive round-trips through lzma."""
+        manager = TaskManager(temp_file, archive_file=temp_file + ".archive.xz")
+        manager.archive_tasks(30)
+        with open(manager.archive.path, "rb") as f:
+            assert f.read(6) == b"\xfd7zXZ\x00"
+        assert [t.id for t in manager.archive] == [1, 2]
+    
+    def test_unknown_archive_format(self, temp_file):
+        """Test that an unsupported archive extension is rejected."""
+        with pytest.raises(ValueError):
+            TaskManager(temp_file, archive_file=temp_file + ".archive.zip")
+    
+    def test_search_include_archive(self, manager):
+        """Test that archived tasks are searched only when asked."""
+        manager.archive_tasks(30)
+        assert [t.id for t in manager.search_tasks("report")] == [3, 4]
+        assert [t.id for t in manager.search_tasks("report", include_archive=True)] == [3, 4, 1]
+        assert [t.id for t in manager.search_tasks("old", "all", include_archive=True)] == [1, 2]
+    
+    def test_bad_archive_lines_are_quarantined(self, manager, temp_file):
+        """Test that malformed archive lines are skipped and set aside."""
+        import gzip
+        manager.archive_tasks(30)
+        with gzip.open(manager.archive.path, "ab") as f:
+            f.write(b'{"id": 7, "title": "Torn rep\n["not a task"]\n{"id": 8, "bogus": 1}\n')
+        assert [t.id for t in manager.search_tasks("report", include_archive=True)] == [3, 4, 1]
+        assert manager.get_statistics(include_archive=True)["archived"] == 2
+        with open(temp_file + ".quarantine") as f:
+            entries = [json.loads(line) for line in f]
+        assert len(entries) == 3  # copied once, though read by two commands
+        assert entries[0]["source"] == manager.archive.path
+    
+    def test_statistics_include_archive(self, manager):
+        """Test that statistics add archived tasks only when asked."""
+        manager.archive_tasks(30)
+        assert manager.get_statistics()["total"] == 2
+        stats = manager.get_statistics(include_archive=True)
+        assert stats["total"] == 4
+        assert stats["archived"] == 2
+        assert stats["by_status"]["cancelled"] == 1
+        assert stats["by_priority"]["high"] == 1
+        assert "work" in stats["tags"]
+    
+    def test_statistics_with_only_archived_tasks(self, manager):
+        """Test archive statistics when the main store is empty."""
+        manager.update_status(3, "completed")
+        manager.update_status(4, "completed")
+        manager.archive_tasks(0)
+        stats = manager.get_statistics(include_archive=True)
+        assert stats["total"] == stats["archived"] == 4
+        assert stats["by_status"] == {"completed": 3, "cancelled": 1}
+    
+    def test_truncated_archive(self, manager):
+        """Test that a member cut short by a crash ends the stream cleanly."""
+        manager.archive_tasks(30)
+        with open(manager.archive.path, "ab") as f:
+            f.write(b"\x1f\x8b\x08\x00")
+        assert [t.id for t in manager.archive] == [1, 2]
+    
+    def test_sqlite_archive(self, tmp_path):
+        """Test archiving from SQLite storage."""
+        manager = TaskManager(str(tmp_path / "tasks.json"), storage="sqlite")
+        task = manager.add_task("Done")
+        manager.update_status(task.id, "completed")
+        assert manager.archive_tasks(0) == 1
+        assert manager.get_task(task.id) is None
+        assert [t.title for t in manager.search_tasks("done", include_archive=True)] == ["Done"]
+        manager.close()
+
+
+class TestShardedStorage:
+    """Test the sharded storage backend."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    @pytest.fixture
+    def manager(self, temp_file):
+        """Create a manager on four shards with ten tasks."""
+        manager = TaskManager(temp_file)
+        manager.storage = create_storage("sharded", temp_file, shards=4)
+        with manager.transaction():
+            for i in range(10):
+                manager.add_task(f"Task {i}", tags=["even" if i % 2 else "odd"])
+        return manager
+    
+    def test_tasks_spread_over_shards(self, manager, temp_file):
+        """Test that tasks land in the shard for their ID and persist."""
+        storage = manager.storage
+        for shard in range(4):
+            with open(storage.shard_path(shard)) as f:
+                assert all(task["id"] % 4 == shard for task in json.load(f))
+        reopened = create_storage("sharded", temp_file, shards=8)
+        assert reopened.shard_count == 4
+        assert [t.id for t in reopened.load()] == list(range(1, 11))
+    
+    def test_mutation_rewrites_one_shard(self, manager):
+        """Test that an update only rewrites the shard that owns the task."""
+        storage = manager.storage
+        before = [os.stat(storage.shard_path(shard)).st_ino for shard in range(4)]
+        manager.update_status(6, "completed")
+        after = [os.stat(storage.shard_path(shard)).st_ino for shard in range(4)]
+        assert [b != a for b, a in zip(before, after)] == [False, False, True, False]
+    
+    def test_get_task_loads_one_shard(self, manager, temp_file):
+        """Test that a lookup only reads the owning shard."""
+        storage = create_storage("sharded", temp_file)
+        assert storage.get_task(7).title == "Task 6"
+        assert list(storage._cache) == [3]
+        assert storage.get_task(99) is None
+    
+    def test_queries(self, manager):
+        """Test listing, searching and statistics across shards."""
+        manager.update_status(2, "completed")
+        assert [t.id for t in manager.list_tasks(tag_filter="odd")] == [1, 3, 5, 7, 9]
+        assert [t.id for t in manager.list_tasks(status_filter="completed")] == [2]
+        assert [t.id for t in manager.search_tasks("task 1")] == [2]
+        stats = manager.get_statistics()
+        assert stats["total"] == 10
+        assert stats["by_status"] == {"pending": 9, "completed": 1}
+    
+    def test_transaction_rollback(self, manager, temp_file):
+        """Test that a failed transaction leaves the shards unchanged."""
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                manager.delete_task(1)
+                manager.add_task("Dropped")
+                raise RuntimeError("abort")
+        assert manager.get_task(1) is not None
+        assert len(manager.tasks) == 10
+        assert len(create_storage("sharded", temp_file).load()) == 10
+    
+    def test_other_process_writes(self, manager, temp_file):
+        """Test that a second store sees changes and gets fresh IDs."""
+        other = create_storage("sharded", temp_file)
+        other.get_task(1)
+        manager.update_status(1, "completed")
+        manager.add_task("From first")
+        assert other.get_task(1).status == "completed"
+        
+        stale = create_storage("sharded", temp_file)
+        stale.get_task(2)
+        manager.add_task("Taken")
+        stale.apply_batch([{"op": "add", "task": Task(id=12, title="Second").to_dict()}], ())
+        titles = {t.id: t.title for t in create_storage("sharded", temp_file).load()}
+        assert titles[12] == "Taken"
+        assert titles[13] == "Second"
+    
+    def test_sessions_never_share_an_id(self, temp_file, capsys):
+        """Test that a session's reported ID is the stored one, or is corrected with a warning."""
+        first = TaskManager(temp_file, storage="sharded")
+        second = TaskManager(temp_file, storage="sharded")
+        assert first.add_task("First").id == 1
+        assert second.add_task("Second").id == 2
+        assert "(ID: 2)" in capsys.readouterr().out
+        
+        with second.transaction():
+            moved = second.add_task("Moved")
+            first.add_task("Taken")
+            second.update_task(moved.id, title="Moved later")
+        assert "Task 3 is now task 4" in capsys.readouterr().out
+        titles = {t.id: t.title for t in TaskManager(temp_file, storage="sharded").tasks}
+        assert titles == {1: "First", 2: "Second", 3: "Taken", 4: "Moved later"}
+    
+    def test_imports_json_file(self, temp_file):
+        """Test that a new sharded store imports the existing JSON file."""
+        TaskManager(temp_file).add_task("Imported")
+        manager = TaskManager(temp_file, storage="sharded")
+        assert [t.title for t in manager.tasks] == ["Imported"]
+        assert manager.add_task("Next").id == 2
+
+
+class TestSnapshot:
+    """Test the memory-mapped read-only snapshot."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a tasks file with a mix of tasks."""
+        path = str(tmp_path / "test_tasks.json")
+        manager = TaskManager(path)
+        manager.add_task("Write report", "Quarterly ünïcode", "high", due_date="2020-01-01", tags=["work", "q1"])
+        manager.add_task("Buy milk", priority="low", tags=["home"])
+        manager.add_task("Call bank", due_date="2999-01-01")
+        manager.update_status(2, "completed")
+        return path
+    
+    def test_snapshot_round_trip(self, temp_file):
+        """Test that the snapshot rebuilds identical tasks."""
+        manager = TaskManager(temp_file, read_only=True)
+        assert [t.to_dict() for t in manager.tasks] == [t.to_dict() for t in TaskManager(temp_file).tasks]
+        assert manager.get_task(1).description == "Quarterly ünïcode"
+        assert manager.get_task(4) is None
+        manager.close()
+    
+    def test_queries_match_json(self, temp_file):
+        """Test that read-only queries agree with the normal manager."""
+        manager = TaskManager(temp_file, read_only=True)
+        reference = TaskManager(temp_file)
+        for kwargs in [{}, {"status_filter": "completed"}, {"priority_filter": "high"},
+                       {"tag_filter": "home"}, {"tag_filter": "missing"}, {"sort_by": "priority"}]:
+            assert [t.id for t in manager.list_tasks(**kwargs)] == [t.id for t in reference.list_tasks(**kwargs)]
+        assert [t.id for t in manager.search_tasks("BANK")] == [3]
+        stats = manager.get_statistics()
+        expected = reference.get_statistics()
+        assert stats == expected
+        assert stats["overdue"] == 1
+        manager.close()
+    
+    def test_changes_are_refused(self, temp_file):
+        """Test that a read-only manager does not write."""
+        manager = TaskManager(temp_file, read_only=True)
+        assert manager.add_task("Nope") is None
+        assert not manager.update_status(1, "completed")
+        manager.close()
+        assert len(TaskManager(temp_file).tasks) == 3
+    
+    def test_stale_snapshot_is_rebuilt(self, temp_file):
+        """Test that a snapshot older than the store is rewritten on open."""
+        TaskManager(temp_file, read_only=True).close()
+        time.sleep(0.01)
+        TaskManager(temp_file).add_task("Later")
+        manager = TaskManager(temp_file, read_only=True)
+        assert manager.get_task(4).title == "Later"
+        manager.close()
+    
+    def test_unwritable_snapshot_falls_back(self, temp_file, monkeypatch, capsys):
+        """Test that a failed snapshot write reads the store directly, still read-only."""
+        TaskManager(temp_file, read_only=True).close()
+        time.sleep(0.01)
+        TaskManager(temp_file).add_task("Later")
+        monkeypatch.setattr("taskmaster.snapshot.write_snapshot", lambda *args, **kwargs: False)
+        
+        for stale_snapshot in (True, False):
+            if not stale_snapshot:
+                os.remove(temp_file + ".snap")
+            manager = TaskManager(temp_file, read_only=True)
+            assert "Could not write snapshot" in capsys.readouterr().out
+            assert manager.get_task(4).title == "Later"
+            assert manager.add_task("Refused") is None
+            manager.close()
+        assert len(TaskManager(temp_file).tasks) == 4
+    
+    def test_refused_changes_leave_fallback_unchanged(self, temp_file, monkeypatch):
+        """Test that refused changes in the direct-read fallback do not show up in memory."""
+        monkeypatch.setattr("taskmaster.snapshot.write_snapshot", lambda *args, **kwargs: False)
+        manager = TaskManager(temp_file, read_only=True)
+        before = [t.to_dict() for t in manager.list_tasks()]
+        
+        assert manager.add_task("Refused") is None
+        assert not manager.update_status(1, "completed")
+        assert not manager.update_task(3, title="Renamed")
+        assert not manager.delete_task(2)
+        assert manager.clear_completed() == 0
+        assert [t.to_dict() for t in manager.list_tasks()] == before
+        assert manager.get_statistics()["by_status"] == {"pending": 2, "completed": 1}
+        manager.close()
+    
+    def test_empty_snapshot(self, tmp_path):
+        """Test a snapshot of an empty store."""
+        manager = TaskManager(str(tmp_path / "empty.json"), read_only=True)
+        assert manager.get_statistics() == {"total": 0}
+        assert manager.list_tasks() == []
+        manager.close()
+
+
+class TestColumnStore:
+    """Test the NumPy columnar index."""
+    
+    @pytest.fixture
+    def managers(self, tmp_path):
+        """Create a columnar manager and a standard one over the same tasks."""
+        pytest.importorskip("numpy")
+        path = str(tmp_path / "test_tasks.json")
+        manager = TaskManager(path)
+        with manager.transaction():
+            for i in range(40):
+                manager.add_task(
+                    f"Task {i}", priority=VALID_PRIORITIES[i % 3],
+                    due_date=f"20{20 + i % 20}-0{1 + i % 9}-15" if i % 4 else None,
+                    tags=[f"tag{i % 5}", f"group{i}", f"extra{i}"]
+                )
+            for i in range(1, 41, 3):
+                manager.update_status(i, VALID_STATUSES[i % 4])
+        return TaskManager(path, columnar=True), TaskManager(path)
+    
+    def test_columns_built(self, managers):
+        """Test that the columnar manager uses the column store."""
+        columnar, _ = managers
+        assert columnar._columns is not None
+        assert columnar._columns.tag_bits.shape[1] == 2  # more than 64 distinct tags
+    
+    def test_list_and_statistics_match(self, managers):
+        """Test that vectorized queries agree with the object indexes."""
+        columnar, standard = managers
+        for kwargs in [{}, {"status_filter": "completed"}, {"priority_filter": "HIGH"},
+                       {"tag_filter": "tag3"}, {"tag_filter": "extra39"}, {"tag_filter": "nope"},
+                       {"status_filter": "pending", "tag_filter": "tag1"},
+                       {"sort_by": "priority"}, {"sort_by": "due_date"}, {"sort_by": "created"}]:
+            assert ([t.id for t in columnar.list_tasks(**kwargs)]
+                    == [t.id for t in standard.list_tasks(**kwargs)]), kwargs
+        assert columnar.get_statistics() == standard.get_statistics()
+    
+    def test_columns_follow_changes(self, managers):
+        """Test that adds, updates, deletes and rollbacks update the columns."""
+        columnar, _ = managers
+        columnar.add_task("New", priority="high", tags=["fresh"])
+        columnar.update_status(2, "completed")
+        columnar.delete_task(3)
+        with pytest.raises(RuntimeError):
+            with columnar.transaction():
+                columnar.delete_task(4)
+                raise RuntimeError("abort")
+        reference = TaskManager(columnar.data_file)
+        assert columnar.get_statistics() == reference.get_statistics()
+        assert [t.id for t in columnar.list_tasks(tag_filter="fresh")] == [41]
+        assert 3 not in [t.id for t in columnar.list_tasks()]
+    
+    def test_compaction(self, managers):
+        """Test that dead rows are dropped once they outnumber live ones."""
+        from taskmaster.columns import ColumnStore
+        store = ColumnStore(Task(id=i, title=str(i)) for i in range(1, 3001))
+        for i in range(1, 2001):
+            store.remove(Task(id=i, title=str(i)))
+        assert store.size < 3000
+        assert store.select()[:2] == [2001, 2002]
+        assert store.statistics(0)["total"] == 1000
+    
+    def test_fallback_without_numpy(self, tmp_path, monkeypatch):
+        """Test that the object indexes are used when NumPy is missing."""
+        monkeypatch.setattr("taskmaster.manager.numpy_available", lambda: False)
+        manager = TaskManager(str(tmp_path / "test_tasks.json"), columnar=True)
+        assert manager._columns is None
+        manager.add_task("Still works")
+        assert manager.get_statistics()["total"] == 1
+
+
+class TestPagedStorage:
+    """Test the bounded-memory paged storage backend."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a tasks file with twenty tasks."""
+        path = str(tmp_path / "test_tasks.json")
+        manager = TaskManager(path, storage="jsonl")
+        with manager.transaction():
+            for i in range(20):
+                manager.add_task(f"Task {i}", priority=VALID_PRIORITIES[i % 3], tags=[f"tag{i % 2}"])
+        manager.close()
+        return path
+    
+    def test_cache_is_bounded(self, temp_file):
+        """Test that at most cache_size tasks are kept and hits are counted."""
+        manager = TaskManager(temp_file, storage="paged", cache_size=5)
+        for task_id in list(range(1, 11)) + [9, 10]:
+            assert manager.get_task(task_id).title == f"Task {task_id - 1}"
+        storage = manager.storage
+        assert list(storage._cache) == [6, 7, 8, 9, 10]
+        assert (storage.hits, storage.misses) == (2, 10)
+        assert manager.get_task(99) is None
+        stats = manager.get_statistics()
+        assert stats["total"] == 20
+        assert stats["cache"] == {"capacity": 5, "size": 5, "hits": 2, "misses": 11}
+    
+    def test_queries_stream(self, temp_file):
+        """Test that list and search return generators matching the jsonl backend."""
+        manager = TaskManager(temp_file, storage="paged", cache_size=5)
+        reference = TaskManager(temp_file, storage="jsonl")
+        results = manager.list_tasks(tag_filter="tag1")
+        assert not isinstance(results, list)
+        assert [t.id for t in results] == [t.id for t in reference.list_tasks(tag_filter="tag1")]
+        assert ([t.id for t in manager.list_tasks(sort_by="priority")]
+                == [t.id for t in reference.list_tasks(sort_by="priority")])
+        assert [t.id for t in manager.search_tasks("task 1")] == [2] + list(range(11, 21))
+        assert [t.id for t in manager.search_tasks("task 1", "any")][:1] == [2]
+        assert len(manager.storage._cache) <= 5
+    
+    def test_changes_persist(self, temp_file):
+        """Test adding, updating and deleting through the paged store."""
+        manager = TaskManager(temp_file, storage="paged", cache_size=3)
+        manager.get_task(2)
+        manager.update_status(2, "completed")
+        assert manager.get_task(2).status == "completed"
+        assert manager.add_task("New").id == 21
+        manager.delete_task(3)
+        assert manager.clear_completed() == 1
+        manager.close()
+        tasks = TaskManager(temp_file, storage="jsonl").tasks
+        assert len(tasks) == 19
+        assert {2, 3}.isdisjoint(t.id for t in tasks)
+    
+    def test_transaction_overlay(self, temp_file):
+        """Test that reads see uncommitted changes and rollbacks drop them."""
+        manager = TaskManager(temp_file, storage="paged")
+        with manager.transaction():
+            task = manager.add_task("Inside")
+            manager.update_status(task.id, "in_progress")
+            assert manager.get_task(task.id).status == "in_progress"
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                manager.delete_task(1)
+                assert manager.get_task(1) is None
+                raise RuntimeError("abort")
+        assert manager.get_task(1) is not None
+        assert TaskManager(temp_file, storage="jsonl").get_task(21).status == "in_progress"
+    
+    def test_rollback_leaves_cache_clean(self, temp_file):
+        """Test that an update undone by a rollback is not left in the task cache."""
+        manager = TaskManager(temp_file, storage="paged")
+        assert manager.get_task(1).title == "Task 0"
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                manager.update_task(1, title="changed")
+                raise RuntimeError("abort")
+        assert manager.get_task(1).title == "Task 0"
+        manager.close()
+        assert TaskManager(temp_file, storage="jsonl").get_task(1).title == "Task 0"
+    
+    def test_other_writer(self, temp_file):
+        """Test that a change from another session is picked up and IDs stay unique."""
+        manager = TaskManager(temp_file, storage="paged")
+        manager.get_task(1)
+        other = TaskManager(temp_file, storage="jsonl")
+        other.update_status(1, "completed")
+        other.add_task("Other")
+        assert manager.get_task(1).status == "completed"
+        assert manager.add_task("Mine").id == 22
+        
+        other.refresh()
+        other.add_task("Taken")
+        manager.add_task("Renumbered")
+        titles = {t.id: t.title for t in TaskManager(temp_file, storage="jsonl").tasks}
+        assert (titles[23], titles[24]) == ("Taken", "Renumbered")
+    
+    def test_sessions_never_share_an_id(self, temp_file, capsys):
+        """Test that two paged sessions adding at once report the IDs that are stored."""
+        first = TaskManager(temp_file, storage="paged")
+        second = TaskManager(temp_file, storage="paged")
+        assert first.add_task("First").id == 21
+        assert second.add_task("Second").id == 22
+        assert "(ID: 22)" in capsys.readouterr().out
+        
+        with second.transaction():
+            moved = second.add_task("Moved")
+            first.add_task("Taken")
+            second.get_task(1)  # re-indexes the file before the flush
+            second.update_task(moved.id, title="Moved later")
+        assert "Task 23 is now task 24" in capsys.readouterr().out
+        titles = {t.id: t.title for t in TaskManager(temp_file, storage="jsonl").tasks}
+        assert [titles[i] for i in range(21, 25)] == ["First", "Second", "Taken", "Moved later"]
+
+
+class TestStartup:
+    """Test that importing TaskMaster stays cheap."""
+    
+    # Generous enough for a cold bytecode cache on a slow machine; the CLI
+    # path used to pull in sqlite3, a thread pool and the whole package.
+    CLI_IMPORT_BUDGET_MS = 250
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    def import_times(self, module):
+        """Run a fresh interpreter with -X importtime and map module -> cumulative ms."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, check=True,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        )
+        times = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line[len("import time:"):].split("|")
+                if cumulative.strip().isdigit():
+                    times[name.strip()] = int(cumulative) / 1000
+        return times
+    
+    def test_package_import_is_lazy(self):
+        """Test that importing the package loads no submodules."""
+        times = self.import_times("taskmaster")
+        assert "taskmaster" in times
+        assert not [name for name in times if name.startswith("taskmaster.")]
+        assert times["taskmaster"] < self.CLI_IMPORT_BUDGET_MS
+    
+    def test_cli_import_budget(self):
+        """Test that the chat module stays within budget and skips optional backends."""
+        times = self.import_times("taskmaster.chat")
+        for module in ("openai", "numpy", "sqlite3", "concurrent.futures",
+                       "taskmaster.sqlite_store", "taskmaster.shards", "taskmaster.snapshot"):
+            assert module not in times
+        assert times["taskmaster.chat"] < self.CLI_IMPORT_BUDGET_MS
+    
+    def test_lazy_exports(self):
+        """Test that package exports resolve on first access."""
+        import taskmaster
+        from taskmaster import manager
+        assert taskmaster.TaskManager is manager.TaskManager
+        assert "TaskMasterChat" in dir(taskmaster)
+        with pytest.raises(AttributeError):
+            taskmaster.NoSuchThing
+    
+    def test_ai_client_built_on_first_use(self, temp_file):
+        """Test that neither the manager nor the summarizer builds an AI client up front."""
+        manager = TaskManager(temp_file)
+        assert manager._ai_summarizer is None
+        summarizer = AITaskSummarizer(api_key="test_key")
+        assert summarizer._client_checked is False
+        summarizer.is_available()
+        assert summarizer._client_checked is True
+        assert manager.ai_summarizer is manager.ai_summarizer
+        manager.close()
+
+
+class TestSummaryCache:
+    """Test the two-level AI response cache."""
+    
+    @pytest.fixture
+    def cache_file(self, tmp_path):
+        """Create a temporary cache database path."""
+        return str(tmp_path / "summaries.db")
+    
+    class FakeClient:
+        """Stands in for the OpenAI client and counts requests."""
+        
+        def __init__(self):
+            self.calls = 0
+            self.responses = self
+        
+        def create(self, **request):
+            self.calls += 1
+            from types import SimpleNamespace
+            return SimpleNamespace(output_text=f" Summary {self.calls} ")
+    
+    def test_key_covers_request(self):
+        """Test that model, prompt, temperature and text all change the key."""
+        base = cache_key("m", "p", 0.2, "text")
+        assert base == cache_key("m", "p", 0.2, "text")
+        assert len({base, cache_key("n", "p", 0.2, "text"), cache_key("m", "q", 0.2, "text"),
+                    cache_key("m", "p", 0.3, "text"), cache_key("m", "p", 0.2, "other")}) == 5
+    
+    def test_memory_and_disk_hits(self, cache_file):
+        """Test that a stored response is found in memory and by a new process."""
+        cache = SummaryCache(cache_file)
+        assert cache.get("k") is None
+        cache.put("k", "Write report")
+        assert cache.get("k") == "Write report"
+        cache.close()
+        
+        reopened = SummaryCache(cache_file)
+        assert reopened.get("k") == "Write report"
+        assert reopened.get("k") == "Write report"
+        stats = reopened.statistics()
+        assert (stats["hits"], stats["disk_hits"], stats["misses"]) == (2, 1, 0)
+        reopened.close()
+    
+    def test_ttl_expiry(self, cache_file):
+        """Test that entries older than the TTL are misses."""
+        cache = SummaryCache(cache_file)
+        cache.put("k", "Old")
+        cache.close()
+        
+        expired = SummaryCache(cache_file, ttl=0)
+        assert expired.get("k") is None
+        assert expired.statistics()["disk_entries"] == 0
+        expired.close()
+    
+    def test_size_eviction(self, cache_file):
+        """Test that both levels drop their least recently used entries."""
+        cache = SummaryCache(cache_file, memory_entries=1, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, key.upper())
+        stats = cache.statistics()
+        assert (stats["size"], stats["disk_entries"]) == (1, 2)
+        assert cache.get("a") is None
+        assert cache.get("b") == "B"
+        cache.close()
+    
+    def test_unusable_file_falls_back_to_memory(self, tmp_path):
+        """Test that a cache file that cannot be opened leaves the LRU working."""
+        cache = SummaryCache(str(tmp_path / "missing" / "summaries.db"))
+        cache.put("k", "Kept")
+        assert cache.get("k") == "Kept"
+        assert cache.statistics()["disk_entries"] == 0
+    
+    def test_summarizer_calls_api_once(self, cache_file):
+        """Test that repeated summaries are served from the cache."""
+        summarizer = AITaskSummarizer(api_key="test_key", cache_file=cache_file)
+        client = summarizer._client = self.FakeClient()
+        summarizer._client_checked = True
+        assert summarizer.summarize("Same long description") == "Summary 1"
+        assert summarizer.summarize("Same long description") == "Summary 1"
+        assert summarizer.summarize("Another description") == "Summary 2"
+        assert client.calls == 2
+        summarizer.close()
+        
+        restarted = AITaskSummarizer(api_key="test_key", cache_file=cache_file)
+        restarted._client = client
+        restarted._client_checked = True
+        assert restarted.summarize("Same long description") == "Summary 1"
+        assert client.calls == 2
+        restarted.close()
+
+
+class TestBatchSummaries:
+    """Test concurrent, rate-limited batch summarization."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    class EchoClient:
+        """Stands in for the OpenAI client: titles are the text upper-cased."""
+        
+        def __init__(self):
+            self.responses = self
+            self.calls = 0
+            self.active = 0
+            self.most_active = 0
+            self.lock = threading.Lock()
+        
+        def create(self, **request):
+            from types import SimpleNamespace
+            text = request["input"][1]["content"]
+            with self.lock:
+                self.calls += 1
+                self.active += 1
+                self.most_active = max(self.most_active, self.active)
+            time.sleep(0.01)
+            with self.lock:
+                self.active -= 1
+            if "fail" in text:
+                raise RuntimeError("rate limited")
+            return SimpleNamespace(output_text=text.upper())
+    
+    def summarizer(self, client):
+        """Build a summarizer that talks to client."""
+        summarizer = AITaskSummarizer(api_key="test_key")
+        summarizer._client = client
+        summarizer._client_checked = True
+        return summarizer
+    
+    def test_token_bucket_waits_for_refill(self):
+        """Test that a drained bucket sleeps until enough tokens accrue."""
+        now = [0.0]
+        sleeps = []
+        
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+        
+        bucket = TokenBucket(capacity=2, rate=1, clock=lambda: now[0], sleep=sleep)
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == pytest.approx(1.0)
+        assert bucket.acquire(5) == pytest.approx(2.0)  # clamped to capacity
+        assert sum(sleeps) == pytest.approx(3.0)
+    
+    def test_rate_limiter_applies_both_limits(self):
+        """Test that the token limit can hold back requests the request limit allows."""
+        now = [0.0]
+        
+        def sleep(seconds):
+            now[0] += seconds
+        
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=600,
+                              clock=lambda: now[0], sleep=sleep)
+        limiter.acquire(600)
+        limiter.acquire(60)
+        assert limiter.waited == pytest.approx(6.0)
+    
+    def test_results_in_input_order_with_errors(self):
+        """Test ordering, per-item errors and that duplicates are requested once."""
+        client = self.EchoClient()
+        results = self.summarizer(client).summarize_many(
+            ["write report", "please fail", "call bob", "write report"]
+        )
+        assert [r.summary for r in results] == ["WRITE REPORT", None, "CALL BOB", "WRITE REPORT"]
+        assert results[1].error == "rate limited"
+        assert [r.ok for r in results] == [True, False, True, True]
+        assert client.calls == 3
+    
+    def test_concurrency_limit_and_cache(self):
+        """Test that no more than concurrency requests run and cached texts are skipped."""
+        client = self.EchoClient()
+        summarizer = self.summarizer(client)
+        texts = [f"task {i}" for i in range(20)]
+        summarizer.summarize_many(texts, concurrency=4)
+        assert 1 < client.most_active <= 4
+        assert client.calls == 20
+        
+        again = summarizer.summarize_many(texts + ["task 20"])
+        assert again[-1].summary == "TASK 20"
+        assert client.calls == 21
+    
+    def test_unavailable(self, monkeypatch):
+        """Test that every item reports the missing client."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        results = AITaskSummarizer(api_key=None).summarize_many(["a", "b"])
+        assert [r.ok for r in results] == [False, False]
+    
+    def test_retitle_matching_tasks(self, temp_file):
+        """Test that retitle updates only matching tasks that have descriptions."""
+        manager = TaskManager(temp_file)
+        manager._ai_summarizer = self.summarizer(self.EchoClient())
+        manager.add_task("Old", "plan the offsite", tags=["work"])
+        manager.add_task("Other", "please fail here", tags=["work"])
+        manager.add_task("Home", "fix the sink", tags=["home"])
+        manager.add_task("Bare", tags=["work"])
+        
+        assert manager.retitle_tasks(tag_filter="work") == 1
+        assert [t.title for t in manager.tasks] == ["PLAN THE OFFSITE", "Other", "Home", "Bare"]
+        manager.close()
+        
+        reopened = TaskManager(temp_file)
+        assert reopened.get_task(1).title == "PLAN THE OFFSITE"
+        reopened.close()
+
+
+class TestAsyncChat:
+    """Test the async summarizer and background AI suggestions."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    class AsyncClient:
+        """Stands in for AsyncOpenAI; responses wait until released."""
+        
+        def __init__(self):
+            self.responses = self
+            self.calls = 0
+            self.closed = False
+            self.release = asyncio.Event()
+        
+        async def create(self, **request):
+            from types import SimpleNamespace
+            self.calls += 1
+            await self.release.wait()
+            return SimpleNamespace(output_text=" Plan the offsite ")
+        
+        async def close(self):
+            self.closed = True
+    
+    def connect(self, summarizer):
+        """Give a summarizer a fake client."""
+        client = summarizer._client = self.AsyncClient()
+        summarizer._client_checked = True
+        return client
+    
+    def test_summarizer_shares_client_and_cache(self):
+        """Test that repeated summaries reuse the cache and aclose closes the client."""
+        async def scenario():
+            summarizer = AsyncAITaskSummarizer(api_key="test_key")
+            client = self.connect(summarizer)
+            client.release.set()
+            first = await summarizer.summarize("long description")
+            second = await summarizer.summarize("long description")
+            await summarizer.aclose()
+            return first, second, client
+        
+        first, second, client = asyncio.run(scenario())
+        assert first == second == "Plan the offsite"
+        assert client.calls == 1
+        assert client.closed
+    
+    def test_without_client(self, monkeypatch):
+        """Test that summarize returns None without an API key."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        assert asyncio.run(AsyncAITaskSummarizer().summarize("text")) is None
+    
+    def test_summarizer_built_on_first_ai_command(self, temp_file, monkeypatch):
+        """Test that the chat opens no AI client or cache until `ai` is used."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        chat = AsyncTaskMasterChat(temp_file)
+        chat.run_command("list")
+        assert chat._summarizer is None
+        assert not os.path.exists(temp_file + ".summaries.db")
+        chat.run_command("ai Plan the offsite")
+        assert chat._summarizer is not None
+        chat.manager.close()
+    
+    def test_ctrl_c_cancels_the_line_not_the_session(self, temp_file, monkeypatch, capsys):
+        """Test that Ctrl-C at the prompt keeps the session open, as in the sync chat."""
+        release = threading.Event()
+        reads = []
+        
+        def blocking_input(prompt):
+            reads.append(prompt)
+            release.wait(5)
+            return "exit"
+        
+        monkeypatch.setattr("builtins.input", blocking_input)
+        chat = AsyncTaskMasterChat(temp_file)
+        
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, os.kill, os.getpid(), signal.SIGINT)
+            loop.call_later(0.2, release.set)
+            await chat.run()
+        
+        asyncio.run(scenario())
+        out = capsys.readouterr().out
+        assert "Use exit or quit to leave TaskMaster" in out
+        assert "Goodbye" in out
+        assert len(reads) == 1  # the interrupted reader was waited on again
+    
+    def test_commands_run_while_suggestion_pending(self, temp_file, capsys):
+        """Test that the prompt keeps working and accept creates the suggested task."""
+        async def scenario():
+            chat = AsyncTaskMasterChat(temp_file)
+            client = self.connect(chat.summarizer)
+            chat.run_command("ai Book a venue, plan the agenda and invite the team")
+            await asyncio.sleep(0)
+            chat.run_command("add Existing")
+            chat.run_command("accept 1")
+            assert chat.manager.get_statistics()["total"] == 1
+            
+            client.release.set()
+            await asyncio.gather(*chat._pending)
+            chat.run_command("accept 1")
+            await chat.summarizer.aclose()
+            chat.manager.close()
+            return chat
+        
+        chat = asyncio.run(scenario())
+        out = capsys.readouterr().out
+        assert "No suggestion 1 is ready" in out
+        assert "Suggestion 1 ready: Plan the offsite" in out
+        assert [t.title for t in chat.manager.tasks] == ["Existing", "Plan the offsite"]
+        assert chat.suggestions == {}
+
+
+class TestSQLiteStorage:
+    """Test the SQLite storage backend."""
+    
+    @pytest.fixture
+    def temp_file(self, tmp_path):
+        """Create a temporary tasks file."""
+        return str(tmp_path / "test_tasks.json")
+    
+    @pytest.fixture
+    def manager(self, temp_file):
+        """Create a TaskManager backed by SQLite."""
+        manager = TaskManager(temp_file, storage="sqlite")
+        yield manager
+        manager.close()
+    
+    def test_crud_roundtrip(self, manager, temp_file):
+        """Test that changes are stored in the database."""
+        task = manager.add_task("Write report", "Quarterly", "high", tags=["work", "q4"])
+        manager.add_task("Walk dog")
+        manager.update_status(task.id, "completed")
+        manager.update_task(task.id, tags=["work"])
+        manager.delete_task(2)
+        manager.close()
+        
+        assert os.path.exists(str(temp_file).replace(".json", ".db"))
+        reopened = TaskManager(temp_file, storage="sqlite")
+        stored = reopened.get_task(task.id)
+        assert stored.status == "completed"
+        assert stored.completed_at is not None
+        assert stored.tags == ["work"]
+        assert reopened.get_task(2) is None
+        assert reopened._get_next_id() == 3  # IDs are never reused
+        reopened.close()
+    
+    def test_queries_match_json_storage(self, manager, temp_file):
+        """Test that SQL queries give the same answers as the in-memory scans."""
+        json_manager = TaskManager(temp_file.replace(".json", "_mem.json"))
+        past_date = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+        for m in (manager, json_manager):
+            m.add_task("Low task", "about groceries", "low", tags=["home"])
+            m.add_task("High task", "Meeting notes", "high", due_date=past_date, tags=["work"])
+            m.add_task("Medium task", priority="medium", due_date="2099-01-01", tags=["work", "home"])
+            m.update_status(1, "completed")
+        
+        for args in [(None, "priority", None), ("pending", "due_date", None), (None, "id", "home")]:
+            assert [t.id for t in manager.list_tasks(*args)] == [t.id for t in json_manager.list_tasks(*args)]
+        assert [t.id for t in manager.search_tasks("MEET")] == [2]
+        assert manager.get_statistics() == json_manager.get_statistics()
+    
+    def test_status_filter_uses_index(self, manager):
+        """Test that the status filter is answered from an index."""
+        plan = manager.storage.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE status = ?", ("pending",)
+        ).fetchall()
+        assert any("idx_tasks_status" in row[-1] for row in plan)
+    
+    def test_imports_existing_json(self, temp_file):
+        """Test that a new database imports the existing JSON file."""
+        json_manager = TaskManager(temp_file)
+        json_manager.add_task("Old task", tags=["legacy"])
+        
+        manager = TaskManager(temp_file, storage="sqlite")
+        assert [t.title for t in manager.tasks] == ["Old task"]
+        assert manager.get_task(1).tags == ["legacy"]
+        manager.close()
+    
+    def test_import_json_command(self, manager, tmp_path):
+        """Test importing tasks from another JSON file."""
+        other = str(tmp_path / "other.json")
+        TaskManager(other).add_task("Imported")
+        assert manager.import_json(other) == 1
+        assert manager.get_statistics()["total"] == 1
+    
+    def test_import_keeps_existing_tasks(self, manager, tmp_path, capsys):
+        """Test that an imported task with a taken ID is renumbered, not overwritten."""
+        manager.add_task("db task one")
+        other = str(tmp_path / "other.json")
+        TaskManager(other).add_task("Imported")
+        assert manager.import_json(other) == 1
+        assert [(t.id, t.title) for t in manager.tasks] == [(1, "db task one"), (2, "Imported")]
+        assert "Task 1 was imported as task 2" in capsys.readouterr().out
+    
+    def test_sessions_never_share_an_id(self, temp_file, capsys):
+        """Test that a task whose ID another session took meanwhile gets a new one."""
+        session_a = TaskManager(temp_file, storage="sqlite")
+        session_b = TaskManager(temp_file, storage="sqlite")
+        stale_id = session_a._get_next_id()
+        session_b.add_task("B's task")
+        session_a._get_next_id = lambda: stale_id
+        
+        task = session_a.add_task("A's task")
+        assert task.id == 2
+        assert [(t.id, t.title) for t in session_b.tasks] == [(1, "B's task"), (2, "A's task")]
+        assert "Task 1 is now task 2 (ID taken by another session)" in capsys.readouterr().out
+        session_a.close()
+        session_b.close()
+    
+    def test_transaction(self, manager, temp_file):
+        """Test that transactions commit or roll back in the database."""
+        with manager.transaction():
+            manager.add_task("First")
+            manager.update_task(1, title="Renamed")
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                manager.add_task("Second")
+                manager.delete_task(1)
+                raise RuntimeError("boom")
+        manager.close()
+        
+        reopened = TaskManager(temp_file, storage="sqlite")
+        assert [t.title for t in reopened.tasks] == ["Renamed"]
+        reopened.close()
+    
+    def test_confirmation_prompts_hold_no_transaction(self, temp_file, monkeypatch):
+        """Test that chat prompts wait for an answer with no savepoint open."""
+        chat = TaskMasterChat(temp_file, storage="sqlite")
+        chat.run_command("add First")
+        chat.run_command("update 1 completed")
+        in_transaction = []
+        
+        def answer(prompt):
+            in_transaction.append(chat.manager.storage.conn.in_transaction)
+            return "y"
+        
+        monkeypatch.setattr("builtins.input", answer)
+        chat.run_command("delete 1")
+        chat.run_command("add Second")
+        chat.run_command("update 2 completed")
+        chat.run_command("clear")
+        assert in_transaction == [False, False]
+        assert chat.manager.tasks == []
+        chat.manager.close()
+
+
 class TestAITaskSummarizer:
     """Test the AI summarizer (without actual API calls)."""
     
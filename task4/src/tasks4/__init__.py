@@ -3,17 +3,59 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import Iterable, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence
 
 from openai import OpenAI
 
+SYSTEM_PROMPT = (
+    "You read a task description and answer with a concise, action-oriented "
+    "phrase containing between three and eight words."
+)
+MAX_OUTPUT_TOKENS = 60
+
 
 def inc(value: int) -> int:
     """Return value incremented by one (assignment convention)."""
     return value + 1
 
 
+class TokenBucket:
+    """Token bucket holding up to `per_minute` tokens, refilled continuously."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> None:
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+@dataclass
+class SummaryResult:
+    """Summary of one description in a batch, or the error that prevented it."""
+
+    summary: str | None = None
+    error: str | None = None
+
+
 @dataclass
 class TaskSummarizer:
     """Wrap the OpenAI client to generate short task summaries."""
@@ -21,26 +63,51 @@ class TaskSummarizer:
     client: OpenAI
     model: str = "gpt-4o-mini"
     temperature: float = 0.2
+    concurrency: int = 8
+    requests_per_minute: float = 500
+    tokens_per_minute: float = 200_000
+    _buckets: List[TokenBucket] = field(default_factory=list, init=False, repr=False)
 
     def summarize(self, description: str) -> str:
         """Summarise a single task description."""
         response = self.client.responses.create(
             model=self.model,
             input=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You read a task description and answer with a concise, action-oriented "
-                        "phrase containing between three and eight words."
-                    ),
-                },
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": description},
             ],
-            max_output_tokens=60,
+            max_output_tokens=MAX_OUTPUT_TOKENS,
             temperature=self.temperature,
         )
         return response.output_text.strip()
 
+    def summarize_many(self, descriptions: Sequence[str]) -> List[SummaryResult]:
+        """Summarise many descriptions concurrently, keeping input order.
+
+        Up to `concurrency` requests run at once, each waiting first on
+        token buckets for the requests-per-minute and tokens-per-minute
+        limits (tokens estimated at four characters each). Duplicate
+        descriptions are sent once; a failure only affects its own items.
+        """
+        if not self._buckets:
+            self._buckets = [TokenBucket(self.requests_per_minute), TokenBucket(self.tokens_per_minute)]
+        requests, tokens = self._buckets
+
+        def run(description: str) -> SummaryResult:
+            requests.acquire()
+            tokens.acquire((len(SYSTEM_PROMPT) + len(description)) // 4 + MAX_OUTPUT_TOKENS)
+            try:
+                return SummaryResult(summary=self.summarize(description))
+            except Exception as exc:  # pragma: no cover - depends on network
+                return SummaryResult(error=str(exc) or type(exc).__name__)
+
+        unique = list(dict.fromkeys(descriptions))
+        if not unique:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(unique)))) as pool:
+            results: Dict[str, SummaryResult] = dict(zip(unique, pool.map(run, unique)))
+        return [results[description] for description in descriptions]
+
 
 def summarize_task(description: str, *, api_key: str | None = None) -> str:
     """Helper that builds a client (using env var fallback) and summarises the text."""
@@ -84,21 +151,20 @@ def main() -> None:
         return
 
     summarizer = TaskSummarizer(client=OpenAI(api_key=api_key))
+    results = summarizer.summarize_many(descriptions)
 
-    for index, paragraph in enumerate(descriptions, start=1):
+    for index, (paragraph, result) in enumerate(zip(descriptions, results), start=1):
         print("\n" + "-" * 74)
         print(f"Task description #{index}")
         print("-" * 74)
         print(paragraph)
 
-        try:
-            summary = summarizer.summarize(paragraph)
-        except Exception as exc:  # pragma: no cover - depends on network
-            print(f"\n❌ Failed to summarise: {exc}")
+        if result.error is not None:
+            print(f"\n❌ Failed to summarise: {result.error}")
             continue
 
         print("\n🤖 Summary:")
-        print(summary)
+        print(result.summary)
 
     print("\nFinished processing descriptions.")
 